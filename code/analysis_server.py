@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地分析服务
+启动时加载一次data/下的数据并常驻内存，接收与config/*.json相同格式的组合定义，
+直接返回分析结果；数据文件变化时自动重新加载
+
+用法:
+    python3 code/analysis_server.py                     # HTTP，默认 127.0.0.1:8765
+    python3 code/analysis_server.py --socket /tmp/pp.sock  # Unix socket
+
+    curl -X POST --data-binary @config/保守型_config.json http://127.0.0.1:8765/analyze
+"""
+
+import json
+import os
+import glob
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from 永久投资组合分析_配置版 import load_asset_data, run_analysis
+
+
+class AssetDataCache:
+    """
+    资产数据的内存缓存
+
+    按 (文件路径, 日期列, 日期格式, 价格列) 缓存load_asset_data的结果，
+    每次读取时比对文件的修改时间和大小，变化则重新加载
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(asset, base_path):
+        file_path = os.path.abspath(os.path.join(base_path, asset['data_file']))
+        return (file_path, asset['date_column'], asset['date_format'], asset['price_column'])
+
+    @staticmethod
+    def _stamp(file_path):
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self, asset, base_path):
+        """与load_asset_data签名一致，可直接传给run_analysis"""
+        if asset.get('type') == 'cash':
+            return None
+
+        key = self._key(asset, base_path)
+        stamp = self._stamp(key[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+
+        df = load_asset_data(asset, base_path)
+        with self._lock:
+            self._entries[key] = (stamp, df, asset)
+        return df
+
+    def refresh(self, base_path):
+        """重新加载已变化的文件，返回重新加载的文件列表"""
+        with self._lock:
+            entries = list(self._entries.items())
+
+        reloaded = []
+        for key, (stamp, _, asset) in entries:
+            try:
+                changed = self._stamp(key[0]) != stamp
+            except FileNotFoundError:
+                with self._lock:
+                    self._entries.pop(key, None)
+                continue
+            if changed:
+                self.load(asset, base_path)
+                reloaded.append(key[0])
+        return reloaded
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def preload(cache, base_path):
+    """预加载config/目录下所有配置引用的数据文件"""
+    for config_path in sorted(glob.glob(os.path.join(base_path, 'config', '*.json'))):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        assets = config.get('assets', [])
+        if not isinstance(assets, list):
+            # 旧版字典格式的配置不受支持
+            continue
+        for asset in assets:
+            try:
+                cache.load(asset, base_path)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"预加载失败 {asset.get('data_file')}: {e}")
+
+
+def watch_data(cache, base_path, interval):
+    """后台线程：定期检查数据文件变化并重新加载"""
+    while True:
+        time.sleep(interval)
+        for file_path in cache.refresh(base_path):
+            print(f"数据文件已变化，重新加载: {file_path}")
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    """
+    POST /analyze  请求体为组合配置JSON，返回 {'summary': ..., 'annual_returns': ...}
+    GET  /health   返回服务状态
+    """
+
+    cache = None
+    base_path = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'cached_files': len(self.cache)})
+        else:
+            self._send_json(404, {'error': f'未知路径: {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send_json(404, {'error': f'未知路径: {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            config = json.loads(self.rfile.read(length).decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {'error': f'配置JSON解析失败: {e}'})
+            return
+
+        start = time.perf_counter()
+        try:
+            result = run_analysis(config, self.base_path, load_data=self.cache.load,
+                                  verbose=False, save_csv=False)
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            self._send_json(400, {'error': f'分析失败: {type(e).__name__}: {e}'})
+            return
+
+        if result is None:
+            self._send_json(400, {'error': '没有可用的资产数据'})
+            return
+
+        result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        self._send_json(200, result)
+
+    def address_string(self):
+        # Unix socket的客户端地址为空字符串
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        print(f"[{self.log_date_time_string()}] {self.address_string()} {format % args}")
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def serve(base_path, host='127.0.0.1', port=8765, socket_path=None, watch_interval=2.0):
+    """启动分析服务（阻塞）"""
+    cache = AssetDataCache()
+
+    print("="*80)
+    print("预加载数据...")
+    start = time.perf_counter()
+    preload(cache, base_path)
+    print(f"✓ 已加载 {len(cache)} 个数据文件，用时 {time.perf_counter() - start:.2f}s")
+
+    handler = type('Handler', (AnalysisHandler,), {'cache': cache, 'base_path': base_path})
+
+    if watch_interval > 0:
+        threading.Thread(target=watch_data, args=(cache, base_path, watch_interval), daemon=True).start()
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, handler)
+        print(f"✓ 分析服务已启动: unix:{socket_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        print(f"✓ 分析服务已启动: http://{host}:{port}")
+    print("="*80)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n服务已停止")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='永久投资组合本地分析服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    parser.add_argument('--socket', help='Unix socket路径（指定后不监听TCP端口）')
+    parser.add_argument('--watch-interval', type=float, default=2.0,
+                        help='数据文件变化检查间隔（秒），0表示不检查')
+    args = parser.parse_args()
+
+    serve(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+          host=args.host, port=args.port, socket_path=args.socket, watch_interval=args.watch_interval)
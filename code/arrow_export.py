@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arrow IPC / Parquet 导出
+把对齐价格面板、组合价值路径、汇总指标和年度收益率以带类型的列式文件导出，
+notebook/看板可直接内存映射读取，不再解析带BOM的CSV和混合类型列：
+    panel_<组合名>.arrow   Date + 各资产价格（float64，含现金列）
+    paths.arrow            Date + 各组合价值（float64，组合没有数据的日期为null）
+    metrics.arrow          每个组合一行的汇总指标（日期为date32，整数列可为null）
+    annual_returns.arrow   组合 × 年份 的年度收益率
+.arrow 为不压缩的 Arrow IPC（Feather V2）文件，可用 read_arrow / pyarrow.memory_map 零拷贝读取；
+Parquet 为压缩的列式归档；CSV 为可选的人工查看格式（utf-8-sig）
+
+需要安装 pyarrow（只在导出/读取时导入）
+
+用法:
+    python3 code/arrow_export.py                                      # config/下全部配置
+    python3 code/arrow_export.py config/保守型_config.json --formats arrow parquet csv
+"""
+
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+
+from results_store import RESULT_COLUMNS
+
+EXPORT_FORMATS = ('arrow', 'parquet', 'csv')
+
+# 汇总指标中按日期保存的列
+DATE_FIELDS = ('start_date', 'end_date', 'peak_date', 'trough_date', 'recovery_date')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("导出/读取 Arrow、Parquet 需要安装 pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def default_export_dir(base_path):
+    """默认的导出目录"""
+    return os.path.join(base_path, '永久投资组合', 'export')
+
+
+def panel_frame(config, portfolio_df):
+    """对齐价格面板：Date + 以资产简称命名的价格列"""
+    frame = portfolio_df[[f"asset_{i}" for i in range(len(config['assets']))]].copy()
+    frame.columns = [a['name'] for a in config['assets']]
+    return frame.astype(np.float64).rename_axis('Date').reset_index()
+
+
+def paths_frame(series):
+    """组合价值路径宽表：{组合名: pd.Series} -> Date + 各组合价值列（按日期并集对齐）"""
+    frame = pd.concat(series, axis=1).sort_index().astype(np.float64)
+    return frame.rename_axis('Date').reset_index()
+
+
+def metrics_frame(results):
+    """汇总指标表（结果库同名字段，按类型转换）"""
+    fields = [name for name, _ in RESULT_COLUMNS if name != 'updated_at']
+    frame = pd.DataFrame([r['summary'] for r in results]).reindex(columns=fields)
+    for name, sql_type in RESULT_COLUMNS:
+        if name not in frame:
+            continue
+        if name in DATE_FIELDS:
+            frame[name] = pd.to_datetime(frame[name]).dt.date
+        elif sql_type == 'INTEGER':
+            frame[name] = frame[name].astype('Int64')
+        elif sql_type == 'REAL':
+            frame[name] = frame[name].astype(np.float64)
+        else:
+            frame[name] = frame[name].astype('string')
+    return frame
+
+
+def annual_frame(results):
+    """年度收益率长表：config_hash, portfolio_name, year, start_value, end_value, annual_return"""
+    frame = pd.DataFrame([{'config_hash': r['summary']['config_hash'],
+                           'portfolio_name': r['summary']['portfolio_name'], **row}
+                          for r in results for row in r['annual_returns']],
+                         columns=['config_hash', 'portfolio_name', 'year', 'start_value', 'end_value',
+                                  'annual_return'])
+    return frame.astype({'config_hash': 'string', 'portfolio_name': 'string', 'year': np.int32,
+                         'start_value': np.float64, 'end_value': np.float64, 'annual_return': np.float64})
+
+
+def write_table(frame, stem, formats=('arrow', 'parquet')):
+    """
+    按格式写出一张表
+
+    参数:
+        frame: DataFrame
+        stem: 不含扩展名的输出路径
+        formats: EXPORT_FORMATS 的子集
+
+    返回:
+        写出的文件路径列表
+    """
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"不支持的导出格式: {', '.join(sorted(unknown))}（可选: {', '.join(EXPORT_FORMATS)}）")
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    written = []
+    if 'arrow' in formats or 'parquet' in formats:
+        pa = _pyarrow()
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if 'arrow' in formats:
+            # 不压缩，读取时可直接内存映射
+            pa.feather.write_feather(table, stem + '.arrow', compression='uncompressed')
+            written.append(stem + '.arrow')
+        if 'parquet' in formats:
+            pa.parquet.write_table(table, stem + '.parquet')
+            written.append(stem + '.parquet')
+    if 'csv' in formats:
+        frame.to_csv(stem + '.csv', index=False, encoding='utf-8-sig')
+        written.append(stem + '.csv')
+    return written
+
+
+def read_arrow(path):
+    """内存映射读取导出的 .arrow 文件，返回 pyarrow.Table（.to_pandas() 转为DataFrame）"""
+    return _pyarrow().feather.read_table(path, memory_map=True)
+
+
+def export_configs(configs, base_path, output_dir=None, formats=('arrow', 'parquet'), conn=None, log=print):
+    """
+    计算（或从结果缓存读取）各配置并导出面板、路径和指标
+
+    参数:
+        configs: 配置字典列表
+        base_path: 项目根目录
+        output_dir: 导出目录（默认 永久投资组合/export）
+        formats: 导出格式
+        conn: 结果库连接（可选），传入时使用结果缓存
+        log: 输出函数
+
+    返回:
+        写出的文件路径列表
+    """
+    from dynamic_weights import rebalance_weights
+    from 永久投资组合分析_配置版 import annual_rebalance_mask, build_portfolio_df, run_analysis, simulate_rebalance
+
+    output_dir = output_dir or default_export_dir(base_path)
+    quiet = lambda *args, **kwargs: None
+    written = []
+    results = []
+    series = {}
+    for config in configs:
+        portfolio_df = build_portfolio_df(config, base_path, log=quiet)
+        if portfolio_df is None:
+            log(f"✗ {config['portfolio_name']}: 没有可用的资产数据")
+            continue
+        if conn is not None:
+            from result_cache import cached_analysis
+            result, _ = cached_analysis(config, base_path, conn, verbose=False, save_csv=False)
+        else:
+            result = run_analysis(config, base_path, verbose=False, save_csv=False)
+        results.append(result)
+
+        prices = portfolio_df.to_numpy()
+        mask = annual_rebalance_mask(portfolio_df.index)
+        series[config['portfolio_name']] = pd.Series(
+            simulate_rebalance(prices, rebalance_weights(config, prices, mask), mask), index=portfolio_df.index)
+        safe_name = config['portfolio_name'].replace('/', '_')
+        written += write_table(panel_frame(config, portfolio_df), os.path.join(output_dir, f'panel_{safe_name}'),
+                               formats)
+
+    if results:
+        written += write_table(paths_frame(series), os.path.join(output_dir, 'paths'), formats)
+        written += write_table(metrics_frame(results), os.path.join(output_dir, 'metrics'), formats)
+        written += write_table(annual_frame(results), os.path.join(output_dir, 'annual_returns'), formats)
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from results_store import default_store_path, open_store
+    from 永久投资组合分析_配置版 import load_config
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='导出价格面板、价值路径和指标为 Arrow IPC / Parquet')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--formats', nargs='+', default=['arrow', 'parquet'], choices=EXPORT_FORMATS,
+                        help='导出格式（csv为可选的人工查看格式）')
+    parser.add_argument('--output-dir', default=default_export_dir(base_path), help='导出目录')
+    parser.add_argument('--no-store', action='store_true', help='不使用结果缓存，重新计算')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+    configs = []
+    for config_path in config_paths:
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        configs.append(config)
+
+    start = time.perf_counter()
+    conn = None if args.no_store else open_store(default_store_path(base_path))
+    try:
+        written = export_configs(configs, base_path, args.output_dir, args.formats, conn)
+    finally:
+        if conn is not None:
+            conn.close()
+    for path in written:
+        print(f"✓ {os.path.relpath(path, base_path)}")
+    print(f"✓ {len(configs)} 个组合，{len(written)} 个文件，用时 {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分资产收益/回撤归因与权重漂移
+一次模拟（simulate_holdings）得到各资产的持仓价值 (T, N)，由此直接得出：
+    收益贡献：期间内各资产持仓价值的变化 / 期初组合价值，各资产之和等于组合期间收益
+    回撤贡献：期间内最大回撤的峰值到谷底之间各资产的价值变化 / 峰值，各资产之和等于期间最大回撤
+    权重漂移：期末实际权重 - 期初权重（期初为再平衡点时即目标权重）
+按自然年和再平衡期两种口径输出；年度收益与主程序口径一致（年末值 / 年初值），
+区间计算复用压力情景回放的向量化实现
+
+用法:
+    python3 code/attribution.py                           # config/下全部配置
+    python3 code/attribution.py config/保守型_config.json
+"""
+
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+
+from stress_scenarios import replay_scenarios
+
+
+def period_bounds(index, rebalance_mask=None):
+    """
+    期间的起止下标
+
+    参数:
+        index: 日期索引
+        rebalance_mask: 传入时按再平衡期划分，否则按自然年
+
+    返回:
+        starts, ends: (P,) 下标
+    """
+    if rebalance_mask is None:
+        years = np.asarray(index.year)
+        rebalance_mask = np.ones(len(years), dtype=bool)
+        rebalance_mask[1:] = years[1:] != years[:-1]
+    starts = np.flatnonzero(rebalance_mask)
+    ends = np.append(starts[1:] - 1, len(index) - 1)
+    return starts, ends
+
+
+def attribute_periods(holdings, contributions, starts, ends):
+    """
+    各期间的收益/回撤归因和权重漂移（全部期间一次向量化计算）
+
+    参数:
+        holdings: (T, N) 各资产持仓价值
+        contributions: (T, N) 各资产累计价值贡献（rebalance_contributions 的结果）
+        starts, ends: (P,) 期间起止下标
+
+    返回:
+        dict：period_return (P,)、drawdown (P,)、return_contribution / drawdown_contribution /
+        start_weight / end_weight (P, N)，均为百分比
+    """
+    values = holdings.sum(axis=1)
+    replay = replay_scenarios(values[None, :], contributions[None, :, :], starts, ends)
+    return {
+        'period_return': (values[ends] / values[starts] - 1) * 100,
+        'return_contribution': (contributions[ends] - contributions[starts]) / values[starts][:, None] * 100,
+        'drawdown': replay['loss'][0],
+        'drawdown_contribution': replay['contribution'][0],
+        'start_weight': holdings[starts] / values[starts][:, None] * 100,
+        'end_weight': holdings[ends] / values[ends][:, None] * 100,
+    }
+
+
+def config_attribution(config, base_path, panel_cache_dir=None):
+    """
+    按主程序规则模拟配置，输出自然年和再平衡期两种口径的归因
+
+    返回:
+        summary: 每个期间一行（组合收益、期间最大回撤、主导资产）
+        detail: 每个 (期间, 资产) 一行（期初/期末权重、漂移、收益贡献、回撤贡献）
+    """
+    from dynamic_weights import rebalance_weights
+    from 永久投资组合分析_配置版 import (annual_rebalance_mask, build_portfolio_df, rebalance_contributions,
+                                  simulate_holdings)
+
+    portfolio_df = build_portfolio_df(config, base_path, log=lambda *args, **kwargs: None,
+                                      panel_cache_dir=panel_cache_dir)
+    if portfolio_df is None:
+        return None, None
+    index = portfolio_df.index
+    prices = portfolio_df.to_numpy()
+    rebalance_mask = annual_rebalance_mask(index)
+    weights = rebalance_weights(config, prices, rebalance_mask)
+    holdings = simulate_holdings(prices, weights, rebalance_mask)
+    _, contributions = rebalance_contributions(prices, weights, rebalance_mask, holdings=holdings)
+    asset_names = np.array([a['name'] for a in config['assets']])
+
+    summaries = []
+    details = []
+    for kind, mask in (('年度', None), ('再平衡期', rebalance_mask)):
+        starts, ends = period_bounds(index, mask)
+        result = attribute_periods(holdings, contributions, starts, ends)
+        if kind == '年度':
+            labels = np.asarray(index.year[starts]).astype(str)
+        else:
+            labels = [f"{index[s].strftime('%Y-%m')}至{index[e].strftime('%Y-%m')}" for s, e in zip(starts, ends)]
+        leader = np.abs(result['return_contribution']).argmax(axis=1)
+        summaries.append(pd.DataFrame({
+            '组合': config['portfolio_name'],
+            '口径': kind,
+            '期间': labels,
+            '组合收益(%)': result['period_return'],
+            '期间最大回撤(%)': result['drawdown'],
+            '主导资产': asset_names[leader],
+            '主导资产贡献(%)': result['return_contribution'][np.arange(len(starts)), leader],
+        }))
+        n_periods, n_assets = result['return_contribution'].shape
+        details.append(pd.DataFrame({
+            '组合': config['portfolio_name'],
+            '口径': kind,
+            '期间': np.repeat(labels, n_assets),
+            '资产': np.tile(asset_names, n_periods),
+            '期初权重(%)': result['start_weight'].ravel(),
+            '期末权重(%)': result['end_weight'].ravel(),
+            '权重漂移(%)': (result['end_weight'] - result['start_weight']).ravel(),
+            '收益贡献(%)': result['return_contribution'].ravel(),
+            '回撤贡献(%)': result['drawdown_contribution'].ravel(),
+        }))
+    return pd.concat(summaries, ignore_index=True), pd.concat(details, ignore_index=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from 永久投资组合分析_配置版 import load_config
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='分资产收益/回撤归因与再平衡之间的权重漂移')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--table-dir', default=os.path.join(base_path, 'table'), help='表格输出目录')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+
+    print("="*80)
+    print("分资产收益/回撤归因")
+    print("="*80)
+    start = time.perf_counter()
+
+    summaries = []
+    details = []
+    for config_path in config_paths:
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        summary, detail = config_attribution(config, base_path)
+        if summary is None:
+            print(f"✗ {config['portfolio_name']}: 没有可用的资产数据")
+            continue
+        summaries.append(summary)
+        details.append(detail)
+
+        annual = detail[detail['口径'] == '年度']
+        table = annual.pivot(index='期间', columns='资产', values='收益贡献(%)')[[a['name'] for a in config['assets']]]
+        yearly = summary[summary['口径'] == '年度'].set_index('期间')
+        table['组合收益(%)'] = yearly['组合收益(%)']
+        table['期间最大回撤(%)'] = yearly['期间最大回撤(%)']
+        table['主导资产'] = yearly['主导资产']
+        print(f"\n{config['portfolio_name']} 各年收益贡献(%):")
+        print(table.round(2).to_string())
+
+    if summaries:
+        os.makedirs(args.table_dir, exist_ok=True)
+        pd.concat(summaries, ignore_index=True).round(2).to_csv(
+            os.path.join(args.table_dir, '资产归因_期间汇总.csv'), index=False, encoding='utf-8-sig')
+        pd.concat(details, ignore_index=True).round(2).to_csv(
+            os.path.join(args.table_dir, '资产归因_明细.csv'), index=False, encoding='utf-8-sig')
+        print(f"\n✓ 表格已保存至: {args.table_dir}")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    print("="*80)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量模拟与指标
+同一价格面板上一次性模拟大量候选权重组合，并向量化计算CAGR、波动率、Sharpe、最大回撤、Calmar；
+再平衡模拟的核心 simulate_holdings 也在这里，主程序、批量模拟和时点分析共用同一套规则
+"""
+
+import itertools
+
+import numpy as np
+
+# 权重搜索时Calmar分母（回撤绝对值，%）的下限，避免以现金为主、回撤接近0的组合得到极大的Calmar
+MIN_DRAWDOWN = 1.0
+
+
+def simulate_holdings(prices, weights, rebalance_mask, initial_value=10000, drift=False):
+    """
+    向量化的定期再平衡模拟，返回各资产的持仓价值（主程序、批量模拟和时点分析共用）
+
+    再平衡点按上一期末的组合价值、以当期价格重新按权重分配份额；
+    两次再平衡之间份额不变，各资产持仓价值 = 段初价值 × 权重 × 价格/段初价格，
+    各列之和即组合价值；持仓价值 / 组合价值 为两次再平衡之间实际漂移后的权重
+
+    主程序的规则下再平衡行的价值等于上一行价值（该期收益不计入）；drift=True 时再平衡行先按旧份额 × 当期价格
+    计价、计入该期收益，再按新权重分配，不同再平衡时点之间不会因为丢掉的是哪一期收益而产生差异
+
+    多组权重（M）和多组再平衡时点（O）按numpy广播规则配对：一方为1时与另一方的每一组配对，
+    两者相等时逐组配对
+
+    参数:
+        prices: (T, N) 价格数组
+        weights: (N,) 固定目标权重，(K, N) 每个再平衡点各自的目标权重，
+                 或 (M, K, N) M组权重（K为1时即固定权重；各组再平衡点数不同时按最多的补齐，多余行不使用）
+        rebalance_mask: (T,) 或 (O, T) 布尔数组，第一列必须为True
+        initial_value: 初始投资金额
+        drift: 再平衡行是否按漂移后的持仓（旧份额 × 当期价格）计价
+
+    返回:
+        holdings: (T, N) 各资产持仓价值；weights 为三维或 rebalance_mask 为二维时为 (B, T, N)，B = max(M, O)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    masks = np.asarray(rebalance_mask, dtype=bool)
+    single = masks.ndim == 1 and weights.ndim <= 2
+    masks = np.atleast_2d(masks)
+    if weights.ndim < 3:
+        weights = weights.reshape((1, -1, weights.shape[-1]))
+    batch = np.broadcast_shapes((weights.shape[0],), (masks.shape[0],))[0]
+    shape = (batch, masks.shape[1])
+
+    # 每行所在段的段初行号、段序号
+    start_row = np.maximum.accumulate(np.where(masks, np.arange(shape[1]), 0), axis=1)
+    segment = np.cumsum(masks, axis=1) - 1
+    # 段末：下一行再平衡或最后一行；按漂移计价时再平衡行本身仍属于上一段，是上一段的段末
+    segment_end = np.ones(masks.shape, dtype=bool)
+    if drift:
+        start_row = np.hstack([start_row[:, :1], start_row[:, :-1]])
+        segment = np.hstack([segment[:, :1], segment[:, :-1]])
+        segment_end[:, :-1] = masks[:, :-1]
+        segment_end[:, 0] = False
+        segment_end[:, -1] = True
+        previous_end = start_row
+    else:
+        segment_end[:, :-1] = masks[:, 1:]
+        previous_end = start_row - 1
+    segment = np.broadcast_to(segment, shape)
+    previous_end = np.broadcast_to(previous_end, shape)
+    row_weights = np.take_along_axis(np.broadcast_to(weights, (batch,) + weights.shape[1:]),
+                                     np.minimum(segment, weights.shape[1] - 1)[:, :, None], axis=1)
+
+    # 各行相对段初的增长倍数（按资产）
+    holdings = prices[None, :, :] / prices[start_row] * row_weights
+    growth = holdings.sum(axis=2)
+
+    # 段末的增长倍数累乘，作为之后各段的段初价值
+    cumulative = np.cumprod(np.where(segment_end, growth, 1.0), axis=1)
+    previous = np.where(start_row > 0, np.take_along_axis(cumulative, np.maximum(previous_end, 0), axis=1), 1.0)
+    holdings = holdings * (initial_value * previous)[:, :, None]
+    return holdings[0] if single else holdings
+
+
+def simulate_rebalance_batch(prices, weights, rebalance_mask, initial_value=10000):
+    """
+    批量版 simulate_rebalance：M组固定权重同时模拟
+
+    参数:
+        prices: (T, N) 价格数组
+        weights: (M, N) 候选权重
+        rebalance_mask: (T,) 布尔数组，第一行必须为True
+        initial_value: 初始投资金额
+
+    返回:
+        values: (T, M) 组合价值
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    return simulate_holdings(prices, weights[:, None, :], rebalance_mask, initial_value).sum(axis=2).T
+
+
+def max_drawdown(values):
+    """(T, M) -> (M,) 最大回撤（%，负数）"""
+    peak = np.maximum.accumulate(values, axis=0)
+    return (values / peak - 1).min(axis=0) * 100
+
+
+def path_metrics(values, periods_per_year=12, min_drawdown=0.0):
+    """
+    向量化计算价值路径的指标（与结果库字段同口径，百分比单位）
+
+    参数:
+        values: (T, M) 组合价值
+        periods_per_year: 每年期数（月度为12）
+        min_drawdown: Calmar分母中回撤绝对值的下限（%）；默认0即与结果库同口径，没有回撤时Calmar为NaN
+
+    返回:
+        {'cagr', 'volatility', 'sharpe', 'max_drawdown', 'calmar'}，每项为 (M,) 数组
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    years = (len(values) - 1) / periods_per_year
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = ((values[-1] / values[0]) ** (1 / years) - 1) * 100 if years > 0 else np.full(values.shape[1], np.nan)
+        returns = values[1:] / values[:-1] - 1
+        volatility = returns.std(axis=0, ddof=1) * np.sqrt(periods_per_year) * 100
+        sharpe = returns.mean(axis=0) * periods_per_year * 100 / volatility
+        mdd = max_drawdown(values)
+        denominator = np.maximum(np.abs(mdd), min_drawdown)
+        calmar = np.where(denominator > 0, cagr / denominator, np.nan)
+
+    return {'cagr': cagr, 'volatility': volatility, 'sharpe': sharpe,
+            'max_drawdown': mdd, 'calmar': calmar}
+
+
+def weight_grid(n_assets, step=0.05, max_weight=1.0):
+    """
+    单纯形上的等间距权重网格（只做多，和为1）
+
+    参数:
+        n_assets: 资产数
+        step: 网格步长
+        max_weight: 单一资产权重上限
+
+    返回:
+        (M, n_assets) 候选权重
+    """
+    units = int(round(1 / step))
+    cap = int(np.floor(max_weight * units + 1e-9))
+    # 隔板法枚举：在 units + n - 1 个位置中选 n - 1 个隔板
+    grid = []
+    for bars in itertools.combinations(range(units + n_assets - 1), n_assets - 1):
+        edges = (-1,) + bars + (units + n_assets - 1,)
+        counts = np.diff(edges) - 1
+        if counts.max() <= cap:
+            grid.append(counts)
+    return np.array(grid, dtype=np.float64) / units
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略两两差异的配对平稳自助法（stationary bootstrap）置信区间
+所有策略的月度收益率先对齐到共同区间，每次重抽样生成一组月份下标（平均块长为 block 的随机块，
+首尾循环衔接），同一组下标同时作用于所有策略——配对抽样保留了策略之间的相关性。
+每次重抽样的 CAGR、Sharpe、最大回撤对全部 (重抽样, 策略) 一次向量化计算，
+策略对的差值只是对这些结果做下标相减，策略对再多也不需要重新抽样
+
+组合在再平衡月按上期末价值重新分配、该月价值不变（主程序的规则），这些月份不是实际观测，
+重抽样前从共同区间中剔除；年化按剩余月数 / 实际经过的年数计算，原样本的CAGR与组合实际年化一致
+
+报告每个策略对在各指标上的差值（A - B）、百分位置信区间和双侧p值（自助分布落在0另一侧的比例 × 2）；
+置信区间不包含0时标记为显著
+
+用法:
+    python3 code/bootstrap_compare.py config/保守型_config.json config/稳健平衡型_config.json
+    python3 code/bootstrap_compare.py --resamples 10000 --block 6 --confidence 0.9     # config/下全部配置两两比较
+"""
+
+import os
+import glob
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from batch_engine import path_metrics
+
+# 比较的指标：path_metrics 的键 -> 显示名称
+METRICS = {'cagr': 'CAGR(%)', 'sharpe': 'Sharpe', 'max_drawdown': '最大回撤(%)'}
+
+
+def stationary_bootstrap_indices(n_periods, n_resamples, block=6.0, rng=None):
+    """
+    平稳自助法的重抽样下标（向量化生成，不逐期循环）
+
+    每期以 1/block 的概率开始一个新块（起点均匀随机），否则接着上一期的下一个月份，超出末尾时回到开头
+
+    参数:
+        n_periods: 样本期数T
+        n_resamples: 重抽样次数B
+        block: 平均块长（期）
+        rng: numpy随机数生成器
+
+    返回:
+        (B, T) 下标
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    new_block = rng.random((n_resamples, n_periods)) < 1 / block
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_periods, size=(n_resamples, n_periods))
+    steps = np.arange(n_periods)
+    # 每期所在块的起始期：把块起点的期号向后传播
+    block_first = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+    first_index = np.take_along_axis(starts, block_first, axis=1)
+    return (first_index + steps - block_first) % n_periods
+
+
+def resampled_metrics(returns, indices, periods_per_year=12):
+    """
+    对全部策略按同一组下标重抽样并计算指标
+
+    参数:
+        returns: (S, T) 各策略的期收益率
+        indices: (B, T) 重抽样下标
+        periods_per_year: 每年期数
+
+    返回:
+        {指标: (B, S) 数组}
+    """
+    sampled = returns[:, indices]                                   # (S, B, T)
+    S, B, T = sampled.shape
+    growth = np.cumprod(1 + sampled.reshape(S * B, T), axis=1)
+    values = np.hstack([np.ones((S * B, 1)), growth]).T             # (T+1, S*B)
+    stats = path_metrics(values, periods_per_year)
+    return {name: stats[name].reshape(S, B).T for name in METRICS}
+
+
+def paired_bootstrap(returns, pairs, n_resamples=5000, block=6.0, confidence=0.95, seed=None,
+                     chunk_size=1000, periods_per_year=12):
+    """
+    多个策略对的配对平稳自助法
+
+    参数:
+        returns: (S, T) 各策略在共同区间上的期收益率
+        pairs: [(i, j), ...] 策略对（比较 i - j）
+        n_resamples: 重抽样次数
+        block: 平均块长（期）
+        confidence: 置信水平
+        seed: 随机种子
+        chunk_size: 每块重抽样次数（控制内存）
+
+    返回:
+        dict：每个指标为 {'estimate': (P,), 'low': (P,), 'high': (P,), 'p_value': (P,)}，
+        另有 'levels' {指标: (S,)} 为各策略在原样本上的指标
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    S, T = returns.shape
+    rng = np.random.default_rng(seed)
+    first, second = np.array(pairs, dtype=int).reshape(-1, 2).T
+
+    samples = {name: [] for name in METRICS}
+    for start in range(0, n_resamples, chunk_size):
+        indices = stationary_bootstrap_indices(T, min(chunk_size, n_resamples - start), block, rng)
+        stats = resampled_metrics(returns, indices, periods_per_year)
+        for name in METRICS:
+            samples[name].append(stats[name][:, first] - stats[name][:, second])
+
+    levels = resampled_metrics(returns, np.arange(T)[None, :], periods_per_year)
+    alpha = (1 - confidence) / 2
+    result = {'levels': {name: levels[name][0] for name in METRICS}}
+    for name in METRICS:
+        diffs = np.vstack(samples[name])                              # (B, P)
+        estimate = levels[name][0, first] - levels[name][0, second]
+        low, high = np.nanquantile(diffs, [alpha, 1 - alpha], axis=0)
+        below = np.mean(diffs <= 0, axis=0)
+        above = np.mean(diffs >= 0, axis=0)
+        result[name] = {'estimate': estimate, 'low': low, 'high': high,
+                        'p_value': np.minimum(1.0, 2 * np.minimum(below, above))}
+    return result
+
+
+def common_returns(series):
+    """
+    各策略价值序列在共同日期上的期收益率，剔除任一策略的再平衡月
+
+    参数:
+        series: {策略名称: pd.Series(价值)}，按主程序规则（annual_rebalance_mask）再平衡
+
+    返回:
+        names, dates, returns (S, T), periods_per_year（剩余期数 / 实际经过的年数）
+    """
+    from 永久投资组合分析_配置版 import annual_rebalance_mask
+
+    values = pd.concat(series, axis=1, join='inner').sort_index()
+    dates = values.index
+    # 共同日期上的收益区间 (上一日期, 当前日期] 内含有某个策略的再平衡点时剔除该期
+    keep = np.ones(len(dates) - 1, dtype=bool)
+    for s in series.values():
+        index = s.dropna().sort_index().index
+        rebalances = index[annual_rebalance_mask(index)][1:]
+        counts = np.searchsorted(rebalances, dates, side='right')
+        keep &= np.diff(counts) == 0
+    returns = values.pct_change().iloc[1:][keep]
+    years = (dates[-1] - dates[0]).days / 365.25
+    return list(values.columns), returns.index, returns.to_numpy().T, len(returns) / years
+
+
+def comparison_table(names, pairs, result, confidence=0.95):
+    """整理成每个 (策略对, 指标) 一行的表"""
+    rows = []
+    for p, (i, j) in enumerate(pairs):
+        for name, label in METRICS.items():
+            stats = result[name]
+            low, high = stats['low'][p], stats['high'][p]
+            rows.append({
+                '策略A': names[i],
+                '策略B': names[j],
+                '指标': label,
+                'A': result['levels'][name][i],
+                'B': result['levels'][name][j],
+                '差值(A-B)': stats['estimate'][p],
+                f'{confidence:.0%}置信下限': low,
+                f'{confidence:.0%}置信上限': high,
+                'p值': stats['p_value'][p],
+                '显著': '是' if low > 0 or high < 0 else '否',
+            })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from 永久投资组合分析_配置版 import load_config, portfolio_value_series
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='策略两两差异的配对平稳自助法置信区间（CAGR/Sharpe/最大回撤）')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置，两两比较）')
+    parser.add_argument('--resamples', type=int, default=5000, help='重抽样次数')
+    parser.add_argument('--block', type=float, default=6.0, help='平均块长（月）')
+    parser.add_argument('--confidence', type=float, default=0.95, help='置信水平')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--output', default=os.path.join(base_path, 'table', '策略差异_自助法置信区间.csv'),
+                        help='输出CSV路径')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+    series = {}
+    for config_path in config_paths:
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        values = portfolio_value_series(config, base_path)
+        if values is not None:
+            series[config['portfolio_name']] = values
+    if len(series) < 2:
+        parser.error('至少需要两个有数据的配置')
+
+    start = time.perf_counter()
+    names, dates, returns, periods_per_year = common_returns(series)
+    pairs = list(itertools.combinations(range(len(names)), 2))
+    result = paired_bootstrap(returns, pairs, args.resamples, args.block, args.confidence, args.seed,
+                              periods_per_year=periods_per_year)
+    table = comparison_table(names, pairs, result, args.confidence)
+
+    print("="*80)
+    print(f"配对平稳自助法: {len(names)} 个策略、{len(pairs)} 个策略对，{args.resamples} 次重抽样，平均块长 {args.block:g} 月")
+    print(f"共同区间: {dates[0].strftime('%Y-%m')} 至 {dates[-1].strftime('%Y-%m')}"
+          f"（{len(dates)} 个月，已剔除再平衡月）")
+    print("="*80)
+    print(table.round(3).to_string(index=False))
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    table.round(4).to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"\n✓ 结果已保存至: {args.output}")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    print("="*80)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+永久投资组合分析 - 统一命令行入口
+
+    python3 code/cli.py validate config/*.json
+    python3 code/cli.py analyze  config/保守型_config.json
+    python3 code/cli.py batch    config/*.json
+    python3 code/cli.py sweep    config/保守型_config.json --step 0.05 --order-by calmar
+    python3 code/cli.py charts   [prices|bars|monthly ...]
+    python3 code/cli.py compare  [config ...]
+    python3 code/cli.py watch    [config ...]
+    python3 code/cli.py export   [config ...] [--formats arrow parquet csv]
+
+pandas/numpy/matplotlib只在需要的子命令内导入，--help 和配置校验不加载这些库
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_PATH = os.path.dirname(CODE_DIR)
+
+
+def config_base_path(config_path):
+    """配置文件所在项目的根目录（config/的上一级）"""
+    return os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+
+
+def load_valid_configs(config_paths):
+    """读取并校验配置，有错误时打印并退出"""
+    from config_schema import validate_config
+
+    configs = []
+    failed = False
+    for config_path in config_paths:
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"✗ {config_path}: 无法读取配置: {e}")
+            failed = True
+            continue
+        errors = validate_config(config, config_base_path(config_path))
+        if errors:
+            failed = True
+            print(f"✗ {config_path}")
+            for error in errors:
+                print(f"    {error}")
+        else:
+            configs.append((config_path, config))
+    return configs, failed
+
+
+def cmd_validate(args):
+    configs, failed = load_valid_configs(args.configs)
+    for config_path, _ in configs:
+        print(f"✓ {config_path}")
+    return 1 if failed else 0
+
+
+def cmd_analyze(args):
+    configs, failed = load_valid_configs([args.config])
+    if failed:
+        return 1
+    from results_store import default_store_path, format_metric, open_store, save_results
+
+    config_path, config = configs[0]
+    base_path = config_base_path(config_path)
+    if args.no_store:
+        from 永久投资组合分析_配置版 import run_analysis
+        result = run_analysis(config, base_path, verbose=not args.quiet, save_csv=not args.no_csv,
+                              panel_cache_dir=args.panel_cache)
+        return 0 if result is not None else 1
+
+    from result_cache import cached_analysis
+    conn = open_store(default_store_path(base_path))
+    result, hit = cached_analysis(config, base_path, conn, force=args.force, verbose=not args.quiet,
+                                  save_csv=not args.no_csv, panel_cache_dir=args.panel_cache)
+    if hit:
+        s = result['summary']
+        print(f"✓ {s['portfolio_name']}: 配置和数据均未变化，使用缓存结果（--force 重新计算）")
+        print(f"  CAGR {format_metric(s['cagr'])}%  波动率 {format_metric(s['volatility'])}%  "
+              f"最大回撤 {format_metric(s['max_drawdown'])}%  Calmar {format_metric(s['calmar'])}")
+    elif result is not None:
+        save_results(conn, [result])
+    conn.close()
+    return 0 if result is not None else 1
+
+
+def cmd_batch(args):
+    configs, failed = load_valid_configs(args.configs)
+    if failed and not args.skip_invalid:
+        return 1
+    if not configs:
+        print("✗ 没有可用的配置")
+        return 1
+    from price_panel import AssetLoadError
+    from results_store import default_store_path, format_metric, open_store, save_results
+    from 永久投资组合分析_配置版 import load_asset_data, run_analysis
+
+    start = time.perf_counter()
+    load_data = load_asset_data
+    executor = None
+    if args.parse_processes:
+        from concurrent.futures import ProcessPoolExecutor
+        from data_loader import ProcessParsingLoader
+        executor = ProcessPoolExecutor(max_workers=args.parse_processes)
+        load_data = ProcessParsingLoader(executor)
+
+    # 结果缓存与结果库在同一库中，--no-store 时不使用缓存
+    conn = None
+    if not args.no_store:
+        from result_cache import cached_analysis
+        store_path = default_store_path(config_base_path(configs[0][0]))
+        conn = open_store(store_path)
+
+    results = []
+    cached = 0
+    try:
+        for config_path, config in configs:
+            options = dict(load_data=load_data, verbose=False, save_csv=not args.no_csv,
+                           panel_cache_dir=args.panel_cache)
+            try:
+                if conn is None:
+                    result, hit = run_analysis(config, config_base_path(config_path), **options), False
+                else:
+                    result, hit = cached_analysis(config, config_base_path(config_path), conn, force=args.force,
+                                                  **options)
+            except AssetLoadError as e:
+                print(f"✗ {config_path}")
+                for name, error in e.errors.items():
+                    print(f"    {name}: {error}")
+                continue
+            if result is None:
+                print(f"✗ {config_path}: 没有可用的资产数据")
+                continue
+            s = result['summary']
+            print(f"✓ {s['portfolio_name']:<16} CAGR {format_metric(s['cagr']):>6}%  "
+                  f"最大回撤 {format_metric(s['max_drawdown']):>7}%"
+                  + ("  （缓存）" if hit else ""))
+            if hit:
+                cached += 1
+            else:
+                results.append(result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if conn is not None:
+        save_results(conn, results)
+        conn.close()
+        print(f"\n✓ {len(results)} 个组合重新计算并写入结果库: {store_path}（{cached} 个使用缓存结果）")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def cmd_sweep(args):
+    configs, failed = load_valid_configs([args.config])
+    if failed:
+        return 1
+    from batch_engine import MIN_DRAWDOWN, weight_grid
+    from path_store import PathStore, simulate_to_store
+    from 永久投资组合分析_配置版 import annual_rebalance_mask, build_portfolio_df
+
+    config_path, config = configs[0]
+    start = time.perf_counter()
+    portfolio_df = build_portfolio_df(config, config_base_path(config_path),
+                                      log=lambda *a, **k: None, panel_cache_dir=args.panel_cache)
+    if portfolio_df is None:
+        print(f"✗ {config_path}: 没有可用的资产数据")
+        return 1
+    prices = portfolio_df.to_numpy()
+    candidates = weight_grid(prices.shape[1], args.step, args.max_weight)
+    # 只保留汇总指标，权重网格再大也只有一块路径在内存中
+    min_drawdown = MIN_DRAWDOWN if args.min_drawdown is None else args.min_drawdown
+    store = PathStore(portfolio_df.index, keep_paths=False, min_drawdown=min_drawdown)
+    metrics = simulate_to_store(prices, candidates, annual_rebalance_mask(portfolio_df.index), store).summary()
+
+    table = metrics.rename(columns={'cagr': 'CAGR(%)', 'volatility': '波动率(%)', 'max_drawdown': '最大回撤(%)',
+                                    'sharpe': 'Sharpe', 'calmar': 'Calmar'}).drop(columns='final_value')
+    for j, asset in reversed(list(enumerate(config['assets']))):
+        table.insert(0, asset['name'], (candidates[:, j] * 100).round(1))
+    if args.max_drawdown is not None:
+        table = table[table['最大回撤(%)'] > args.max_drawdown]
+    order = {'cagr': 'CAGR(%)', 'sharpe': 'Sharpe', 'calmar': 'Calmar'}[args.order_by]
+    table = table.sort_values(order, ascending=False).head(args.top)
+
+    print("="*80)
+    print(f"{config['portfolio_name']} 权重网格扫描: {len(candidates)} 组权重，按 {order} 排名前 {args.top}")
+    print("="*80)
+    print(table.round(2).to_string(index=False))
+    print(f"\n✓ 用时 {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+CHARTS = {
+    'prices': 'generate_charts',
+    'bars': 'generate_bar_charts',
+    'monthly': 'generate_monthly_returns_chart',
+}
+
+
+def cmd_charts(args):
+    import importlib
+
+    unknown = [name for name in args.charts if name not in CHARTS]
+    if unknown:
+        print(f"✗ 未知的图表: {', '.join(unknown)}（可选: {', '.join(CHARTS)}）")
+        return 1
+    for name in args.charts or list(CHARTS):
+        importlib.import_module(CHARTS[name]).main()
+    return 0
+
+
+def cmd_compare(args):
+    from generate_comparison_table import collect_series, comparison_table
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(BASE_PATH, 'config', '*.json')))
+    series = collect_series(config_paths, include_assets=not args.no_assets,
+                            include_portfolios=not args.no_portfolios)
+    final_df = comparison_table(series)
+    print(final_df.to_string(index=False, na_rep='-'))
+    final_df.to_csv(args.output, index=False, encoding='utf-8-sig', na_rep='-')
+    print(f"\n✓ 对比表已保存至: {args.output}")
+    return 0
+
+
+def cmd_watch(args):
+    from watch import Watcher
+
+    Watcher(args.configs, BASE_PATH, args.interval, args.debounce).run()
+    return 0
+
+
+def cmd_export(args):
+    config_paths = args.configs or sorted(glob.glob(os.path.join(BASE_PATH, 'config', '*.json')))
+    configs, failed = load_valid_configs(config_paths)
+    if failed and not args.skip_invalid:
+        return 1
+    from arrow_export import default_export_dir, export_configs
+    from results_store import default_store_path, open_store
+
+    # 数据文件、结果库和默认导出目录都相对各配置所在的项目目录，按项目分组导出
+    projects = {}
+    for config_path, config in configs:
+        projects.setdefault(config_base_path(config_path), []).append(config)
+    if args.output_dir and len(projects) > 1:
+        print("✗ 配置来自多个项目目录，汇总文件会互相覆盖，请不要指定 --output-dir")
+        return 1
+
+    start = time.perf_counter()
+    for base_path, project_configs in projects.items():
+        output_dir = args.output_dir or default_export_dir(base_path)
+        conn = None if args.no_store else open_store(default_store_path(base_path))
+        try:
+            written = export_configs(project_configs, base_path, output_dir, args.formats, conn)
+        finally:
+            if conn is not None:
+                conn.close()
+        print(f"✓ {len(written)} 个文件已导出至: {output_dir}")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description='永久投资组合分析')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('validate', help='校验配置文件')
+    p.add_argument('configs', nargs='+', help='配置文件路径')
+    p.set_defaults(func=cmd_validate)
+
+    p = subparsers.add_parser('analyze', help='分析单个配置（打印完整报表）')
+    p.add_argument('config', help='配置文件路径')
+    p.add_argument('--quiet', action='store_true', help='不打印过程信息')
+    p.add_argument('--no-csv', action='store_true', help='不保存综合分析表CSV')
+    p.add_argument('--no-store', action='store_true', help='不写入结果库（也不使用结果缓存）')
+    p.add_argument('--force', action='store_true', help='忽略结果缓存重新计算')
+    p.add_argument('--panel-cache', help='对齐面板磁盘缓存目录')
+    p.set_defaults(func=cmd_analyze)
+
+    p = subparsers.add_parser('batch', help='批量分析多个配置并写入结果库')
+    p.add_argument('configs', nargs='+', help='配置文件路径')
+    p.add_argument('--skip-invalid', action='store_true', help='跳过校验失败的配置')
+    p.add_argument('--parse-processes', type=int, default=0, help='用N个进程解析数据文件（默认在读取线程中解析）')
+    p.add_argument('--no-csv', action='store_true', help='不保存综合分析表CSV')
+    p.add_argument('--no-store', action='store_true', help='不写入结果库（也不使用结果缓存）')
+    p.add_argument('--force', action='store_true', help='忽略结果缓存重新计算')
+    p.add_argument('--panel-cache', help='对齐面板磁盘缓存目录')
+    p.set_defaults(func=cmd_batch)
+
+    p = subparsers.add_parser('sweep', help='在配置的资产上扫描权重网格')
+    p.add_argument('config', help='配置文件路径')
+    p.add_argument('--step', type=float, default=0.05, help='权重网格步长')
+    p.add_argument('--max-weight', type=float, default=1.0, help='单一资产权重上限')
+    p.add_argument('--max-drawdown', type=float, help='只保留最大回撤大于该值（%%，负数）的组合')
+    p.add_argument('--min-drawdown', type=float,
+                   help='Calmar中回撤绝对值的下限（%%，默认 batch_engine.MIN_DRAWDOWN），避免近乎无回撤的组合排在最前')
+    p.add_argument('--order-by', default='calmar', choices=['cagr', 'sharpe', 'calmar'], help='排序指标')
+    p.add_argument('--top', type=int, default=20, help='显示前N组')
+    p.add_argument('--panel-cache', help='对齐面板磁盘缓存目录')
+    p.set_defaults(func=cmd_sweep)
+
+    p = subparsers.add_parser('charts', help='生成指数图表')
+    p.add_argument('charts', nargs='*', default=[], help=f"要生成的图表（{'/'.join(CHARTS)}），默认全部")
+    p.set_defaults(func=cmd_charts)
+
+    p = subparsers.add_parser('compare', help='生成年化收益率横向对比表')
+    p.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    p.add_argument('--no-assets', action='store_true', help='不包含底层资产')
+    p.add_argument('--no-portfolios', action='store_true', help='不包含投资组合')
+    p.add_argument('--output', default=os.path.join(BASE_PATH, 'table', '年化收益率横向对比表.csv'),
+                   help='输出CSV路径')
+    p.set_defaults(func=cmd_compare)
+
+    p = subparsers.add_parser('watch', help='监视数据文件变化，后台重新计算受影响的组合和图表')
+    p.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    p.add_argument('--interval', type=float, default=2.0, help='检查间隔（秒）')
+    p.add_argument('--debounce', type=float, default=3.0, help='最后一次变化后等待的秒数')
+    p.set_defaults(func=cmd_watch)
+
+    p = subparsers.add_parser('export', help='导出价格面板、价值路径和指标为 Arrow IPC / Parquet')
+    p.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    p.add_argument('--formats', nargs='+', default=['arrow', 'parquet'], choices=['arrow', 'parquet', 'csv'],
+                   help='导出格式（csv为可选的人工查看格式）')
+    p.add_argument('--output-dir', help='导出目录（默认 永久投资组合/export）')
+    p.add_argument('--skip-invalid', action='store_true', help='跳过校验失败的配置')
+    p.add_argument('--no-store', action='store_true', help='不使用结果缓存，重新计算')
+    p.set_defaults(func=cmd_export)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置文件校验（只依赖标准库，命令行校验时无需导入pandas/numpy）
+"""
+
+import os
+
+# 对齐方式，见 price_panel
+ALIGNMENT_POLICIES = ('inner', 'ffill')
+
+# 权重方法，见 dynamic_weights
+WEIGHTING_METHODS = ('static', 'inverse_vol', 'risk_parity', 'min_variance', 'max_diversification')
+
+SERIES_FIELDS = ('data_file', 'date_format', 'date_column', 'price_column')
+
+# 杠杆/反向合成资产的可选年化参数，见 synthetic_assets
+LEVERAGED_FIELDS = ('cash_rate', 'borrow_spread', 'expense_ratio')
+
+
+def validate_config(config, base_path=None):
+    """
+    校验配置字典
+
+    参数:
+        config: 配置字典
+        base_path: 数据文件的基础路径（提供时检查data_file是否存在）
+
+    返回:
+        错误信息列表，为空表示校验通过
+    """
+    errors = []
+    for field in ('portfolio_name', 'rebalance_frequency', 'assets'):
+        if field not in config:
+            errors.append(f"缺少字段: {field}")
+
+    assets = config.get('assets')
+    if not isinstance(assets, list) or not assets:
+        errors.append("assets 必须是非空列表（旧版按象限命名的字典格式已不再支持）")
+        return errors
+
+    total_weight = 0.0
+    for i, asset in enumerate(assets):
+        label = f"资产{i + 1}({asset.get('name', '?')})"
+        for field in ('name', 'full_name', 'weight'):
+            if field not in asset:
+                errors.append(f"{label} 缺少字段: {field}")
+        weight = asset.get('weight', 0)
+        if not isinstance(weight, (int, float)) or weight < 0:
+            errors.append(f"{label} weight 必须是非负数")
+        else:
+            total_weight += weight
+
+        if asset.get('type') == 'cash':
+            if not isinstance(asset.get('annual_return'), (int, float)):
+                errors.append(f"{label} 现金资产需要数值型 annual_return")
+            continue
+
+        if asset.get('type') == 'leveraged':
+            leverage = asset.get('leverage')
+            if not isinstance(leverage, (int, float)) or isinstance(leverage, bool) or leverage == 0:
+                errors.append(f"{label} 杠杆资产需要非零数值型 leverage（如 2、3，反向为 -1）")
+            for field in LEVERAGED_FIELDS:
+                if field in asset and not isinstance(asset[field], (int, float)):
+                    errors.append(f"{label} {field} 必须是数值")
+
+        series = [('', asset)]
+        if asset.get('proxy') is not None:
+            series.append(('proxy.', asset['proxy']))
+        for prefix, spec in series:
+            for field in SERIES_FIELDS:
+                if not spec.get(field):
+                    errors.append(f"{label} 缺少字段: {prefix}{field}")
+            if base_path and spec.get('data_file') and \
+                    not os.path.exists(os.path.join(base_path, spec['data_file'])):
+                errors.append(f"{label} 数据文件不存在: {spec['data_file']}")
+
+    if abs(total_weight - 1.0) > 1e-6:
+        errors.append(f"权重之和为 {total_weight:.4f}，应为 1.0")
+
+    alignment = config.get('alignment') or {}
+    if alignment.get('policy', 'inner') not in ALIGNMENT_POLICIES:
+        errors.append(f"不支持的对齐方式: {alignment.get('policy')}（可选: {', '.join(ALIGNMENT_POLICIES)}）")
+
+    weighting = config.get('weighting') or {}
+    if weighting.get('method', 'static') not in WEIGHTING_METHODS:
+        errors.append(f"不支持的权重方法: {weighting.get('method')}（可选: {', '.join(WEIGHTING_METHODS)}）")
+
+    return errors
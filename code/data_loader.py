@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发数据加载
+get_aligned_panel 用线程池同时读取各数据文件（I/O）；资产多、文件大时，
+可再把CSV解析交给进程池（CPU），两者通过 load_data 接口组合:
+
+    with ProcessPoolExecutor() as executor:
+        run_analysis(config, base_path, load_data=ProcessParsingLoader(executor))
+
+本模块只依赖pandas，子进程中导入很轻
+"""
+
+import io
+import os
+
+import pandas as pd
+
+
+def parse_asset_csv(asset, content):
+    """
+    解析资产数据文件内容（保持文件中的行顺序）
+
+    参数:
+        asset: 资产配置（date_column/date_format/price_column）
+        content: 文件内容（bytes）或文件路径
+
+    返回:
+        DataFrame(Date, Price)
+    """
+    df = pd.read_csv(io.BytesIO(content) if isinstance(content, bytes) else content)
+
+    # 转换日期
+    df['Date'] = pd.to_datetime(df[asset['date_column']],
+                                 format=asset['date_format'])
+
+    # 转换价格
+    df['Price'] = df[asset['price_column']].astype(str).str.replace(',', '').astype(float)
+
+    return df[['Date', 'Price']]
+
+
+# 三大指数图表（cli.py charts）使用的数据文件，字段与配置中的资产相同
+INDEX_ASSETS = {
+    name: {'data_file': data_file, 'date_column': 'Date', 'date_format': '%m/%d/%Y', 'price_column': 'Price'}
+    for name, data_file in (('S&P 500 TR', 'data/S&P 500 TR Historical Data.csv'),
+                            ('Nasdaq 100 TR', 'data/Nasdaq 100 TR Historical Data.csv'),
+                            ('沪深300 TR', 'data/沪深300TR historical data.csv'))
+}
+
+
+def load_index_data(name, base_path):
+    """读取 INDEX_ASSETS 中的指数数据，返回按日期排序的 DataFrame(Date, Price)"""
+    asset = INDEX_ASSETS[name]
+    df = parse_asset_csv(asset, os.path.join(base_path, asset['data_file']))
+    return df.sort_values('Date').reset_index(drop=True)
+
+
+def read_file_bytes(asset, base_path):
+    """读取资产数据文件的原始内容"""
+    with open(os.path.join(base_path, asset['data_file']), 'rb') as f:
+        return f.read()
+
+
+class ProcessParsingLoader:
+    """
+    load_asset_data 的进程池版本：调用线程读取文件，解析在进程池中进行，
+    数据质量检查和排序仍在本进程完成，结果与 load_asset_data 完全相同
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def __call__(self, asset, base_path):
+        from data_quality import check_asset_data
+
+        if asset.get('type') == 'cash':
+            return None
+        content = read_file_bytes(asset, base_path)
+        df = self.executor.submit(parse_asset_csv, asset, content).result()
+        check_asset_data(asset, base_path, df['Date'], df['Price'])
+        return df.sort_values('Date')
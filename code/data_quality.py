@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据质量检查
+对原始数据文件（按文件中的行顺序）做向量化检查：
+    duplicates      重复日期
+    order           日期顺序（升序/降序均可，混乱时报告逆序位置）
+    gaps            超过阈值的日期间隔（阈值默认按中位间隔推断）
+    stale           连续多期价格完全相同
+    outliers        对数收益率的稳健z分数（中位数绝对偏差）超过阈值
+    invalid         缺失或非正的价格
+检查结果按 (数据文件, 列设置, 文件指纹, 检查参数) 缓存在 永久投资组合/data_quality.json，
+文件未变化时不再重复检查；load_asset_data 加载数据时自动执行
+
+用法:
+    python3 code/data_quality.py config/*.json [--rescan]
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from engine_meta import file_fingerprint
+
+DEFAULT_PARAMS = {
+    'gap_factor': 1.5,         # 间隔超过 gap_factor × 中位间隔 视为缺口
+    'min_gap_days': 5,         # 且至少超过该天数（日线数据的周末/假期不算缺口）
+    'stale_periods': 4,        # 连续相同价格达到该期数视为停滞
+    'outlier_threshold': 10.0,  # 稳健z分数阈值
+}
+
+# 进程内缓存：缓存文件路径 -> {条目键: 报告}
+_REPORT_CACHE = {}
+_REPORT_LOCK = threading.Lock()
+
+
+def default_cache_path(base_path):
+    """检查结果缓存文件路径"""
+    return os.path.join(base_path, '永久投资组合', 'data_quality.json')
+
+
+def _runs(mask):
+    """布尔数组中连续True区间的 (起点, 终点) 下标（含终点）"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[0::2], edges[1::2] - 1
+
+
+def scan_series(dates, prices, params=None):
+    """
+    检查一条价格序列
+
+    参数:
+        dates: 日期（文件中的原始行顺序）
+        prices: 与dates对应的价格
+        params: 检查参数，缺省项取 DEFAULT_PARAMS
+
+    返回:
+        报告字典（可JSON序列化），clean 为 True 表示未发现问题
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    raw_dates = pd.to_datetime(pd.Series(dates)).to_numpy().astype('datetime64[ns]')
+    raw_prices = np.asarray(prices, dtype=np.float64)
+    fmt = lambda d: str(np.datetime_as_string(d, unit='D'))
+
+    # 日期顺序：整体方向由首尾决定，逆着该方向的相邻行即为顺序错误
+    steps = np.diff(raw_dates.astype(np.int64))
+    descending = len(raw_dates) > 1 and raw_dates[-1] < raw_dates[0]
+    breaks = np.flatnonzero(steps > 0 if descending else steps < 0)
+
+    order = np.argsort(raw_dates, kind='stable')
+    sorted_dates = raw_dates[order]
+    sorted_prices = raw_prices[order]
+
+    duplicated = sorted_dates[1:] == sorted_dates[:-1]
+    duplicates = np.unique(sorted_dates[1:][duplicated])
+
+    invalid = ~np.isfinite(sorted_prices) | (sorted_prices <= 0)
+
+    # 以下检查基于去重、去无效值后的升序序列
+    keep = ~invalid & np.concatenate((~duplicated, [True]))
+    d = sorted_dates[keep]
+    p = sorted_prices[keep]
+
+    gap_days = np.diff(d).astype('timedelta64[D]').astype(np.int64)
+    gaps = []
+    if len(gap_days):
+        threshold = max(params['gap_factor'] * np.median(gap_days), params['min_gap_days'])
+        idx = np.flatnonzero(gap_days > threshold)
+        gaps = [[fmt(d[i]), fmt(d[i + 1]), int(gap_days[i])] for i in idx]
+
+    starts, ends = _runs(np.diff(p) == 0)
+    long_runs = ends - starts + 2 >= params['stale_periods']
+    stale = [[fmt(d[s]), fmt(d[e + 1]), int(e - s + 2)] for s, e in zip(starts[long_runs], ends[long_runs])]
+
+    outliers = []
+    if len(p) > 2:
+        log_returns = np.diff(np.log(p))
+        deviation = np.abs(log_returns - np.median(log_returns))
+        mad = np.median(deviation) * 1.4826
+        if mad > 0:
+            idx = np.flatnonzero(deviation / mad > params['outlier_threshold'])
+            outliers = [[fmt(d[i + 1]), round(float(np.expm1(log_returns[i]) * 100), 2)] for i in idx]
+
+    report = {
+        'rows': int(len(raw_dates)),
+        'start': fmt(sorted_dates[0]) if len(sorted_dates) else None,
+        'end': fmt(sorted_dates[-1]) if len(sorted_dates) else None,
+        'order': 'descending' if descending else 'ascending',
+        'order_breaks': [fmt(raw_dates[i + 1]) for i in breaks],
+        'duplicates': [fmt(x) for x in duplicates],
+        'invalid': [fmt(x) for x in sorted_dates[invalid]],
+        'gaps': gaps,
+        'stale': stale,
+        'outliers': outliers,
+        'params': params,
+    }
+    report['clean'] = not any(report[k] for k in ('order_breaks', 'duplicates', 'invalid', 'gaps', 'stale', 'outliers'))
+    return report
+
+
+def format_issues(report):
+    """报告中问题的可读描述列表"""
+    issues = []
+    if report['order_breaks']:
+        issues.append(f"日期顺序混乱 {len(report['order_breaks'])} 处（首处: {report['order_breaks'][0]}）")
+    if report['duplicates']:
+        issues.append(f"重复日期 {len(report['duplicates'])} 个: {', '.join(report['duplicates'][:5])}")
+    if report['invalid']:
+        issues.append(f"缺失或非正价格 {len(report['invalid'])} 个: {', '.join(report['invalid'][:5])}")
+    for start, end, days in report['gaps'][:5]:
+        issues.append(f"数据缺口 {start} → {end}（{days}天）")
+    for start, end, periods in report['stale'][:5]:
+        issues.append(f"价格停滞 {start} → {end}（连续{periods}期相同）")
+    for date, change in report['outliers'][:5]:
+        issues.append(f"异常收益 {date}: {change:+.2f}%")
+    hidden = sum(max(len(report[k]) - 5, 0) for k in ('gaps', 'stale', 'outliers'))
+    if hidden:
+        issues.append(f"另有 {hidden} 处缺口/停滞/异常收益未列出")
+    return issues
+
+
+def _entry_key(asset):
+    return '|'.join([asset['data_file'], asset['date_column'], asset['date_format'], asset['price_column']])
+
+
+def _load_cache(cache_file):
+    if cache_file not in _REPORT_CACHE:
+        entries = {}
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+        _REPORT_CACHE[cache_file] = entries
+    return _REPORT_CACHE[cache_file]
+
+
+def _save_cache(cache_file, entries):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = cache_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_file, cache_file)
+
+
+def check_asset_data(asset, base_path, dates, prices, params=None, cache_file=None, rescan=False, log=print):
+    """
+    检查资产数据，文件指纹和参数未变时直接返回缓存的报告；新检查出问题时打印警告
+
+    参数:
+        asset: 资产配置（data_file/date_column/date_format/price_column）
+        base_path: 数据文件的基础路径
+        dates, prices: 已解析的日期和价格（文件中的原始行顺序）
+        params: 检查参数
+        cache_file: 缓存文件（默认 永久投资组合/data_quality.json）
+        rescan: 忽略缓存重新检查
+        log: 日志输出函数
+
+    返回:
+        报告字典
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    cache_file = cache_file or default_cache_path(base_path)
+    fingerprint = list(file_fingerprint(os.path.join(base_path, asset['data_file'])))
+    key = _entry_key(asset)
+
+    with _REPORT_LOCK:
+        entries = _load_cache(cache_file)
+        cached = entries.get(key)
+        if not rescan and cached and cached['fingerprint'] == fingerprint and cached['params'] == params:
+            return cached
+
+    report = scan_series(dates, prices, params)
+    report['file'] = asset['data_file']
+    report['fingerprint'] = fingerprint
+    if not report['clean']:
+        log(f"⚠ 数据质量: {asset['data_file']}")
+        for issue in format_issues(report):
+            log(f"    {issue}")
+
+    with _REPORT_LOCK:
+        entries[key] = report
+        try:
+            _save_cache(cache_file, entries)
+        except OSError as e:
+            log(f"⚠ 无法写入数据质量缓存 {cache_file}: {e}")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from 永久投资组合分析_配置版 import load_config, read_asset_file
+
+    parser = argparse.ArgumentParser(description='检查配置引用的数据文件质量')
+    parser.add_argument('configs', nargs='+', help='配置文件路径')
+    parser.add_argument('--rescan', action='store_true', help='忽略缓存重新检查')
+    args = parser.parse_args()
+
+    seen = set()
+    for config_path in args.configs:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            continue
+        specs = [a for a in config['assets'] if a.get('type') != 'cash']
+        specs += [a['proxy'] for a in specs if a.get('proxy')]
+        for asset in specs:
+            key = (base_path, _entry_key(asset))
+            if key in seen:
+                continue
+            seen.add(key)
+            df = read_asset_file(asset, base_path)
+            report = check_asset_data(asset, base_path, df['Date'], df['Price'],
+                                      rescan=args.rescan, log=lambda *a, **k: None)
+            status = '✓' if report['clean'] else '⚠'
+            print(f"{status} {asset['data_file']}  {report['rows']}行  {report['start']} ~ {report['end']}  "
+                  f"({'降序' if report['order'] == 'descending' else '升序'})")
+            for issue in format_issues(report):
+                print(f"    {issue}")
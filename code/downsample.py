@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+时间序列降采样（Largest-Triangle-Three-Buckets）
+绘图前把长序列降到固定点数，保留峰谷等视觉特征，绘图时间不随历史长度增长
+"""
+
+import numpy as np
+import pandas as pd
+
+# 默认最多绘制的点数（14英寸宽、300dpi约4200像素，每像素半个点已足够）
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb_indices(x, y, threshold):
+    """
+    LTTB降采样，返回保留点的下标（首尾必保留）
+
+    参数:
+        x: (T,) 数值型横坐标（单调递增）
+        y: (T,) 纵坐标
+        threshold: 保留点数
+
+    返回:
+        (threshold,) 下标数组；T <= threshold 时返回全部下标
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 中间 n-2 个点均分为 threshold-2 个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # 每个桶的"下一桶平均点"可预先向量化算好
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    avg_x = (cum_x[next_end] - cum_x[next_start]) / (next_end - next_start)
+    avg_y = (cum_y[next_end] - cum_y[next_start]) / (next_end - next_start)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 与上一选中点、下一桶平均点构成的三角形面积最大的点
+        area = np.abs((x[a] - avg_x[i]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df, date_col, value_col, max_points=DEFAULT_MAX_POINTS):
+    """
+    对DataFrame按日期列和数值列做LTTB降采样（缺失值先去掉）
+
+    返回:
+        降采样后的DataFrame（行数不超过max_points）
+    """
+    df = df.dropna(subset=[value_col])
+    if len(df) <= max_points:
+        return df
+    x = pd.to_datetime(df[date_col]).to_numpy().astype('datetime64[ns]').astype(np.int64)
+    return df.iloc[lttb_indices(x, df[value_col].to_numpy(), max_points)]
+
+
+def yearly_label_points(df, date_col, month=1):
+    """每年指定月份的第一个数据点（用于柱状图年度标注）"""
+    dates = pd.to_datetime(df[date_col])
+    in_month = df[dates.dt.month == month]
+    return in_month.groupby(dates[dates.dt.month == month].dt.year).head(1)
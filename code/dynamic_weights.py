@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动态权重策略
+在每个再平衡点用过去一段时间的收益率重新计算目标权重：
+    inverse_vol           波动率倒数加权
+    risk_parity           风险平价（各资产风险贡献相等）
+    min_variance          最小方差（只做多）
+    max_diversification   最大分散化（只做多）
+所有再平衡点的求解按批量 (K, N, N) 数组同时进行
+
+配置示例（现金资产保持配置权重，其余权重在非现金资产间动态分配）:
+    "weighting": {"method": "risk_parity", "lookback": 36, "min_periods": 12}
+
+用法（同一批次对比静态权重和各动态权重版本）:
+    python3 code/dynamic_weights.py config/永久投资组合_美债版_config.json
+"""
+
+import copy
+
+import numpy as np
+
+from config_schema import WEIGHTING_METHODS
+from engine_meta import normalize_weighting, weighting_label
+from rolling_covariance import panel_returns, rolling_covariance
+
+WEIGHTING_NAMES = {
+    'static': '固定权重',
+    'inverse_vol': '波动率倒数',
+    'risk_parity': '风险平价',
+    'min_variance': '最小方差',
+    'max_diversification': '最大分散化',
+}
+
+
+def project_to_simplex(v):
+    """批量投影到概率单纯形 {w >= 0, sum(w) = 1}，v: (K, N)"""
+    K, N = v.shape
+    u = -np.sort(-v, axis=1)
+    css = np.cumsum(u, axis=1) - 1
+    ind = np.arange(1, N + 1)
+    rho = np.sum(u - css / ind > 0, axis=1)
+    theta = css[np.arange(K), rho - 1] / rho
+    return np.maximum(v - theta[:, None], 0)
+
+
+def inverse_volatility_weights(cov):
+    """cov: (K, N, N) -> (K, N)"""
+    inv_vol = 1 / np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    return inv_vol / inv_vol.sum(axis=1, keepdims=True)
+
+
+def min_variance_weights(cov, iterations=5000, tolerance=1e-10):
+    """
+    只做多最小方差：批量加速投影梯度（Nesterov动量，目标上升方向时重置动量），步长取 1/(2·最大特征值)
+    普通投影梯度的收敛速度与条件数成反比，病态协方差下固定迭代次数会停在明显次优的解
+
+    参数:
+        cov: (K, N, N) 协方差
+        iterations: 最大迭代次数
+        tolerance: 所有再平衡点的权重变化都小于该值时提前结束；达到最大迭代次数仍未收敛时打印提示
+
+    返回:
+        (K, N) 权重
+    """
+    K, N, _ = cov.shape
+    step = 1 / (2 * np.linalg.eigvalsh(cov)[:, -1])
+    w = np.full((K, N), 1 / N)
+    y = w
+    t = np.ones(K)
+    for _ in range(iterations):
+        gradient = 2 * np.einsum('kij,kj->ki', cov, y)
+        updated = project_to_simplex(y - step[:, None] * gradient)
+        change = np.abs(updated - w).max()
+        restart = np.einsum('ki,ki->k', y - updated, updated - w) > 0
+        t_next = np.where(restart, 1.0, (1 + np.sqrt(1 + 4 * t ** 2)) / 2)
+        y = updated + ((np.where(restart, 1.0, t) - 1) / t_next)[:, None] * (updated - w)
+        w, t = updated, t_next
+        if change < tolerance:
+            break
+    else:
+        print(f"⚠ 最小方差求解在 {iterations} 次迭代内未收敛（最大权重变化 {change:.1e}）")
+    return w
+
+
+def risk_parity_weights(cov, sweeps=20000, tolerance=1e-8):
+    """
+    风险平价：批量循环坐标下降（求解 min ½x'Σx - Σ ln(x_i)/N，再归一化）
+    每个坐标的闭式解 x_i = (-c_i + sqrt(c_i² + 4σ_ii/N)) / (2σ_ii)，c_i = Σ_{j≠i} Σ_ij x_j
+    病态协方差下坐标下降收敛很慢，按风险贡献的偏差判断收敛，而不是固定轮数
+
+    参数:
+        cov: (K, N, N) 协方差
+        sweeps: 最大轮数（每轮依次更新全部坐标）
+        tolerance: 所有再平衡点的风险贡献占比与 1/N 的偏差都小于该值时提前结束；达到最大轮数仍未收敛时打印提示
+
+    返回:
+        (K, N) 权重
+    """
+    K, N, _ = cov.shape
+    diag = np.diagonal(cov, axis1=1, axis2=2)
+    x = 1 / np.sqrt(diag)
+    # 只继续迭代尚未收敛的再平衡点
+    active = np.arange(K)
+    for _ in range(sweeps):
+        sigma, d, xa = cov[active], diag[active], x[active]
+        for i in range(N):
+            c = np.einsum('kj,kj->k', sigma[:, i, :], xa) - d[:, i] * xa[:, i]
+            xa[:, i] = (-c + np.sqrt(c ** 2 + 4 * d[:, i] / N)) / (2 * d[:, i])
+        x[active] = xa
+        contributions = xa * np.einsum('kij,kj->ki', sigma, xa)
+        error = np.abs(contributions / contributions.sum(axis=1, keepdims=True) - 1 / N).max(axis=1)
+        active = active[error >= tolerance]
+        if len(active) == 0:
+            break
+    else:
+        print(f"⚠ 风险平价求解在 {sweeps} 轮内未收敛（{len(active)} 个再平衡点，风险贡献最大偏差 {error.max():.1e}）")
+    return x / x.sum(axis=1, keepdims=True)
+
+
+def max_diversification_weights(cov, iterations=5000, tolerance=1e-10):
+    """最大分散化：在相关系数矩阵上求最小方差，再按波动率倒数缩放"""
+    vol = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    corr = cov / (vol[:, :, None] * vol[:, None, :])
+    w = min_variance_weights(corr, iterations, tolerance) / vol
+    return w / w.sum(axis=1, keepdims=True)
+
+
+SOLVERS = {
+    'inverse_vol': inverse_volatility_weights,
+    'risk_parity': risk_parity_weights,
+    'min_variance': min_variance_weights,
+    'max_diversification': max_diversification_weights,
+}
+
+
+def rebalance_weights(config, prices, rebalance_mask):
+    """
+    计算每个再平衡点的目标权重
+
+    参数:
+        config: 配置字典（assets顺序与prices列一致）
+        prices: (T, N) 价格数组
+        rebalance_mask: (T,) 再平衡点
+
+    返回:
+        静态权重时为 (N,)；动态权重时为 (K, N)，K为再平衡次数（含首次建仓）。
+        回看数据不足的再平衡点使用配置权重
+    """
+    static = np.array([asset['weight'] for asset in config['assets']], dtype=np.float64)
+    method, lookback, min_periods = normalize_weighting(config.get('weighting'))
+    if method == 'static':
+        return static
+
+    risky = np.array([asset.get('type') != 'cash' for asset in config['assets']])
+    starts = np.flatnonzero(rebalance_mask)
+    weights = np.tile(static, (len(starts), 1))
+    if risky.sum() < 2:
+        return weights
+
+    # 第t行价格对应第t-1个收益率，再平衡点t只用截至t的收益率
+    cov = rolling_covariance(panel_returns(np.asarray(prices)[:, risky]), window=lookback,
+                             min_periods=min_periods)
+    usable = starts >= 1
+    rows = np.flatnonzero(usable)
+    cov_at = cov[starts[usable] - 1]
+    valid = ~np.isnan(cov_at).any(axis=(1, 2)) & (np.diagonal(cov_at, axis1=1, axis2=2) > 0).all(axis=1)
+    rows = rows[valid]
+    if len(rows) == 0:
+        return weights
+
+    solved = SOLVERS[method](cov_at[valid])
+    risky_budget = static[risky].sum()
+    risky_rows = weights[rows]
+    risky_rows[:, risky] = solved * risky_budget
+    weights[rows] = risky_rows
+    return weights
+
+
+def weighting_variants(config, lookback=36):
+    """生成配置的各权重方法版本（含原静态版本）"""
+    variants = []
+    for method in WEIGHTING_METHODS:
+        variant = copy.deepcopy(config)
+        if method != 'static':
+            variant['weighting'] = {'method': method, 'lookback': lookback}
+            variant['portfolio_name'] = f"{config['portfolio_name']}_{WEIGHTING_NAMES[method]}"
+        variants.append(variant)
+    return variants
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+    import pandas as pd
+    from 永久投资组合分析_配置版 import load_config, run_analysis
+
+    parser = argparse.ArgumentParser(description='对比配置在不同权重方法下的表现')
+    parser.add_argument('configs', nargs='+', help='配置文件路径')
+    parser.add_argument('--lookback', type=int, default=36, help='回看期数（月）')
+    args = parser.parse_args()
+
+    rows = []
+    start = time.perf_counter()
+    for config_path in args.configs:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+        for variant in weighting_variants(load_config(config_path), args.lookback):
+            s = run_analysis(variant, base_path, verbose=False, save_csv=False)['summary']
+            rows.append({
+                '组合': s['portfolio_name'],
+                'CAGR(%)': s['cagr'],
+                '波动率(%)': s['volatility'],
+                '最大回撤(%)': s['max_drawdown'],
+                'Sharpe': s['sharpe'],
+                'Calmar': s['calmar'],
+            })
+
+    print("="*80)
+    print("权重方法对比")
+    print("="*80)
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+    print(f"\n✓ {len(rows)} 个组合，用时 {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+有效前沿
+以 config/*.json 引用的全部资产（按数据序列去重，现金按年化收益率去重）为资产池，
+在只做多、单一资产权重上限的约束下枚举权重网格，按主程序的年度再平衡规则批量模拟，
+取 CAGR 对 波动率 / 最大回撤 的帕累托前沿，并标出各现有配置相对前沿的位置
+
+可选 --refine：用均值-方差二次规划（批量投影梯度，带权重上限）在网格之间补充前沿点，
+求出的权重同样经过模拟后再并入前沿
+
+所有候选和配置都在资产池的共同区间（对齐面板）上评估，配置的指标因此可能与其单独分析的结果不同；
+动态权重配置按配置中的静态权重计
+
+用法:
+    python3 code/efficient_frontier.py                                  # config/下全部配置
+    python3 code/efficient_frontier.py --step 0.05 --max-weight 0.4 --refine
+"""
+
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 使用非交互式后端
+import matplotlib.pyplot as plt
+import warnings
+warnings.filterwarnings('ignore')
+
+from batch_engine import path_metrics, simulate_rebalance_batch, weight_grid
+from path_store import PathStore, simulate_to_store
+from price_panel import asset_key
+from synthetic_assets import with_cash_rate
+
+# 设置中文字体
+plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # Mac系统中文字体
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+# 前沿的风险维度：指标名 -> 显示名称
+RISK_MEASURES = {'volatility': '波动率', 'max_drawdown': '最大回撤'}
+RISK_AXIS_LABELS = {'volatility': '年化波动率 (%)', 'max_drawdown': '最大回撤绝对值 (%)'}
+
+
+def _universe_key(asset):
+    return ('cash', asset['annual_return']) if asset.get('type') == 'cash' else asset_key(asset)
+
+
+def frontier_universe(configs):
+    """
+    配置引用的全部资产（按序列去重；简称重复时加序号区分）
+
+    返回:
+        资产配置列表（weight置0，可直接作为 build_portfolio_df 的 assets）
+    """
+    universe = {}
+    for config in configs:
+        for asset in with_cash_rate(config['assets']):
+            universe.setdefault(_universe_key(asset), dict(asset, weight=0.0))
+    assets = list(universe.values())
+    seen = {}
+    for asset in assets:
+        count = seen.get(asset['name'], 0)
+        seen[asset['name']] = count + 1
+        if count:
+            asset['name'] = f"{asset['name']}_{count + 1}"
+    return assets
+
+
+def config_weights(config, universe):
+    """把配置的权重映射到资产池的列上，返回 (N,) 数组"""
+    columns = {_universe_key(asset): j for j, asset in enumerate(universe)}
+    weights = np.zeros(len(universe))
+    for asset in with_cash_rate(config['assets']):
+        weights[columns[_universe_key(asset)]] += asset['weight']
+    return weights
+
+
+def pareto_frontier(risk, returns):
+    """
+    帕累托前沿（风险越低、收益越高越好）
+
+    返回:
+        前沿点的下标，按风险升序
+    """
+    order = np.lexsort((-returns, risk))
+    sorted_returns = returns[order]
+    best_before = np.concatenate(([-np.inf], np.maximum.accumulate(sorted_returns)[:-1]))
+    return order[sorted_returns > best_before]
+
+
+def project_to_capped_simplex(v, cap=1.0, iterations=60):
+    """批量投影到 {0 <= w <= cap, sum(w) = 1}（对平移量二分），v: (K, N)"""
+    low = (v.min(axis=1) - cap)[:, None]
+    high = v.max(axis=1)[:, None]
+    for _ in range(iterations):
+        theta = (low + high) / 2
+        over = np.clip(v - theta, 0, cap).sum(axis=1, keepdims=True) > 1
+        low = np.where(over, theta, low)
+        high = np.where(over, high, theta)
+    return np.clip(v - (low + high) / 2, 0, cap)
+
+
+def mean_variance_weights(mean, cov, risk_aversion, cap=1.0, iterations=2000, tolerance=1e-9):
+    """
+    批量求解 max μ'w - λ/2 · w'Σw（只做多、权重上限、和为1），每个λ一组权重
+
+    参数:
+        mean: (N,) 期望收益
+        cov: (N, N) 协方差
+        risk_aversion: (K,) 风险厌恶系数λ
+        cap: 单一资产权重上限
+        tolerance: 所有λ的权重变化都小于该值时提前结束
+
+    返回:
+        (K, N) 权重
+    """
+    risk_aversion = np.asarray(risk_aversion, dtype=np.float64)
+    K, N = len(risk_aversion), len(mean)
+    step = 1 / (risk_aversion * np.linalg.eigvalsh(cov)[-1] + 1e-12)
+    w = project_to_capped_simplex(np.full((K, N), 1 / N), cap)
+    for _ in range(iterations):
+        gradient = mean[None, :] - risk_aversion[:, None] * (w @ cov)
+        updated = project_to_capped_simplex(w + step[:, None] * gradient, cap)
+        converged = np.abs(updated - w).max() < tolerance
+        w = updated
+        if converged:
+            break
+    return w
+
+
+def refine_candidates(prices, cap=1.0, points=40):
+    """由月度收益的均值和协方差求一组均值-方差前沿权重（λ按对数均匀取值）"""
+    returns = prices[1:] / prices[:-1] - 1
+    return mean_variance_weights(returns.mean(axis=0), np.cov(returns, rowvar=False),
+                                 np.logspace(-1, 3, points), cap)
+
+
+def compute_frontier(dates, prices, rebalance_mask, step=0.05, max_weight=1.0, refine=False, points=40):
+    """
+    评估权重网格（及可选的二次规划候选）并求前沿
+
+    参数:
+        dates: (T,) 日期
+        prices: (T, N) 资产池价格
+        rebalance_mask: (T,) 再平衡点
+        step: 网格步长
+        max_weight: 单一资产权重上限
+        refine: 是否加入均值-方差二次规划候选
+        points: 二次规划候选数
+
+    返回:
+        candidates (M, N), metrics（每个候选一行的指标 DataFrame，含 source 列），
+        frontiers {风险指标: 前沿下标}
+    """
+    n_assets = prices.shape[1]
+    if max_weight * n_assets < 1 - 1e-9:
+        raise ValueError(f"权重上限 {max_weight} × {n_assets} 个资产不足100%")
+    candidates = weight_grid(n_assets, step, max_weight)
+    sources = np.full(len(candidates), '网格', dtype=object)
+    if refine:
+        refined = refine_candidates(prices, max_weight, points)
+        candidates = np.vstack([candidates, refined])
+        sources = np.concatenate([sources, np.full(len(refined), '二次规划', dtype=object)])
+
+    # 只保留汇总指标，候选再多也只有一块路径在内存中
+    store = PathStore(dates, keep_paths=False)
+    metrics = simulate_to_store(prices, candidates, rebalance_mask, store).summary().reset_index(drop=True)
+    metrics['source'] = sources
+
+    cagr = metrics['cagr'].to_numpy()
+    frontiers = {
+        'volatility': pareto_frontier(metrics['volatility'].to_numpy(), cagr),
+        'max_drawdown': pareto_frontier(-metrics['max_drawdown'].to_numpy(), cagr),
+    }
+    return candidates, metrics, frontiers
+
+
+def config_positions(configs, universe, prices, rebalance_mask, metrics, frontiers):
+    """
+    各配置在资产池共同区间上的指标，以及同等风险下前沿的CAGR和差距
+
+    返回:
+        DataFrame，每个配置一行
+    """
+    weights = np.array([config_weights(config, universe) for config in configs])
+    stats = path_metrics(simulate_rebalance_batch(prices, weights, rebalance_mask))
+    table = pd.DataFrame({
+        '组合': [config['portfolio_name'] for config in configs],
+        'CAGR(%)': stats['cagr'],
+        '波动率(%)': stats['volatility'],
+        '最大回撤(%)': stats['max_drawdown'],
+        'Sharpe': stats['sharpe'],
+    })
+    cagr = metrics['cagr'].to_numpy()
+    for measure, label in RISK_MEASURES.items():
+        index = frontiers[measure]
+        risk = np.abs(metrics[measure].to_numpy()[index])
+        frontier_cagr = np.interp(np.abs(stats[measure]), risk, cagr[index])
+        table[f'同{label}前沿CAGR(%)'] = frontier_cagr
+        table[f'距{label}前沿(%)'] = stats['cagr'] - frontier_cagr
+    return table
+
+
+def frontier_table(candidates, metrics, frontiers, universe):
+    """前沿点的权重和指标（两个风险维度合并，带 前沿 列）"""
+    frames = []
+    for measure, label in RISK_MEASURES.items():
+        index = frontiers[measure]
+        frame = pd.DataFrame(candidates[index] * 100, columns=[a['name'] for a in universe]).round(1)
+        frame.insert(0, '前沿', f'CAGR-{label}')
+        frame['CAGR(%)'] = metrics['cagr'].to_numpy()[index]
+        frame['波动率(%)'] = metrics['volatility'].to_numpy()[index]
+        frame['最大回撤(%)'] = metrics['max_drawdown'].to_numpy()[index]
+        frame['Sharpe'] = metrics['sharpe'].to_numpy()[index]
+        frame['来源'] = metrics['source'].to_numpy()[index]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def plot_frontier(metrics, frontiers, positions, title, output, max_points=20000):
+    """
+    绘制 CAGR-波动率 与 CAGR-最大回撤 两张前沿图，候选为灰色散点，现有配置为红色星号
+
+    参数:
+        metrics: compute_frontier 的候选指标
+        frontiers: compute_frontier 的前沿下标
+        positions: config_positions 的结果
+        title: 图表标题
+        output: 输出图片路径
+        max_points: 最多绘制的候选散点数（超出时等间隔抽样）
+    """
+    fig, axes = plt.subplots(1, 2, figsize=(20, 8))
+    shown = metrics.iloc[::max(1, len(metrics) // max_points)]
+    cagr = metrics['cagr'].to_numpy()
+    for ax, (measure, label) in zip(axes, RISK_MEASURES.items()):
+        risk = np.abs(metrics[measure].to_numpy())
+        ax.scatter(np.abs(shown[measure]), shown['cagr'], s=4, color='#BBBBBB', alpha=0.4, label='候选组合')
+        index = frontiers[measure]
+        ax.plot(risk[index], cagr[index], color='#2E86AB', linewidth=2.5, label='有效前沿')
+        refined = index[metrics['source'].to_numpy()[index] == '二次规划']
+        if len(refined):
+            ax.scatter(risk[refined], cagr[refined], s=18, color='#2E86AB', zorder=3, label='二次规划点')
+        ax.scatter(np.abs(positions[f'{label}(%)']), positions['CAGR(%)'], marker='*', s=250, color='#C73E1D',
+                   edgecolor='black', zorder=4, label='现有配置')
+        for _, row in positions.iterrows():
+            ax.annotate(row['组合'], (abs(row[f'{label}(%)']), row['CAGR(%)']), xytext=(6, 6),
+                        textcoords='offset points', fontsize=11)
+        ax.set_xlabel(RISK_AXIS_LABELS[measure], fontsize=14, fontweight='bold')
+        ax.set_ylabel('CAGR (%)', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.set_axisbelow(True)
+        ax.legend(fontsize=11, loc='lower right')
+    fig.suptitle(title, fontsize=18, fontweight='bold')
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from 永久投资组合分析_配置版 import annual_rebalance_mask, build_portfolio_df, load_config
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='配置资产池的有效前沿（CAGR对波动率/最大回撤）')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--step', type=float, default=0.05, help='权重网格步长')
+    parser.add_argument('--max-weight', type=float, default=1.0, help='单一资产权重上限')
+    parser.add_argument('--refine', action='store_true', help='加入均值-方差二次规划求出的前沿点')
+    parser.add_argument('--points', type=int, default=40, help='二次规划的前沿点数')
+    parser.add_argument('--no-charts', action='store_true', help='只输出表格，不绘图')
+    parser.add_argument('--graph-dir', default=os.path.join(base_path, 'graph'), help='图表输出目录')
+    parser.add_argument('--table-dir', default=os.path.join(base_path, 'table'), help='表格输出目录')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+    configs = []
+    for config_path in config_paths:
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        configs.append(config)
+
+    start = time.perf_counter()
+    universe = frontier_universe(configs)
+    portfolio_df = build_portfolio_df({'assets': universe}, base_path, log=lambda *args, **kwargs: None)
+    prices = portfolio_df.to_numpy()
+    rebalance_mask = annual_rebalance_mask(portfolio_df.index)
+
+    candidates, metrics, frontiers = compute_frontier(portfolio_df.index, prices, rebalance_mask, args.step, args.max_weight,
+                                                      args.refine, args.points)
+    positions = config_positions(configs, universe, prices, rebalance_mask, metrics, frontiers)
+    frontier = frontier_table(candidates, metrics, frontiers, universe)
+
+    print("="*80)
+    print(f"有效前沿: {len(universe)} 个资产（{', '.join(a['name'] for a in universe)}），"
+          f"{len(candidates)} 个候选，权重上限 {args.max_weight:.0%}")
+    print(f"共同区间: {portfolio_df.index[0].strftime('%Y-%m')} 至 {portfolio_df.index[-1].strftime('%Y-%m')}")
+    print("="*80)
+    print("\n现有配置相对前沿的位置:")
+    print(positions.round(2).to_string(index=False))
+    for measure, label in RISK_MEASURES.items():
+        print(f"\nCAGR-{label} 前沿（{len(frontiers[measure])} 个点）:")
+        print(frontier[frontier['前沿'] == f'CAGR-{label}'].drop(columns='前沿').round(2).to_string(index=False))
+
+    os.makedirs(args.table_dir, exist_ok=True)
+    frontier.round(2).to_csv(os.path.join(args.table_dir, '有效前沿.csv'), index=False, encoding='utf-8-sig')
+    positions.round(2).to_csv(os.path.join(args.table_dir, '有效前沿_配置位置.csv'), index=False,
+                              encoding='utf-8-sig')
+    print(f"\n✓ 表格已保存至: {args.table_dir}")
+    if not args.no_charts:
+        output = os.path.join(args.graph_dir, '有效前沿.png')
+        plot_frontier(metrics, frontiers, positions, '配置资产池有效前沿', output)
+        print(f"✓ 前沿图已保存至: {output}")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    print("="*80)
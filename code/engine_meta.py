@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+计算引擎的元信息（只依赖标准库）
+引擎版本、数据文件指纹、权重方法标识和结果文件名；结果缓存命中时只需要这些，
+不必导入 pandas/numpy 和计算引擎本身
+"""
+
+import os
+
+from config_schema import WEIGHTING_METHODS
+
+# 计算引擎版本：计算口径变化时加1，使结果缓存失效
+ENGINE_VERSION = 3
+
+
+def file_fingerprint(file_path):
+    """数据文件指纹（修改时间 + 大小）"""
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def normalize_weighting(weighting):
+    """解析权重配置，返回 (method, lookback, min_periods)"""
+    weighting = weighting or {}
+    method = weighting.get('method', 'static')
+    if method not in WEIGHTING_METHODS:
+        raise ValueError(f"不支持的权重方法: {method}（可选: {', '.join(WEIGHTING_METHODS)}）")
+    lookback = int(weighting.get('lookback', 36))
+    min_periods = int(weighting.get('min_periods', min(12, lookback)))
+    return method, lookback, min_periods
+
+
+def weighting_label(config):
+    """权重方法的简短标识（用于文件名），静态权重返回空字符串"""
+    method, lookback, _ = normalize_weighting(config.get('weighting'))
+    return '' if method == 'static' else f"{method}{lookback}"
+
+
+def generate_filename(config):
+    """根据配置生成文件名"""
+    parts = []
+
+    for asset in config['assets']:
+        name = asset['name']
+        weight = int(asset['weight'] * 100)
+        parts.append(f"{name}{weight}")
+
+    # 动态权重策略追加方法标识，避免与静态权重版本重名
+    label = weighting_label(config)
+    if label:
+        parts.append(label)
+
+    filename = '_'.join(parts) + '.csv'
+    return filename
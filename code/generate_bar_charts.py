@@ -5,6 +5,8 @@
 每个指数一张独立的柱状图，从0开始，独立比例尺
 """
 
+import os
+
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
@@ -14,130 +16,125 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_loader import load_index_data
+from downsample import downsample, yearly_label_points
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']
 plt.rcParams['axes.unicode_minus'] = False
 
-print("="*80)
-print("开始生成三大指数各自的柱状图")
-print("="*80)
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    print("="*80)
+    print("开始生成三大指数各自的柱状图")
+    print("="*80)
+
+    # 读取原始数据
+    sp500_df = load_index_data('S&P 500 TR', BASE_PATH)
+    nasdaq_df = load_index_data('Nasdaq 100 TR', BASE_PATH)
+    csi300_df = load_index_data('沪深300 TR', BASE_PATH)
+
+    # 将沪深300转换为月度数据
+    csi300_df['YearMonth'] = csi300_df['Date'].dt.to_period('M')
+    csi300_monthly = csi300_df.groupby('YearMonth').last().reset_index()
+
+    print(f"数据点: S&P 500={len(sp500_df)}, Nasdaq 100={len(nasdaq_df)}, 沪深300={len(csi300_monthly)}")
+
+    # 绘图前降采样（LTTB），日线数据跨越数十年时绘图耗时保持不变
+    sp500_plot = downsample(sp500_df, 'Date', 'Price')
+    nasdaq_plot = downsample(nasdaq_df, 'Date', 'Price')
+    csi300_plot = downsample(csi300_monthly, 'Date', 'Price')
+
+    # ==================== 创建一个包含3个子图的图表 ====================
+    print("\n生成三合一柱状图...")
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(16, 20))
+
+    # ==================== 子图1: S&P 500 ====================
+
+    ax1.bar(sp500_plot['Date'], sp500_plot['Price'], width=20, 
+            color='#1f77b4', alpha=0.8, edgecolor='#0d5a8f', linewidth=0.5)
+
+    ax1.set_title('S&P 500 总回报指数价格走势（月度）', fontsize=20, fontweight='bold', pad=20)
+    ax1.set_xlabel('日期', fontsize=14, fontweight='bold')
+    ax1.set_ylabel('指数价格', fontsize=14, fontweight='bold')
+    ax1.set_ylim(bottom=0)
+
+    # 添加网格
+    ax1.grid(True, alpha=0.3, linestyle='--', axis='y')
+    ax1.set_axisbelow(True)
+
+    # 格式化x轴
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax1.xaxis.set_major_locator(mdates.YearLocator())
+    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
+
+    # 添加数值标注（每年1月的第一个数据点）
+    labels = yearly_label_points(sp500_df, 'Date')
+    for x, y in zip(labels['Date'], labels['Price']):
+        ax1.text(x, y, f"{int(y):,}", ha='center', va='bottom', fontsize=8, rotation=0)
+
+    # ==================== 子图2: Nasdaq 100 ====================
+
+    ax2.bar(nasdaq_plot['Date'], nasdaq_plot['Price'], width=20, 
+            color='#ff7f0e', alpha=0.8, edgecolor='#d66002', linewidth=0.5)
+
+    ax2.set_title('Nasdaq 100 总回报指数价格走势（月度）', fontsize=20, fontweight='bold', pad=20)
+    ax2.set_xlabel('日期', fontsize=14, fontweight='bold')
+    ax2.set_ylabel('指数价格', fontsize=14, fontweight='bold')
+    ax2.set_ylim(bottom=0)
+
+    # 添加网格
+    ax2.grid(True, alpha=0.3, linestyle='--', axis='y')
+    ax2.set_axisbelow(True)
+
+    # 格式化x轴
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax2.xaxis.set_major_locator(mdates.YearLocator())
+    plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
+
+    # 添加数值标注（每年1月的第一个数据点）
+    labels = yearly_label_points(nasdaq_df, 'Date')
+    for x, y in zip(labels['Date'], labels['Price']):
+        ax2.text(x, y, f"{int(y):,}", ha='center', va='bottom', fontsize=8, rotation=0)
+
+    # ==================== 子图3: 沪深300 ====================
+
+    ax3.bar(csi300_plot['Date'], csi300_plot['Price'], width=20, 
+            color='#2ca02c', alpha=0.8, edgecolor='#1a7a1a', linewidth=0.5)
+
+    ax3.set_title('沪深300全收益指数价格走势（月度）', fontsize=20, fontweight='bold', pad=20)
+    ax3.set_xlabel('日期', fontsize=14, fontweight='bold')
+    ax3.set_ylabel('指数价格', fontsize=14, fontweight='bold')
+    ax3.set_ylim(bottom=0)
+
+    # 添加网格
+    ax3.grid(True, alpha=0.3, linestyle='--', axis='y')
+    ax3.set_axisbelow(True)
+
+    # 格式化x轴
+    ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax3.xaxis.set_major_locator(mdates.YearLocator())
+    plt.setp(ax3.xaxis.get_majorticklabels(), rotation=45)
+
+    # 添加数值标注（每年1月的第一个数据点）
+    labels = yearly_label_points(csi300_monthly, 'Date')
+    for x, y in zip(labels['Date'], labels['Price']):
+        ax3.text(x, y, f"{int(y):,}", ha='center', va='bottom', fontsize=8, rotation=0)
 
-# 读取原始数据
-sp500_df = pd.read_csv('/Users/miaoji.norman/Desktop/投资/S&P 500 TR Historical Data-2.csv')
-nasdaq_df = pd.read_csv('/Users/miaoji.norman/Desktop/投资/Nasdaq 100 TR Historical Data.csv')
-csi300_df = pd.read_csv('/Users/miaoji.norman/Desktop/投资/沪深300TR historical data.csv')
+    # ==================== 保存图表 ====================
+    plt.tight_layout()
+    output = os.path.join(BASE_PATH, 'graph', '三大指数价格柱状图对比.png')
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    print(f"\n✓ 已保存: {output}")
+    plt.close()
 
-# 处理日期和价格
-sp500_df['Date'] = pd.to_datetime(sp500_df['Date'], format='%m/%d/%Y')
-sp500_df['Price'] = sp500_df['Price'].astype(str).str.replace(',', '').astype(float)
+    print("\n" + "="*80)
+    print("三合一柱状图已生成！")
+    print("="*80)
+    print(f"  {output}")
+    print("="*80)
 
-nasdaq_df['Date'] = pd.to_datetime(nasdaq_df['Date'], format='%m/%d/%Y')
-nasdaq_df['Price'] = nasdaq_df['Price'].astype(str).str.replace(',', '').astype(float)
-
-csi300_df['日期Date'] = pd.to_datetime(csi300_df['日期Date'], format='%Y%m%d')
-csi300_df['收盘Close'] = pd.to_numeric(csi300_df['收盘Close'], errors='coerce')
-
-# 排序
-sp500_df = sp500_df.sort_values('Date')
-nasdaq_df = nasdaq_df.sort_values('Date')
-csi300_df = csi300_df.sort_values('日期Date')
-
-# 将沪深300转换为月度数据
-csi300_df['YearMonth'] = csi300_df['日期Date'].dt.to_period('M')
-csi300_monthly = csi300_df.groupby('YearMonth').last().reset_index()
-csi300_monthly['日期Date'] = csi300_monthly['日期Date']
-
-print(f"数据点: S&P 500={len(sp500_df)}, Nasdaq 100={len(nasdaq_df)}, 沪深300={len(csi300_monthly)}")
-
-# ==================== 创建一个包含3个子图的图表 ====================
-print("\n生成三合一柱状图...")
-fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(16, 20))
-
-# ==================== 子图1: S&P 500 ====================
-
-ax1.bar(sp500_df['Date'], sp500_df['Price'], width=20, 
-        color='#1f77b4', alpha=0.8, edgecolor='#0d5a8f', linewidth=0.5)
-
-ax1.set_title('S&P 500 总回报指数价格走势（月度）', fontsize=20, fontweight='bold', pad=20)
-ax1.set_xlabel('日期', fontsize=14, fontweight='bold')
-ax1.set_ylabel('指数价格', fontsize=14, fontweight='bold')
-ax1.set_ylim(bottom=0)
-
-# 添加网格
-ax1.grid(True, alpha=0.3, linestyle='--', axis='y')
-ax1.set_axisbelow(True)
-
-# 格式化x轴
-ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-ax1.xaxis.set_major_locator(mdates.YearLocator())
-plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
-
-# 添加数值标注（每年1月）
-for idx, row in sp500_df.iterrows():
-    if row['Date'].month == 1:
-        ax1.text(row['Date'], row['Price'], f"{int(row['Price']):,}", 
-                ha='center', va='bottom', fontsize=8, rotation=0)
-
-# ==================== 子图2: Nasdaq 100 ====================
-
-ax2.bar(nasdaq_df['Date'], nasdaq_df['Price'], width=20, 
-        color='#ff7f0e', alpha=0.8, edgecolor='#d66002', linewidth=0.5)
-
-ax2.set_title('Nasdaq 100 总回报指数价格走势（月度）', fontsize=20, fontweight='bold', pad=20)
-ax2.set_xlabel('日期', fontsize=14, fontweight='bold')
-ax2.set_ylabel('指数价格', fontsize=14, fontweight='bold')
-ax2.set_ylim(bottom=0)
-
-# 添加网格
-ax2.grid(True, alpha=0.3, linestyle='--', axis='y')
-ax2.set_axisbelow(True)
-
-# 格式化x轴
-ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-ax2.xaxis.set_major_locator(mdates.YearLocator())
-plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
-
-# 添加数值标注（每年1月）
-for idx, row in nasdaq_df.iterrows():
-    if row['Date'].month == 1:
-        ax2.text(row['Date'], row['Price'], f"{int(row['Price']):,}", 
-                ha='center', va='bottom', fontsize=8, rotation=0)
-
-# ==================== 子图3: 沪深300 ====================
-
-ax3.bar(csi300_monthly['日期Date'], csi300_monthly['收盘Close'], width=20, 
-        color='#2ca02c', alpha=0.8, edgecolor='#1a7a1a', linewidth=0.5)
-
-ax3.set_title('沪深300全收益指数价格走势（月度）', fontsize=20, fontweight='bold', pad=20)
-ax3.set_xlabel('日期', fontsize=14, fontweight='bold')
-ax3.set_ylabel('指数价格', fontsize=14, fontweight='bold')
-ax3.set_ylim(bottom=0)
-
-# 添加网格
-ax3.grid(True, alpha=0.3, linestyle='--', axis='y')
-ax3.set_axisbelow(True)
-
-# 格式化x轴
-ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-ax3.xaxis.set_major_locator(mdates.YearLocator())
-plt.setp(ax3.xaxis.get_majorticklabels(), rotation=45)
-
-# 添加数值标注（每年1月）
-for idx, row in csi300_monthly.iterrows():
-    if row['日期Date'].month == 1:
-        ax3.text(row['日期Date'], row['收盘Close'], f"{int(row['收盘Close']):,}", 
-                ha='center', va='bottom', fontsize=8, rotation=0)
-
-# ==================== 保存图表 ====================
-plt.tight_layout()
-output = '/Users/miaoji.norman/Desktop/投资/三大指数价格柱状图对比.png'
-plt.savefig(output, dpi=300, bbox_inches='tight')
-print(f"\n✓ 已保存: {output}")
-plt.close()
-
-print("\n" + "="*80)
-print("三合一柱状图已生成！")
-print("="*80)
-print(f"  {output}")
-print("="*80)
 
+if __name__ == "__main__":
+    main()
@@ -1,122 +1,165 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-生成三大指数横向对比表
-左边是年份/期间，右边三列分别是三个指数的年化收益率
+生成横向对比表（任意数量的指数/资产/投资组合）
+左边是年份/期间，右边每个标的一列年化收益率
+
+所有标的的价格/价值序列先拼成一张长表，年度收益按 (标的, 年份) 一次分组聚合后透视成宽表；
+多年期几何平均收益用 merge_asof 一次找出所有 (标的, 期限) 的起始点
+
+用法:
+    python3 code/generate_comparison_table.py                          # config/下全部组合及其资产
+    python3 code/generate_comparison_table.py config/保守型_config.json config/激进成长型_config.json --no-assets
 """
 
+import os
+import glob
+
 import pandas as pd
 import warnings
 warnings.filterwarnings('ignore')
 
-# 读取三个汇总表
-sp500_df = pd.read_csv('/Users/miaoji.norman/Desktop/投资/SP500_年化收益率汇总表.csv')
-nasdaq_df = pd.read_csv('/Users/miaoji.norman/Desktop/投资/Nasdaq100_年化收益率汇总表.csv')
-csi300_df = pd.read_csv('/Users/miaoji.norman/Desktop/投资/沪深300_年化收益率汇总表.csv')
-
-print("="*80)
-print("开始生成三大指数横向对比表")
-print("="*80)
-
-# 分离年度收益和多年期几何平均
-sp500_annual = sp500_df[sp500_df['期间类型'] == '年度收益'].copy()
-sp500_multi = sp500_df[sp500_df['期间类型'] == '多年期几何平均'].copy()
-
-nasdaq_annual = nasdaq_df[nasdaq_df['期间类型'] == '年度收益'].copy()
-nasdaq_multi = nasdaq_df[nasdaq_df['期间类型'] == '多年期几何平均'].copy()
-
-csi300_annual = csi300_df[csi300_df['期间类型'] == '年度收益'].copy()
-csi300_multi = csi300_df[csi300_df['期间类型'] == '多年期几何平均'].copy()
-
-# ==================== 构建年度收益对比表 ====================
-# 统一转换期间列为整数类型
-sp500_annual['期间'] = sp500_annual['期间'].astype(int)
-nasdaq_annual['期间'] = nasdaq_annual['期间'].astype(int)
-csi300_annual['期间'] = csi300_annual['期间'].astype(int)
-
-# 获取所有年份的并集
-all_years = set()
-all_years.update(sp500_annual['期间'].tolist())
-all_years.update(nasdaq_annual['期间'].tolist())
-all_years.update(csi300_annual['期间'].tolist())
-all_years = sorted(all_years)
-
-# 创建年度对比数据
-annual_comparison = []
-for year in all_years:
-    row = {'年份': year}
-    
-    # S&P 500
-    sp_row = sp500_annual[sp500_annual['期间'] == year]
-    if len(sp_row) > 0:
-        row['S&P 500 TR (%)'] = sp_row['年化收益率(%)'].values[0]
-    else:
-        row['S&P 500 TR (%)'] = '-'
-    
-    # Nasdaq 100
-    nq_row = nasdaq_annual[nasdaq_annual['期间'] == year]
-    if len(nq_row) > 0:
-        row['Nasdaq 100 TR (%)'] = nq_row['年化收益率(%)'].values[0]
-    else:
-        row['Nasdaq 100 TR (%)'] = '-'
-    
-    # 沪深300
-    csi_row = csi300_annual[csi300_annual['期间'] == year]
-    if len(csi_row) > 0:
-        row['沪深300 TR (%)'] = csi_row['年化收益率(%)'].values[0]
-    else:
-        row['沪深300 TR (%)'] = '-'
-    
-    annual_comparison.append(row)
-
-annual_comparison_df = pd.DataFrame(annual_comparison)
-
-# ==================== 构建多年期对比表 ====================
-# 提取多年期数据
-multi_periods = ['10年', '5年', '3年']
-multi_comparison = []
-
-for period in multi_periods:
-    row = {'期间': f'{period}几何平均'}
-    
-    # S&P 500
-    sp_row = sp500_multi[sp500_multi['期间'].str.contains(period, na=False)]
-    row['S&P 500 TR (%)'] = sp_row['年化收益率(%)'].values[0] if len(sp_row) > 0 else '-'
-    
-    # Nasdaq 100
-    nq_row = nasdaq_multi[nasdaq_multi['期间'].str.contains(period, na=False)]
-    row['Nasdaq 100 TR (%)'] = nq_row['年化收益率(%)'].values[0] if len(nq_row) > 0 else '-'
-    
-    # 沪深300
-    csi_row = csi300_multi[csi300_multi['期间'].str.contains(period, na=False)]
-    row['沪深300 TR (%)'] = csi_row['年化收益率(%)'].values[0] if len(csi_row) > 0 else '-'
-    
-    multi_comparison.append(row)
-
-multi_comparison_df = pd.DataFrame(multi_comparison)
-
-# ==================== 合并两个表 ====================
-# 年度表添加类型列
-annual_comparison_df.insert(0, '类别', '年度收益')
-annual_comparison_df.rename(columns={'年份': '期间'}, inplace=True)
-
-# 多年期表添加类型列
-multi_comparison_df.insert(0, '类别', '多年期几何平均')
-
-# 合并
-final_df = pd.concat([annual_comparison_df, multi_comparison_df], ignore_index=True)
-
-# ==================== 显示和保存 ====================
-print("\n" + "="*80)
-print("三大指数年化收益率横向对比表")
-print("="*80)
-print(final_df.to_string(index=False))
-
-# 保存为CSV
-output_file = '/Users/miaoji.norman/Desktop/投资/三大指数年化收益率对比表.csv'
-final_df.to_csv(output_file, index=False, encoding='utf-8-sig')
-
-print(f"\n✓ 对比表已保存至: {output_file}")
-print(f"✓ 共 {len(final_df)} 行数据")
-print("="*80)
-
+HORIZONS = (20, 15, 10, 5, 3)
+
+
+def annual_return_table(long_df):
+    """
+    年度收益宽表：行为年份，列为标的
+    每年收益 = 当年最后一个值 / 当年第一个值 - 1
+    """
+    grouped = long_df.groupby(['name', long_df['date'].dt.year.rename('year')], sort=True)['value']
+    annual = grouped.agg(['first', 'last'])
+    annual['return'] = (annual['last'] / annual['first'] - 1) * 100
+    return annual['return'].unstack('name')
+
+
+def multi_period_table(long_df, horizons=HORIZONS):
+    """
+    多年期几何平均年化收益宽表：行为期限（年），列为标的
+    起始点为 最新日期 - N年 之后的第一个观测，年数按月份差计算；历史不足N年的为NaN
+    """
+    ends = long_df.groupby('name').agg(start_date=('date', 'first'), end_date=('date', 'last'),
+                                       end_value=('value', 'last')).reset_index()
+    available_years = ((ends['end_date'].dt.year - ends['start_date'].dt.year) * 12
+                       + (ends['end_date'].dt.month - ends['start_date'].dt.month)) / 12
+
+    targets = pd.concat([ends.assign(horizon=h, target=ends['end_date'] - pd.DateOffset(years=h),
+                                     available=available_years >= h)
+                         for h in horizons], ignore_index=True)
+
+    starts = pd.merge_asof(targets.sort_values('target'),
+                           long_df.rename(columns={'date': 'period_start', 'value': 'start_value'})
+                                  .sort_values('period_start'),
+                           left_on='target', right_on='period_start', by='name', direction='forward')
+
+    years = ((starts['end_date'].dt.year - starts['period_start'].dt.year) * 12
+             + (starts['end_date'].dt.month - starts['period_start'].dt.month)) / 12
+    starts['return'] = ((starts['end_value'] / starts['start_value']) ** (1 / years) - 1) * 100
+    starts.loc[~starts['available'] | (years <= 0), 'return'] = float('nan')
+
+    return starts.pivot(index='horizon', columns='name', values='return').reindex(list(horizons))
+
+
+def comparison_table(series, horizons=HORIZONS):
+    """
+    构建横向对比表
+
+    参数:
+        series: {标的名称: pd.Series(价格或组合价值，以日期为索引)}，列顺序按传入顺序
+        horizons: 多年期几何平均的期限（年）
+
+    返回:
+        DataFrame，列为 类别、期间、各标的 (%)；缺失值为NaN
+    """
+    names = list(series)
+    long_df = pd.concat({name: s.dropna().sort_index() for name, s in series.items()},
+                        names=['name', 'date']).rename('value').reset_index()
+
+    annual = annual_return_table(long_df).reindex(columns=names)
+    annual.insert(0, '期间', annual.index.astype(str))
+    annual.insert(0, '类别', '年度收益')
+
+    multi = multi_period_table(long_df, horizons).reindex(columns=names)
+    multi.insert(0, '期间', [f'{h}年几何平均' for h in multi.index])
+    multi.insert(0, '类别', '多年期几何平均')
+
+    final_df = pd.concat([annual, multi], ignore_index=True)
+    final_df.columns = ['类别', '期间'] + [f'{name} (%)' for name in names]
+    return final_df.round(2)
+
+
+def collect_series(config_paths, include_assets=True, include_portfolios=True, split=False):
+    """
+    从配置文件收集对比标的：各组合的价值序列，以及组合引用的底层资产（按数据文件去重，不含现金）
+
+    参数:
+        config_paths: 配置文件路径
+        include_assets: 是否包含底层资产
+        include_portfolios: 是否包含投资组合
+        split: 为True时分别返回资产和组合
+
+    返回:
+        {标的名称: pd.Series}，资产在前、组合在后；split为True时返回 (assets, portfolios)
+    """
+    from synthetic_assets import apply_synthetic, with_cash_rate
+    from 永久投资组合分析_配置版 import load_config, load_asset_data, portfolio_value_series
+
+    assets = {}
+    portfolios = {}
+    for config_path in config_paths:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+
+        if include_assets:
+            for asset in with_cash_rate(config['assets']):
+                if asset.get('type') != 'cash' and asset['full_name'] not in assets:
+                    df = apply_synthetic(asset, load_asset_data(asset, base_path))
+                    assets[asset['full_name']] = df.set_index('Date')['Price']
+
+        if include_portfolios:
+            values = portfolio_value_series(config, base_path)
+            if values is not None:
+                portfolios[config['portfolio_name']] = values
+
+    if split:
+        return assets, portfolios
+    return {**assets, **portfolios}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='生成指数/资产/组合年化收益率横向对比表')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--no-assets', action='store_true', help='不包含底层资产')
+    parser.add_argument('--no-portfolios', action='store_true', help='不包含投资组合')
+    parser.add_argument('--output', default=os.path.join(base_path, 'table', '年化收益率横向对比表.csv'),
+                        help='输出CSV路径')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+
+    print("="*80)
+    print("开始生成年化收益率横向对比表")
+    print("="*80)
+
+    series = collect_series(config_paths, include_assets=not args.no_assets,
+                            include_portfolios=not args.no_portfolios)
+    final_df = comparison_table(series)
+
+    # ==================== 显示和保存 ====================
+    print("\n" + "="*80)
+    print(f"{len(series)} 个标的年化收益率横向对比表")
+    print("="*80)
+    print(final_df.to_string(index=False, na_rep='-'))
+
+    final_df.to_csv(args.output, index=False, encoding='utf-8-sig', na_rep='-')
+
+    print(f"\n✓ 对比表已保存至: {args.output}")
+    print(f"✓ 共 {len(final_df)} 行数据")
+    print("="*80)
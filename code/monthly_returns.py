@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月度收益率引擎（任意组合/资产）
+所有标的的序列先对齐成一张月末价值宽表，月度收益率一次 pct_change 算出；
+年 × 月 收益矩阵、最好/最差月份、胜率等统计都在这张 (月份, 标的) 表上按列向量化计算，
+日历热力图由预先算好的矩阵批量绘制
+
+注意：组合在每年第一个月再平衡时按上期末价值重新分配（主程序的规则），该月组合价值不变，
+这些再平衡月不是实际观测，组合在这些月份的收益率记为NaN，不计入均值、胜率、最好/最差月份等统计
+
+用法:
+    python3 code/monthly_returns.py                                  # config/下全部组合及其底层资产
+    python3 code/monthly_returns.py config/保守型_config.json --no-assets
+"""
+
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 使用非交互式后端
+import matplotlib.pyplot as plt
+from matplotlib.colors import TwoSlopeNorm
+import warnings
+warnings.filterwarnings('ignore')
+
+# 设置中文字体
+plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # Mac系统中文字体
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+MONTH_LABELS = [f'{m}月' for m in range(1, 13)]
+
+
+def monthly_return_panel(series, portfolios=()):
+    """
+    月度收益率宽表
+
+    参数:
+        series: {标的名称: pd.Series(价格或组合价值，以日期为索引)}
+        portfolios: 其中按主程序规则再平衡的组合名称，再平衡月的收益率记为NaN
+
+    返回:
+        DataFrame，行为月末日期、列为标的，值为月度收益率(%)；标的无数据的月份和组合再平衡月为NaN
+    """
+    from 永久投资组合分析_配置版 import annual_rebalance_mask
+
+    monthly = {name: s.dropna().sort_index().resample('ME').last() for name, s in series.items()}
+    values = pd.concat(monthly, axis=1)
+    # 只在相邻两个月都有数据时计算收益率，不跨越缺口
+    returns = values.pct_change(fill_method=None) * 100
+    for name in portfolios:
+        index = monthly[name].dropna().index
+        returns.loc[index[annual_rebalance_mask(index)], name] = np.nan
+    return returns
+
+
+def calendar_matrices(returns):
+    """
+    年 × 月 收益矩阵（所有标的一次透视）
+
+    参数:
+        returns: monthly_return_panel 的结果
+
+    返回:
+        DataFrame，行索引为 (标的, 年份)，列为 1月…12月 和 全年（按月复利）
+    """
+    long_df = returns.rename_axis(index='Date', columns='标的').stack().rename('return').reset_index()
+    long_df['年份'] = long_df['Date'].dt.year
+    long_df['月份'] = long_df['Date'].dt.month
+    matrix = long_df.pivot_table(index=['标的', '年份'], columns='月份', values='return', aggfunc='first')
+    matrix = matrix.reindex(columns=range(1, 13))
+    annual = (np.exp(np.log1p(matrix / 100).sum(axis=1, min_count=1)) - 1) * 100
+    matrix.columns = MONTH_LABELS
+    matrix['全年'] = annual
+    return matrix.reindex(returns.columns, level='标的')
+
+
+def monthly_statistics(returns):
+    """
+    各标的月度收益统计（按列向量化）
+
+    返回:
+        DataFrame，每个标的一行：月数、平均、中位数、标准差、胜率、最好/最差月份及日期、
+        平均收益最高/最低的日历月份
+    """
+    valid = returns.notna()
+    by_month = returns.groupby(returns.index.month).mean()
+    stats = pd.DataFrame({
+        '月数': valid.sum(),
+        '平均月度收益(%)': returns.mean(),
+        '月度收益中位数(%)': returns.median(),
+        '月度收益标准差(%)': returns.std(),
+        '胜率(%)': (returns > 0).sum() / valid.sum() * 100,
+        '最大单月涨幅(%)': returns.max(),
+        '最大涨幅月份': returns.idxmax().dt.strftime('%Y-%m'),
+        '最大单月跌幅(%)': returns.min(),
+        '最大跌幅月份': returns.idxmin().dt.strftime('%Y-%m'),
+        '平均最好月份': by_month.idxmax().map(lambda m: f'{m}月'),
+        '平均最差月份': by_month.idxmin().map(lambda m: f'{m}月'),
+    })
+    stats.index.name = '标的'
+    return stats.reset_index()
+
+
+def month_hit_rates(returns):
+    """各标的在每个日历月份的胜率(%)：行为标的，列为 1月…12月"""
+    month = returns.index.month
+    positive = (returns > 0).groupby(month).sum()
+    counts = returns.notna().groupby(month).sum()
+    rates = (positive / counts * 100).T.reindex(columns=range(1, 13))
+    rates.columns = MONTH_LABELS
+    return rates
+
+
+def plot_calendar_heatmap(matrix, title, output):
+    """
+    绘制月度收益日历热力图（行为年份，列为月份和全年，红负绿正）
+
+    参数:
+        matrix: 单个标的的年 × 月矩阵（calendar_matrices 结果中该标的的部分）
+        title: 图表标题
+        output: 输出图片路径
+    """
+    values = matrix.to_numpy(dtype=np.float64)
+    months = values[:, :12]
+    bound = max(np.nanmax(np.abs(months)) if np.isfinite(months).any() else 1.0, 1e-6)
+    n = len(matrix)
+
+    fig, ax = plt.subplots(figsize=(14, max(4, n * 0.35 + 1.5)))
+    # 全年列的量级远大于单月，单独按自身范围着色
+    annual = np.full_like(values, np.nan)
+    annual[:, 12] = values[:, 12]
+    monthly = values.copy()
+    monthly[:, 12] = np.nan
+    annual_bound = max(np.nanmax(np.abs(annual)) if np.isfinite(annual).any() else 1.0, 1e-6)
+    ax.imshow(np.ma.masked_invalid(monthly), cmap='RdYlGn', aspect='auto',
+              norm=TwoSlopeNorm(vmin=-bound, vcenter=0, vmax=bound))
+    ax.imshow(np.ma.masked_invalid(annual), cmap='RdYlGn', aspect='auto',
+              norm=TwoSlopeNorm(vmin=-annual_bound, vcenter=0, vmax=annual_bound))
+
+    rows, cols = np.nonzero(np.isfinite(values))
+    for i, j in zip(rows, cols):
+        ax.text(j, i, f'{values[i, j]:.1f}', ha='center', va='center', fontsize=8,
+                fontweight='bold' if j == 12 else 'normal')
+
+    ax.set_xticks(range(13))
+    ax.set_xticklabels(matrix.columns)
+    ax.set_yticks(range(n))
+    ax.set_yticklabels(matrix.index)
+    ax.axvline(11.5, color='white', linewidth=3)
+    ax.set_title(title, fontsize=18, fontweight='bold', pad=20)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from generate_comparison_table import collect_series
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='组合/资产月度收益率日历表、统计与热力图')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--no-assets', action='store_true', help='不包含底层资产')
+    parser.add_argument('--no-portfolios', action='store_true', help='不包含投资组合')
+    parser.add_argument('--no-charts', action='store_true', help='只输出表格，不绘制热力图')
+    parser.add_argument('--graph-dir', default=os.path.join(base_path, 'graph'), help='热力图输出目录')
+    parser.add_argument('--table-dir', default=os.path.join(base_path, 'table'), help='表格输出目录')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+
+    print("="*80)
+    print("开始计算月度收益率")
+    print("="*80)
+    start = time.perf_counter()
+
+    assets, portfolios = collect_series(config_paths, include_assets=not args.no_assets,
+                                        include_portfolios=not args.no_portfolios, split=True)
+    returns = monthly_return_panel({**assets, **portfolios}, portfolios)
+    matrices = calendar_matrices(returns)
+    stats = monthly_statistics(returns)
+    hit_rates = month_hit_rates(returns)
+
+    print("\n月度收益率统计:")
+    print(stats.round(2).to_string(index=False))
+    print("\n各月份胜率(%):")
+    print(hit_rates.round(0).to_string())
+
+    os.makedirs(args.table_dir, exist_ok=True)
+    matrices.round(2).to_csv(os.path.join(args.table_dir, '月度收益率日历表.csv'), encoding='utf-8-sig')
+    stats.round(2).to_csv(os.path.join(args.table_dir, '月度收益率统计_全部标的.csv'), index=False,
+                          encoding='utf-8-sig')
+    hit_rates.round(2).to_csv(os.path.join(args.table_dir, '月度胜率.csv'), encoding='utf-8-sig')
+    print(f"\n✓ 表格已保存至: {args.table_dir}")
+
+    if not args.no_charts:
+        for name in returns.columns:
+            safe_name = name.replace('/', '_')
+            plot_calendar_heatmap(matrices.loc[name], f'{name} 月度收益率 (%)',
+                                  os.path.join(args.graph_dir, f'{safe_name}_月度收益日历.png'))
+        print(f"✓ {len(returns.columns)} 张日历热力图已保存至: {args.graph_dir}")
+
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    print("="*80)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+组合价值路径的紧凑存储
+大批量模拟（权重网格、蒙特卡洛路径）时不再为每条路径保留float64的DataFrame列：
+    encoding='float64'     原样保存
+    encoding='float32'     价值以float32保存（相对误差约1e-7），内存减半
+    encoding='log_return'  首值float64 + 对数收益率float32，还原时累加；
+                           含非正值的一批路径（如杠杆合成资产归零）无法取对数，该批退回float32保存
+    keep_paths=False       只保留汇总指标，路径在追加时即时归约后丢弃
+汇总指标总是在float64精度下计算，与编码方式无关
+
+用法:
+    store = PathStore(dates, encoding='float32')
+    simulate_to_store(prices, weights, rebalance_mask, store)   # weights: (M, N)，按块模拟
+    store.summary()                                             # 每条路径一行指标
+"""
+
+import numpy as np
+import pandas as pd
+
+from batch_engine import path_metrics, simulate_rebalance_batch
+
+ENCODINGS = ('float64', 'float32', 'log_return')
+METRIC_NAMES = ('final_value', 'cagr', 'volatility', 'max_drawdown', 'sharpe', 'calmar')
+
+
+class PathStore:
+    """
+    按列追加的价值路径容器，所有路径共用同一日期索引
+
+    参数:
+        dates: (T,) 日期
+        encoding: 路径存储方式，见 ENCODINGS
+        keep_paths: 是否保存路径（False时只保留汇总指标）
+        metrics: 需要保留的汇总指标，见 METRIC_NAMES
+        periods_per_year: 每年期数（月度为12）
+        min_drawdown: Calmar分母中回撤绝对值的下限（%），见 path_metrics
+    """
+
+    def __init__(self, dates, encoding='float32', keep_paths=True, metrics=METRIC_NAMES, periods_per_year=12,
+                 min_drawdown=0.0):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"不支持的路径编码: {encoding}（可选: {', '.join(ENCODINGS)}）")
+        unknown = set(metrics) - set(METRIC_NAMES)
+        if unknown:
+            raise ValueError(f"不支持的指标: {', '.join(sorted(unknown))}（可选: {', '.join(METRIC_NAMES)}）")
+        self.dates = pd.DatetimeIndex(dates, name='Date')
+        self.encoding = encoding
+        self.keep_paths = keep_paths
+        self.metrics = tuple(metrics)
+        self.periods_per_year = periods_per_year
+        self.min_drawdown = min_drawdown
+        self.names = []
+        self._blocks = []
+        self._stats = {name: [] for name in self.metrics}
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        """路径和指标占用的字节数"""
+        path_bytes = sum(sum(part.nbytes for part in block) for block in self._blocks)
+        return path_bytes + sum(sum(s.nbytes for s in stats) for stats in self._stats.values())
+
+    def append(self, values, names=None):
+        """
+        追加一批路径
+
+        参数:
+            values: (T,) 或 (T, m) 组合价值（float64）
+            names: m个路径名称（默认按序号编号）
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        if values.shape[0] != len(self.dates):
+            raise ValueError(f"路径长度 {values.shape[0]} 与日期索引长度 {len(self.dates)} 不一致")
+        m = values.shape[1]
+        if names is None:
+            names = range(len(self.names), len(self.names) + m)
+        names = list(names)
+        if len(names) != m:
+            raise ValueError(f"名称数量 {len(names)} 与路径数量 {m} 不一致")
+
+        if self.metrics:
+            stats = path_metrics(values, self.periods_per_year, self.min_drawdown)
+            stats['final_value'] = values[-1].copy()
+            for name in self.metrics:
+                self._stats[name].append(stats[name])
+
+        if self.keep_paths:
+            if self.encoding == 'float64':
+                self._blocks.append((values.copy(),))
+            elif self.encoding == 'float32' or (values <= 0).any():
+                self._blocks.append((values.astype(np.float32),))
+            else:
+                log_returns = np.diff(np.log(values), axis=0).astype(np.float32)
+                self._blocks.append((values[0].copy(), log_returns))
+        self.names.extend(names)
+
+    def values(self, columns=None):
+        """
+        还原路径为float64数组
+
+        参数:
+            columns: 路径下标（默认全部）
+
+        返回:
+            (T, M) 组合价值
+        """
+        if not self.keep_paths:
+            raise ValueError("该容器只保留了汇总指标（keep_paths=False）")
+        decoded = []
+        for block in self._blocks:
+            if len(block) == 2:
+                first, log_returns = block
+                cumulative = np.vstack([np.zeros((1, len(first))),
+                                        np.cumsum(log_returns, axis=0, dtype=np.float64)])
+                decoded.append(first * np.exp(cumulative))
+            else:
+                decoded.append(block[0].astype(np.float64))
+        values = np.hstack(decoded) if decoded else np.empty((len(self.dates), 0))
+        return values if columns is None else values[:, columns]
+
+    def path(self, i):
+        """第i条路径（pd.Series）"""
+        return pd.Series(self.values([i])[:, 0], index=self.dates, name=self.names[i])
+
+    def summary(self):
+        """每条路径一行的汇总指标 DataFrame"""
+        return pd.DataFrame({name: np.concatenate(stats) if stats else np.empty(0)
+                             for name, stats in self._stats.items()},
+                            index=pd.Index(self.names, name='path'))
+
+
+def simulate_to_store(prices, weights, rebalance_mask, store, names=None, chunk_size=4096, initial_value=10000):
+    """
+    按块批量模拟大量固定权重组合并追加到容器，任一时刻只有 (T, chunk_size) 的float64路径在内存中
+
+    参数:
+        prices: (T, N) 价格数组
+        weights: (M, N) 候选权重
+        rebalance_mask: (T,) 再平衡点
+        store: PathStore
+        names: M个路径名称（默认按序号编号）
+        chunk_size: 每块模拟的组合数
+
+    返回:
+        store
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    for start in range(0, len(weights), chunk_size):
+        chunk = weights[start:start + chunk_size]
+        values = simulate_rebalance_batch(prices, chunk, rebalance_mask, initial_value)
+        store.append(values, None if names is None else names[start:start + chunk_size])
+    return store
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对齐价格面板缓存
+按资产集合 (data_file, 日期列, 日期格式, 价格列, 频率) 缓存重采样并对齐后的价格面板，
+同一组资产、不同权重或再平衡方式的策略直接复用，不再重复加载和合并数据。
+面板以一段连续的float64数组 (T, N) 加日期索引保存，可直接用于向量化模拟
+
+对齐方式（配置中的 "alignment" 字段）:
+    {"policy": "inner"}                      只保留所有资产都有数据的日期（默认）
+    {"policy": "ffill", "max_staleness": 2}  取日期并集，缺失值用前值填充，最多延续max_staleness期
+资产可另设 "proxy"（与资产相同的 data_file/date_column/date_format/price_column 字段），
+在该资产历史开始之前用替代序列的收益率向前回补
+杠杆/反向合成资产（"type": "leveraged"，见 synthetic_assets）在重采样之前由原始数据换算，
+合成参数进入资产键，与标的本身是不同的列
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config_schema import ALIGNMENT_POLICIES
+from engine_meta import file_fingerprint
+from synthetic_assets import apply_synthetic, synthetic_key, with_cash_rate
+
+# dates: (T,) datetime64[ns]；values: (T, N) float64，C连续；keys: 每列对应的资产键
+AlignedPanel = namedtuple('AlignedPanel', ['dates', 'values', 'keys'])
+
+# 进程内缓存：面板键 -> AlignedPanel，按最近使用顺序排列；
+# 数据文件变化后旧指纹的面板随即淘汰，总数超过 PANEL_CACHE_SIZE 时淘汰最久未用的面板
+_PANEL_CACHE = OrderedDict()
+_PANEL_LOCK = threading.Lock()
+PANEL_CACHE_SIZE = 32
+
+# 并发读取数据文件的线程数
+DEFAULT_LOAD_WORKERS = 8
+
+
+class AssetLoadError(Exception):
+    """一个或多个资产加载失败，errors 为 {资产名称: 异常}"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('资产数据加载失败: ' + '; '.join(f"{name}: {e}" for name, e in errors.items()))
+
+
+def _series_key(asset):
+    return (asset['data_file'], asset['date_column'], asset['date_format'], asset['price_column'])
+
+
+def asset_key(asset, frequency='ME'):
+    """资产在面板中的键（现金资产不进入面板；杠杆资产需已填入cash_rate，见 with_cash_rate）"""
+    proxy = asset.get('proxy')
+    return _series_key(asset) + (frequency, _series_key(proxy) if proxy else None, synthetic_key(asset))
+
+
+def normalize_alignment(alignment):
+    """解析对齐配置，返回 (policy, max_staleness)"""
+    alignment = alignment or {}
+    policy = alignment.get('policy', 'inner')
+    if policy not in ALIGNMENT_POLICIES:
+        raise ValueError(f"不支持的对齐方式: {policy}（可选: {', '.join(ALIGNMENT_POLICIES)}）")
+    max_staleness = alignment.get('max_staleness', 1) if policy == 'ffill' else 0
+    if int(max_staleness) < 0:
+        raise ValueError(f"max_staleness不能为负数: {max_staleness}")
+    return policy, int(max_staleness)
+
+
+def _fingerprint_or_none(file_path):
+    # 缺失的文件留到加载时按资产报错
+    try:
+        return file_fingerprint(file_path)
+    except FileNotFoundError:
+        return None
+
+
+def panel_cache_key(keys, base_path, alignment=('inner', 0)):
+    """面板缓存键：资产键集合 + 对齐方式 + 各数据文件（含替代序列）指纹"""
+    files = sorted({key[0] for key in keys} | {key[5][0] for key in keys if key[5]})
+    fingerprints = tuple(_fingerprint_or_none(os.path.join(base_path, f)) for f in files)
+    return (os.path.abspath(base_path), keys, tuple(alignment), fingerprints)
+
+
+def _disk_cache_file(cache_dir, cache_key):
+    digest = hashlib.sha256(json.dumps(cache_key, ensure_ascii=False).encode('utf-8')).hexdigest()[:24]
+    return os.path.join(cache_dir, f'panel_{digest}.npz')
+
+
+def _load_from_disk(cache_file, keys):
+    if not os.path.exists(cache_file):
+        return None
+    with np.load(cache_file) as data:
+        return AlignedPanel(dates=data['dates'].astype('datetime64[ns]'),
+                            values=np.ascontiguousarray(data['values'], dtype=np.float64),
+                            keys=keys)
+
+
+def _save_to_disk(cache_file, panel):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = cache_file + '.tmp.npz'
+    np.savez(tmp_file, dates=panel.dates.astype('int64'), values=panel.values)
+    os.replace(tmp_file, cache_file)
+
+
+def resample_prices(df, frequency='ME'):
+    """价格序列重采样到统一频率（无数据的区间去掉）"""
+    return df.set_index('Date')['Price'].resample(frequency).last().dropna()
+
+
+def backfill_with_proxy(series, proxy):
+    """
+    在序列开始之前用替代序列的收益率向前回补，衔接点取替代序列在序列首日（或之前最近一日）的值
+    """
+    first_date = series.index[0]
+    anchor = proxy.asof(first_date)
+    if pd.isna(anchor):
+        return series
+    head = proxy[proxy.index < first_date]
+    return pd.concat([head / anchor * series.iloc[0], series])
+
+
+def align_assets(frames, frequency='ME', policy='inner', max_staleness=0, proxies=None):
+    """
+    将各资产价格序列重采样到统一频率，一次性按共同日期索引对齐成 (T, N) 数组
+
+    参数:
+        frames: [DataFrame(Date, Price), ...]
+        frequency: 重采样频率（'ME' 为月末）
+        policy: 'inner' 只保留所有资产都有数据的日期；'ffill' 取日期并集并向前填充
+        max_staleness: ffill时最多向前填充的期数，超出的日期视为缺失
+        proxies: 与frames对应的替代序列（DataFrame或None），用于回补历史
+
+    返回:
+        dates, values
+    """
+    series = []
+    for i, df in enumerate(frames):
+        resampled = resample_prices(df, frequency)
+        if proxies and proxies[i] is not None:
+            resampled = backfill_with_proxy(resampled, resample_prices(proxies[i], frequency))
+        series.append(resampled)
+
+    # 所有日期一次性去重计数：inner取出现N次的日期，ffill取并集
+    all_dates = np.concatenate([s.index.values.astype('datetime64[ns]') for s in series])
+    unique_dates, counts = np.unique(all_dates, return_counts=True)
+    dates = unique_dates[counts == len(series)] if policy == 'inner' else unique_dates
+
+    values = np.full((len(dates), len(series)), np.nan)
+    for j, s in enumerate(series):
+        s_dates = s.index.values.astype('datetime64[ns]')
+        positions = np.searchsorted(dates, s_dates)
+        found = (positions < len(dates)) & (dates[np.minimum(positions, len(dates) - 1)] == s_dates)
+        values[positions[found], j] = s.to_numpy(dtype=np.float64)[found]
+
+    if policy == 'ffill':
+        if max_staleness > 0:
+            values = pd.DataFrame(values).ffill(limit=max_staleness).to_numpy()
+        complete = ~np.isnan(values).any(axis=1)
+        dates, values = dates[complete], values[complete]
+
+    return dates, np.ascontiguousarray(values)
+
+
+def load_concurrently(specs, base_path, load_data, workers=DEFAULT_LOAD_WORKERS):
+    """
+    用线程池同时加载多个数据文件，结果顺序与specs一致
+
+    参数:
+        specs: 资产配置列表（每项含name）
+        base_path: 数据文件的基础路径
+        load_data: 资产数据加载函数 (asset, base_path) -> DataFrame
+        workers: 线程数，1表示顺序加载
+
+    返回:
+        DataFrame列表；任一资产失败时抛出 AssetLoadError，列出所有失败的资产
+    """
+    def load(spec):
+        try:
+            return load_data(spec, base_path), None
+        except Exception as e:
+            return None, e
+
+    if workers == 1 or len(specs) <= 1:
+        outcomes = [load(spec) for spec in specs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(specs))) as executor:
+            outcomes = list(executor.map(load, specs))
+
+    errors = {spec['name']: e for spec, (_, e) in zip(specs, outcomes) if e is not None}
+    if errors:
+        raise AssetLoadError(errors)
+    return [df for df, _ in outcomes]
+
+
+def get_aligned_panel(assets, base_path, load_data, frequency='ME', cache_dir=None, log=print,
+                      alignment=None, workers=DEFAULT_LOAD_WORKERS):
+    """
+    获取（必要时构建）一组资产的对齐价格面板
+
+    参数:
+        assets: 资产配置列表（现金资产会被忽略）
+        base_path: 数据文件的基础路径
+        load_data: 资产数据加载函数 (asset, base_path) -> DataFrame(Date, Price)
+        frequency: 重采样频率
+        cache_dir: 磁盘缓存目录（可选），None表示只用进程内缓存
+        log: 输出函数
+        alignment: 对齐配置，如 {"policy": "ffill", "max_staleness": 2}，默认inner
+        workers: 并发读取数据文件的线程数（1为顺序读取，结果相同）
+
+    返回:
+        AlignedPanel，keys按资产键排序；没有非现金资产时返回None
+    """
+    by_key = {}
+    for asset in with_cash_rate(assets):
+        if asset.get('type') == 'cash':
+            continue
+        by_key.setdefault(asset_key(asset, frequency), asset)
+    if not by_key:
+        return None
+
+    policy, max_staleness = normalize_alignment(alignment)
+    keys = tuple(sorted(by_key, key=lambda k: json.dumps(k, ensure_ascii=False)))
+    cache_key = panel_cache_key(keys, base_path, (policy, max_staleness))
+
+    with _PANEL_LOCK:
+        panel = _PANEL_CACHE.get(cache_key)
+        if panel is not None:
+            _PANEL_CACHE.move_to_end(cache_key)
+    if panel is not None:
+        log(f"命中面板缓存: {len(keys)}个资产, {len(panel.dates)}行")
+        return panel
+
+    cache_file = _disk_cache_file(cache_dir, cache_key) if cache_dir else None
+    if cache_file:
+        panel = _load_from_disk(cache_file, keys)
+        if panel is not None:
+            log(f"命中磁盘面板缓存: {cache_file}")
+
+    if panel is None:
+        # 资产及其替代序列的数据文件互不依赖，一次性并发加载
+        specs = [by_key[key] for key in keys]
+        proxy_specs = [dict(a['proxy'], name=f"{a['name']}替代序列") for a in specs if a.get('proxy')]
+        loaded = load_concurrently(specs + proxy_specs, base_path, load_data, workers)
+        # 合成资产在重采样之前按原始频率换算（替代序列同样换算，回补的是合成收益）
+        frames = [apply_synthetic(a, df) for a, df in zip(specs, loaded[:len(specs)])]
+        loaded_proxies = iter(loaded[len(specs):])
+        proxies = [apply_synthetic(a, next(loaded_proxies)) if a.get('proxy') else None for a in specs]
+        for asset, df in zip(specs, frames):
+            log(f"{asset['name']}数据: {len(df)}行, {df['Date'].min()} 至 {df['Date'].max()}")
+        dates, values = align_assets(frames, frequency, policy, max_staleness, proxies)
+        if policy != 'inner':
+            log(f"对齐方式: {policy}（最多向前填充{max_staleness}期）")
+        panel = AlignedPanel(dates=dates, values=values, keys=keys)
+        if cache_file:
+            _save_to_disk(cache_file, panel)
+
+    _remember_panel(cache_key, panel)
+    return panel
+
+
+def _remember_panel(cache_key, panel):
+    """放入进程内缓存，淘汰同一组资产旧指纹的面板和超出容量的最久未用面板"""
+    with _PANEL_LOCK:
+        for key in [k for k in _PANEL_CACHE if k[:3] == cache_key[:3] and k != cache_key]:
+            del _PANEL_CACHE[key]
+        _PANEL_CACHE[cache_key] = panel
+        _PANEL_CACHE.move_to_end(cache_key)
+        while len(_PANEL_CACHE) > PANEL_CACHE_SIZE:
+            _PANEL_CACHE.popitem(last=False)
+
+
+def panel_columns(panel, assets, frequency='ME'):
+    """按资产顺序取面板列号（现金资产为None）"""
+    positions = {key: j for j, key in enumerate(panel.keys)}
+    return [None if asset.get('type') == 'cash' else positions[asset_key(asset, frequency)]
+            for asset in with_cash_rate(assets)]
+
+
+def clear_panel_cache():
+    """清空进程内面板缓存"""
+    with _PANEL_LOCK:
+        _PANEL_CACHE.clear()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+再平衡时点敏感性分析
+主程序固定在每年第一个可用月份再平衡；这里把"一年从哪个月（或哪一天）开始"作为偏移量，
+所有偏移版本在同一价格面板上一次性向量化模拟，报告CAGR和最大回撤在不同时点间的离散程度
+
+主程序的再平衡行价值等于上一行价值、不计入该期收益；若照搬这一规则，各时点版本丢掉的是不同月份的收益，
+离散程度主要反映"丢了哪个月"而不是再平衡时点本身。这里再平衡行先按漂移后的持仓（旧份额 × 当期价格）计价、
+再重新分配，每个时点版本都完整计入所有期的收益，因此偏移0的CAGR与主程序结果略有不同
+
+    月度数据: 偏移 0~11 个月（0 即主程序的1月再平衡）
+    日度数据: 偏移 0~365 天（--frequency B，按 --day-step 取样）
+
+用法:
+    python3 code/rebalance_timing.py config/*.json
+    python3 code/rebalance_timing.py config/全美股_config.json --frequency B --day-step 7
+    python3 code/rebalance_timing.py --check     # 高相关两资产组合的离散程度应接近0
+"""
+
+import numpy as np
+import pandas as pd
+
+from batch_engine import path_metrics, simulate_holdings
+from dynamic_weights import rebalance_weights
+from 永久投资组合分析_配置版 import build_portfolio_df
+
+# 各频率的名义每年期数（用于检查数据是否比请求的频率更粗）
+PERIODS_PER_YEAR = {'ME': 12, 'B': 252}
+
+# 高相关两资产组合自检允许的CAGR极差（%）
+CHECK_TOLERANCE = 0.05
+
+
+def observed_periods_per_year(index):
+    """
+    按实际经过的时间计算每年期数（行数 - 1）/ 年数，年化不依赖名义频率
+
+    参数:
+        index: DatetimeIndex
+
+    返回:
+        每年期数；少于两行时返回名义月度12
+    """
+    if len(index) < 2:
+        return 12
+    years = (index[-1] - index[0]).days / 365.25
+    return (len(index) - 1) / years
+
+
+def offset_masks(index, offsets, unit='month'):
+    """
+    各偏移量的再平衡点：把日期向前平移偏移量后按年份分段，每段第一行再平衡
+
+    参数:
+        index: DatetimeIndex
+        offsets: 偏移量序列
+        unit: 'month' 或 'day'
+
+    返回:
+        (O, T) 布尔数组，第一列全为True
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)[:, None]
+    if unit == 'month':
+        months = np.asarray(index.year, dtype=np.int64) * 12 + np.asarray(index.month) - 1
+        period = (months[None, :] - offsets) // 12
+    else:
+        days = np.asarray(index.values.astype('datetime64[D]'), dtype=np.int64)
+        shifted = (days[None, :] - offsets).astype('datetime64[D]')
+        period = shifted.astype('datetime64[Y]').astype(np.int64)
+    masks = np.ones(period.shape, dtype=bool)
+    masks[:, 1:] = period[:, 1:] != period[:, :-1]
+    return masks
+
+
+def simulate_rebalance_masks(prices, weights, masks, initial_value=10000):
+    """
+    多组再平衡时点同时模拟（再平衡行按漂移后的持仓计价，见 simulate_holdings 的 drift）
+
+    参数:
+        prices: (T, N) 价格数组
+        weights: (N,) 固定权重，或长度为O的列表，每项为该时点版本各再平衡点的 (K_o, N) 权重
+        masks: (O, T) 再平衡点
+        initial_value: 初始投资金额
+
+    返回:
+        values: (T, O) 组合价值
+    """
+    if not isinstance(weights, np.ndarray):
+        # 各时点版本的再平衡点数不同，按最多的补齐成 (O, K, N)
+        longest = max(len(w) for w in weights)
+        weights = np.stack([np.concatenate([w, np.repeat(w[-1:], longest - len(w), axis=0)]) for w in weights])
+    return simulate_holdings(prices, weights, masks, initial_value, drift=True).sum(axis=2).T
+
+
+def correlated_pair_check(correlation=0.99, periods=360, seed=0):
+    """
+    模拟数据上的自检：两个高度相关的资产之间几乎没有可再平衡的价差，各时点版本的CAGR应几乎相同
+
+    参数:
+        correlation: 两资产月收益率的相关系数
+        periods: 月数
+        seed: 随机种子
+
+    返回:
+        各月份偏移下CAGR的极差（%）
+    """
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((periods, 2))
+    shocks[:, 1] = correlation * shocks[:, 0] + np.sqrt(1 - correlation ** 2) * shocks[:, 1]
+    returns = 0.006 + 0.045 * shocks
+    prices = np.vstack([np.ones((1, 2)), np.cumprod(1 + returns, axis=0)])
+    index = pd.date_range('1990-01-31', periods=periods + 1, freq='ME')
+    offsets = np.arange(12)
+    values = simulate_rebalance_masks(prices, np.array([0.5, 0.5]), offset_masks(index, offsets))
+    cagr = path_metrics(values)['cagr']
+    return cagr.max() - cagr.min()
+
+
+def offset_label(offset, unit):
+    """偏移量的可读标识：月度为起始月份，日度为起始日（平年月-日）"""
+    if unit == 'month':
+        return f"{offset + 1}月"
+    return str(np.datetime64('2001-01-01') + np.timedelta64(int(offset), 'D'))[5:]
+
+
+def timing_sensitivity(config, base_path, frequency='ME', day_step=1, panel_cache_dir=None, initial_value=10000,
+                       log=print):
+    """
+    计算配置在所有再平衡时点下的表现
+
+    参数:
+        config: 配置字典
+        base_path: 数据文件的基础路径
+        frequency: 'ME' 月度（偏移0~11个月）或 'B' 工作日（偏移0~365天）
+        day_step: 日度数据的偏移步长（天）
+        panel_cache_dir: 对齐面板的磁盘缓存目录（可选）
+        log: 输出函数（源数据比请求的频率更粗时提示）
+
+    返回:
+        table: 每个偏移一行（CAGR、波动率、最大回撤、Sharpe、Calmar），无可用数据时返回None
+    """
+    portfolio_df = build_portfolio_df(config, base_path, log=lambda *args, **kwargs: None,
+                                      panel_cache_dir=panel_cache_dir, frequency=frequency)
+    if portfolio_df is None:
+        return None
+    prices = portfolio_df.to_numpy()
+    periods_per_year = observed_periods_per_year(portfolio_df.index)
+    if periods_per_year < PERIODS_PER_YEAR.get(frequency, 12) / 2:
+        log(f"⚠ {config['portfolio_name']}: 源数据比请求的频率 {frequency} 更粗"
+            f"（实际约每年 {periods_per_year:.0f} 期），按实际经过时间年化，日度偏移实际只在已有数据点之间移动")
+    unit = 'month' if frequency == 'ME' else 'day'
+    offsets = np.arange(12) if unit == 'month' else np.arange(0, 366, day_step)
+    masks = offset_masks(portfolio_df.index, offsets, unit)
+
+    weights = rebalance_weights(config, prices, masks[0])
+    if weights.ndim == 2:
+        weights = [rebalance_weights(config, prices, mask) for mask in masks]
+
+    values = simulate_rebalance_masks(prices, weights, masks, initial_value)
+    metrics = path_metrics(values, periods_per_year)
+    return pd.DataFrame({
+        '再平衡时点': [offset_label(o, unit) for o in offsets],
+        'CAGR(%)': metrics['cagr'],
+        '波动率(%)': metrics['volatility'],
+        '最大回撤(%)': metrics['max_drawdown'],
+        'Sharpe': metrics['sharpe'],
+        'Calmar': metrics['calmar'],
+    })
+
+
+def dispersion_summary(name, table):
+    """CAGR和最大回撤在各时点间的离散程度（一行）"""
+    cagr = table['CAGR(%)']
+    mdd = table['最大回撤(%)']
+    return {
+        '组合': name,
+        '时点数': len(table),
+        'CAGR最低(%)': cagr.min(),
+        'CAGR最高(%)': cagr.max(),
+        'CAGR极差(%)': cagr.max() - cagr.min(),
+        'CAGR标准差(%)': cagr.std(ddof=1),
+        '回撤最浅(%)': mdd.max(),
+        '回撤最深(%)': mdd.min(),
+        '回撤极差(%)': mdd.max() - mdd.min(),
+        '最佳时点': table.loc[cagr.idxmax(), '再平衡时点'],
+        '最差时点': table.loc[cagr.idxmin(), '再平衡时点'],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+    from 永久投资组合分析_配置版 import load_config
+
+    parser = argparse.ArgumentParser(description='再平衡时点敏感性分析')
+    parser.add_argument('configs', nargs='*', help='配置文件路径')
+    parser.add_argument('--frequency', default='ME', choices=list(PERIODS_PER_YEAR), help='ME 月度 / B 工作日')
+    parser.add_argument('--day-step', type=int, default=1, help='日度数据的偏移步长（天）')
+    parser.add_argument('--details', action='store_true', help='打印每个组合各时点的明细')
+    parser.add_argument('--output', help='离散程度汇总表的CSV输出路径')
+    parser.add_argument('--check', action='store_true', help='在模拟的高相关两资产组合上检查离散程度接近0')
+    args = parser.parse_args()
+
+    if args.check:
+        spread = correlated_pair_check()
+        passed = spread < CHECK_TOLERANCE
+        print(f"{'✓' if passed else '✗'} 高相关两资产组合各时点CAGR极差 {spread:.4f}%（阈值 {CHECK_TOLERANCE}%）")
+        raise SystemExit(0 if passed else 1)
+    if not args.configs:
+        parser.error('请指定配置文件路径')
+
+    start = time.perf_counter()
+    rows = []
+    for config_path in args.configs:
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+        table = timing_sensitivity(config, base_path, args.frequency, args.day_step)
+        if table is None:
+            continue
+        if args.details:
+            print(f"\n{config['portfolio_name']}")
+            print(table.round(2).to_string(index=False))
+        rows.append(dispersion_summary(config['portfolio_name'], table))
+
+    summary = pd.DataFrame(rows).round(2)
+    print("\n" + "="*80)
+    print("再平衡时点敏感性（CAGR / 最大回撤在各时点间的分布）")
+    print("="*80)
+    print(summary.to_string(index=False))
+    if args.output:
+        summary.to_csv(args.output, index=False, encoding='utf-8-sig')
+        print(f"\n✓ 已保存至: {args.output}")
+    print(f"\n✓ 用时 {time.perf_counter() - start:.2f}s")
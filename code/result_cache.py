@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析结果缓存
+缓存键 = sha256(规范化配置JSON + 各数据文件（含替代序列）内容哈希 + 引擎版本)，
+结果以JSON保存在结果库的 result_cache 表中。配置和数据都没变的组合直接返回缓存结果，
+不再重新计算、也不重写CSV；引擎计算口径变化时提高 ENGINE_VERSION 使旧缓存失效
+命中缓存只需要标准库，计算引擎（pandas/numpy）在未命中时才导入
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from engine_meta import ENGINE_VERSION, file_fingerprint, generate_filename
+from results_store import config_hash
+
+# 进程内缓存：(文件路径, 修改时间, 大小) -> 内容哈希
+_DIGESTS = {}
+_DIGEST_LOCK = threading.Lock()
+
+
+def file_digest(file_path):
+    """文件内容的sha256（文件未变化时复用上次结果）"""
+    stamp = (os.path.abspath(file_path),) + file_fingerprint(file_path)
+    with _DIGEST_LOCK:
+        digest = _DIGESTS.get(stamp)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with _DIGEST_LOCK:
+            _DIGESTS[stamp] = digest
+    return digest
+
+
+def data_fingerprints(config, base_path):
+    """配置引用的数据文件（含替代序列）及其内容哈希，按文件名排序"""
+    files = set()
+    for asset in config['assets']:
+        if asset.get('type') == 'cash':
+            continue
+        files.add(asset['data_file'])
+        if asset.get('proxy'):
+            files.add(asset['proxy']['data_file'])
+    return [[f, file_digest(os.path.join(base_path, f))] for f in sorted(files)]
+
+
+def result_cache_key(config, base_path):
+    """结果缓存键"""
+    payload = {'config': config, 'data': data_fingerprints(config, base_path), 'engine': ENGINE_VERSION}
+    normalized = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _ensure_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS result_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        config_hash TEXT,
+                        engine_version INTEGER,
+                        result TEXT,
+                        created_at TEXT)''')
+
+
+def cached_analysis(config, base_path, conn, force=False, save_csv=True, **kwargs):
+    """
+    带缓存的 run_analysis
+
+    参数:
+        config: 配置字典
+        base_path: 数据文件和输出目录的基础路径
+        conn: 结果库连接（缓存表与结果表在同一库中；结果表的写入由调用方批量进行）
+        force: 忽略缓存重新计算
+        save_csv: 是否保存综合分析表CSV（CSV不存在时即使命中缓存也重新计算）
+        kwargs: 传给 run_analysis 的其他参数
+
+    返回:
+        (result, hit)：result为结构化结果（无可用数据时为None），hit表示是否命中缓存
+    """
+    _ensure_table(conn)
+    key = result_cache_key(config, base_path)
+    if not force:
+        row = conn.execute('SELECT result FROM result_cache WHERE cache_key = ?', (key,)).fetchone()
+        csv_ready = not save_csv or os.path.exists(os.path.join(base_path, '永久投资组合', generate_filename(config)))
+        if row is not None and csv_ready:
+            return json.loads(row[0]), True
+
+    from 永久投资组合分析_配置版 import run_analysis
+    result = run_analysis(config, base_path, save_csv=save_csv, **kwargs)
+    if result is not None:
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?, ?, ?)',
+                         (key, config_hash(config), ENGINE_VERSION, json.dumps(result, ensure_ascii=False),
+                          datetime.now().isoformat(timespec='seconds')))
+    return result, False
+
+
+def clear_result_cache(conn):
+    """清空结果缓存"""
+    _ensure_table(conn)
+    with conn:
+        conn.execute('DELETE FROM result_cache')
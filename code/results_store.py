@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析结果存储 - SQLite版
+每个配置的分析结果以类型化的列写入同一个SQLite库，按配置哈希去重，
+便于批量写入和按指标筛选、排序（如：按Calmar排名前20且最大回撤 > -15%）
+"""
+
+import sqlite3
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+# 汇总表的列定义（列名, SQLite类型）
+RESULT_COLUMNS = [
+    ('config_hash', 'TEXT PRIMARY KEY'),
+    ('portfolio_name', 'TEXT'),
+    ('filename', 'TEXT'),
+    ('rebalance_frequency', 'TEXT'),
+    ('assets', 'TEXT'),
+    ('start_date', 'TEXT'),
+    ('end_date', 'TEXT'),
+    ('months', 'INTEGER'),
+    ('final_value', 'REAL'),
+    ('total_return', 'REAL'),
+    ('cagr', 'REAL'),
+    ('volatility', 'REAL'),
+    ('sharpe', 'REAL'),
+    ('max_drawdown', 'REAL'),
+    ('peak_date', 'TEXT'),
+    ('trough_date', 'TEXT'),
+    ('recovery_date', 'TEXT'),
+    ('recovery_months', 'INTEGER'),
+    ('calmar', 'REAL'),
+    ('return_3y', 'REAL'),
+    ('return_5y', 'REAL'),
+    ('return_10y', 'REAL'),
+    ('return_15y', 'REAL'),
+    ('return_20y', 'REAL'),
+    ('updated_at', 'TEXT'),
+]
+
+RESULT_FIELDS = [name for name, _ in RESULT_COLUMNS]
+
+# 可用于筛选和排序的数值列
+NUMERIC_FIELDS = [name for name, sql_type in RESULT_COLUMNS if sql_type in ('REAL', 'INTEGER')]
+
+FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def default_store_path(base_path):
+    """默认的结果库路径（与CSV结果同目录）"""
+    return os.path.join(base_path, '永久投资组合', 'results.db')
+
+
+def format_metric(value, spec='.2f'):
+    """格式化指标值，空值（如没有回撤时的Calmar）显示为 -"""
+    return '-' if value is None else format(value, spec)
+
+
+def config_hash(config):
+    """计算配置的哈希值（键排序后的规范化JSON）"""
+    normalized = json.dumps(config, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def open_store(store_path):
+    """打开（必要时创建）结果库"""
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    conn = sqlite3.connect(store_path)
+    conn.row_factory = sqlite3.Row
+
+    columns_sql = ', '.join(f'{name} {sql_type}' for name, sql_type in RESULT_COLUMNS)
+    conn.execute(f'CREATE TABLE IF NOT EXISTS portfolio_results ({columns_sql})')
+    conn.execute('''CREATE TABLE IF NOT EXISTS annual_returns (
+                        config_hash TEXT,
+                        year INTEGER,
+                        start_value REAL,
+                        end_value REAL,
+                        annual_return REAL,
+                        PRIMARY KEY (config_hash, year))''')
+    for column in ['cagr', 'calmar', 'max_drawdown', 'sharpe']:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_results_{column} ON portfolio_results ({column})')
+    conn.commit()
+    return conn
+
+
+def save_results(conn, results):
+    """
+    批量写入分析结果（单个事务）
+
+    参数:
+        conn: open_store返回的连接
+        results: analyze_portfolio返回的结果字典列表
+    """
+    updated_at = datetime.now().isoformat(timespec='seconds')
+
+    summary_rows = []
+    annual_rows = []
+    for result in results:
+        row = dict(result['summary'])
+        row['updated_at'] = updated_at
+        summary_rows.append(tuple(row.get(name) for name in RESULT_FIELDS))
+        for item in result['annual_returns']:
+            annual_rows.append((row['config_hash'], item['year'], item['start_value'],
+                                item['end_value'], item['annual_return']))
+
+    placeholders = ', '.join('?' for _ in RESULT_FIELDS)
+    with conn:
+        conn.executemany(f'INSERT OR REPLACE INTO portfolio_results ({", ".join(RESULT_FIELDS)}) '
+                         f'VALUES ({placeholders})', summary_rows)
+        conn.executemany('DELETE FROM annual_returns WHERE config_hash = ?',
+                         [(row[0],) for row in summary_rows])
+        conn.executemany('INSERT INTO annual_returns VALUES (?, ?, ?, ?, ?)', annual_rows)
+
+
+def parse_filter(expression):
+    """解析筛选条件，如 'max_drawdown>-15' -> ('max_drawdown', '>', -15.0)"""
+    match = FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"无法解析筛选条件: {expression}")
+    column, op, value = match.groups()
+    if column not in NUMERIC_FIELDS:
+        raise ValueError(f"不支持的筛选列: {column}")
+    return column, op, float(value)
+
+
+def query_results(conn, order_by='calmar', descending=True, limit=20, filters=None):
+    """
+    按条件筛选并排序结果
+
+    参数:
+        order_by: 排序列（数值列）
+        descending: 是否降序
+        limit: 返回行数，None表示全部
+        filters: [(列名, 运算符, 数值), ...]
+    """
+    if order_by not in NUMERIC_FIELDS:
+        raise ValueError(f"不支持的排序列: {order_by}")
+
+    sql = 'SELECT * FROM portfolio_results'
+    params = []
+    if filters:
+        clauses = []
+        for column, op, value in filters:
+            if column not in NUMERIC_FIELDS:
+                raise ValueError(f"不支持的筛选列: {column}")
+            clauses.append(f'{column} {op} ?')
+            params.append(value)
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += f' ORDER BY {order_by} {"DESC" if descending else "ASC"}'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(int(limit))
+
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def load_annual_returns(conn, config_hashes=None):
+    """读取年度收益率（可按配置哈希过滤）"""
+    sql = 'SELECT * FROM annual_returns'
+    params = []
+    if config_hashes:
+        sql += f' WHERE config_hash IN ({", ".join("?" for _ in config_hashes)})'
+        params = list(config_hashes)
+    sql += ' ORDER BY config_hash, year'
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='查询投资组合分析结果库')
+    parser.add_argument('--store', default=default_store_path(base_path), help='结果库路径')
+    parser.add_argument('--order-by', default='calmar', choices=NUMERIC_FIELDS, help='排序列')
+    parser.add_argument('--ascending', action='store_true', help='升序排列')
+    parser.add_argument('--top', type=int, default=20, help='返回行数')
+    parser.add_argument('--where', action='append', default=[],
+                        help="筛选条件，可重复，如 --where 'max_drawdown>-15'")
+    args = parser.parse_args()
+
+    conn = open_store(args.store)
+    rows = query_results(conn, order_by=args.order_by, descending=not args.ascending,
+                         limit=args.top, filters=[parse_filter(w) for w in args.where])
+
+    print(f"{'组合':<20}{'CAGR(%)':>10}{'最大回撤(%)':>12}{'Calmar':>10}{'Sharpe':>10}  文件")
+    for row in rows:
+        print(f"{row['portfolio_name']:<20}{format_metric(row['cagr']):>10}{format_metric(row['max_drawdown']):>12}"
+              f"{format_metric(row['calmar']):>10}{format_metric(row['sharpe']):>10}  {row['filename']}")
+    print(f"\n共 {len(rows)} 条结果")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起始年份 × 结束年份 年化收益率矩阵
+对任意价格/组合价值序列，计算从每个起始年初持有到每个结束年末的几何平均年化收益率（上三角矩阵），
+把 3/5/10/15/20 年几个固定期限扩展为全部起止组合；矩阵由年初值、年末值数组一次广播算出，并绘制热力图
+
+起始值为起始年的第一个值，结束值为结束年的最后一个值（与年度收益率口径一致），
+年数按覆盖的月份数（含首尾月）/ 12 计算，完整年份的对角线即为该年的年度收益率
+
+用法:
+    python3 code/return_matrix.py                                  # config/下全部组合及其底层资产
+    python3 code/return_matrix.py config/保守型_config.json --no-assets
+"""
+
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 使用非交互式后端
+import matplotlib.pyplot as plt
+from matplotlib.colors import TwoSlopeNorm
+import warnings
+warnings.filterwarnings('ignore')
+
+# 设置中文字体
+plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # Mac系统中文字体
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+
+def cagr_matrix(series):
+    """
+    计算起止年份年化收益率矩阵
+
+    参数:
+        series: pd.Series，以日期为索引的价格或组合价值
+
+    返回:
+        DataFrame，行为起始年份、列为结束年份，值为年化收益率(%)；结束年早于起始年的为NaN
+    """
+    series = series.dropna().sort_index()
+    yearly = series.groupby(series.index.year)
+    first_value = yearly.first().to_numpy()
+    last_value = yearly.last().to_numpy()
+    first_date = series.index.to_series().groupby(series.index.year).first()
+    last_date = series.index.to_series().groupby(series.index.year).last()
+    first_month = first_date.dt.year.to_numpy() * 12 + first_date.dt.month.to_numpy()
+    last_month = last_date.dt.year.to_numpy() * 12 + last_date.dt.month.to_numpy()
+
+    # (起始年, 1) 与 (1, 结束年) 广播成 (Y, Y)
+    months = last_month[None, :] - first_month[:, None] + 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = ((last_value[None, :] / first_value[:, None]) ** (12 / months) - 1) * 100
+    matrix[months <= 0] = np.nan
+
+    years = first_date.index.to_numpy()
+    return pd.DataFrame(matrix, index=pd.Index(years, name='起始年份'), columns=pd.Index(years, name='结束年份'))
+
+
+def matrix_long_table(matrices):
+    """把多个矩阵整理成长表：标的、起始年份、结束年份、年化收益率(%)"""
+    frames = [m.stack().rename('年化收益率(%)').reset_index().assign(标的=name)
+              for name, m in matrices.items()]
+    long_df = pd.concat(frames, ignore_index=True)
+    return long_df[['标的', '起始年份', '结束年份', '年化收益率(%)']].round(2)
+
+
+def plot_cagr_heatmap(matrix, title, output, annotate=None):
+    """
+    绘制年化收益率热力图（红负绿正，以0为中点）
+
+    参数:
+        matrix: cagr_matrix 的结果
+        title: 图表标题
+        output: 输出图片路径
+        annotate: 是否在格子中标注数值（默认年份数不超过25时标注）
+    """
+    values = matrix.to_numpy()
+    n = len(matrix)
+    annotate = n <= 25 if annotate is None else annotate
+    bound = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+    bound = max(bound, 1e-6)
+
+    size = max(8, n * 0.45)
+    fig, ax = plt.subplots(figsize=(size + 2, size))
+    image = ax.imshow(np.ma.masked_invalid(values), cmap='RdYlGn',
+                      norm=TwoSlopeNorm(vmin=-bound, vcenter=0, vmax=bound))
+    ax.set_xticks(range(n))
+    ax.set_xticklabels(matrix.columns, rotation=90)
+    ax.set_yticks(range(n))
+    ax.set_yticklabels(matrix.index)
+    ax.set_xlabel('结束年份', fontsize=14, fontweight='bold')
+    ax.set_ylabel('起始年份', fontsize=14, fontweight='bold')
+    ax.set_title(title, fontsize=18, fontweight='bold', pad=20)
+
+    if annotate:
+        rows, cols = np.nonzero(np.isfinite(values))
+        for i, j in zip(rows, cols):
+            ax.text(j, i, f'{values[i, j]:.1f}', ha='center', va='center', fontsize=7)
+
+    fig.colorbar(image, ax=ax, label='年化收益率 (%)', shrink=0.8)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from generate_comparison_table import collect_series
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='起止年份年化收益率矩阵与热力图')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--no-assets', action='store_true', help='不包含底层资产')
+    parser.add_argument('--no-portfolios', action='store_true', help='不包含投资组合')
+    parser.add_argument('--no-charts', action='store_true', help='只输出矩阵表，不绘制热力图')
+    parser.add_argument('--graph-dir', default=os.path.join(base_path, 'graph'), help='热力图输出目录')
+    parser.add_argument('--output', default=os.path.join(base_path, 'table', '起止年份年化收益矩阵.csv'),
+                        help='矩阵长表CSV路径')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+
+    print("="*80)
+    print("开始计算起止年份年化收益率矩阵")
+    print("="*80)
+    start = time.perf_counter()
+
+    series = collect_series(config_paths, include_assets=not args.no_assets,
+                            include_portfolios=not args.no_portfolios)
+    matrices = {name: cagr_matrix(s) for name, s in series.items()}
+
+    for name, matrix in matrices.items():
+        valid = matrix.stack()
+        print(f"{name}: {len(matrix)}年, 最差 {valid.min():.2f}%（{valid.idxmin()[0]}-{valid.idxmin()[1]}）, "
+              f"最好 {valid.max():.2f}%（{valid.idxmax()[0]}-{valid.idxmax()[1]}）")
+        if not args.no_charts:
+            safe_name = name.replace('/', '_')
+            plot_cagr_heatmap(matrix, f'{name} 起止年份年化收益率 (%)',
+                              os.path.join(args.graph_dir, f'{safe_name}_收益矩阵.png'))
+
+    matrix_long_table(matrices).to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"\n✓ 矩阵长表已保存至: {args.output}")
+    if not args.no_charts:
+        print(f"✓ {len(matrices)} 张热力图已保存至: {args.graph_dir}")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    print("="*80)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动协方差/相关系数
+在对齐价格面板的资产收益率上，用Welford式增量更新（加入新观测、移出旧观测）计算
+滚动或扩展窗口的协方差矩阵和相关系数矩阵，输出 (T, N, N) 数组；
+用于观察股票/债券/黄金之间的分散化关系是否仍然成立
+
+用法:
+    python3 code/rolling_covariance.py config/保守型_config.json --window 36
+"""
+
+import os
+
+import numpy as np
+
+
+def panel_returns(prices):
+    """价格面板 (T, N) -> 简单收益率 (T-1, N)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    return prices[1:] / prices[:-1] - 1
+
+
+def rolling_covariance(returns, window=None, min_periods=2):
+    """
+    增量计算滚动（window为整数）或扩展（window为None）窗口协方差矩阵
+
+    每一步只做一次rank-1更新：
+        加入x: n += 1; d = x - mean; mean += d / n; M += outer(d, x - mean)
+        移出y: n -= 1; d = y - mean; mean -= d / n; M -= outer(d, y - mean)
+    协方差 = M / (n - 1)
+
+    参数:
+        returns: (T, N) 收益率
+        window: 窗口长度（期数），None表示扩展窗口
+        min_periods: 观测数少于该值时输出NaN
+
+    返回:
+        cov: (T, N, N) 协方差矩阵，cov[t] 为截至第t期（含）的窗口
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    T, N = returns.shape
+    cov = np.full((T, N, N), np.nan)
+
+    n = 0
+    mean = np.zeros(N)
+    moment = np.zeros((N, N))
+    for t in range(T):
+        x = returns[t]
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        moment += np.outer(delta, x - mean)
+
+        if window is not None and n > window:
+            y = returns[t - window]
+            n -= 1
+            delta = y - mean
+            mean -= delta / n
+            moment -= np.outer(delta, y - mean)
+
+        if n >= max(min_periods, 2):
+            cov[t] = moment / (n - 1)
+
+    return cov
+
+
+def covariance_to_correlation(cov):
+    """(T, N, N) 协方差 -> 相关系数（方差为0的资产对应NaN）"""
+    std = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / (std[:, :, None] * std[:, None, :])
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_correlation(returns, window=None, min_periods=2):
+    """滚动/扩展窗口相关系数矩阵 (T, N, N)"""
+    return covariance_to_correlation(rolling_covariance(returns, window, min_periods))
+
+
+def average_pairwise_correlation(corr):
+    """每期所有资产两两相关系数的平均值 (T,)"""
+    N = corr.shape[1]
+    upper = np.triu_indices(N, k=1)
+    return np.nanmean(corr[:, upper[0], upper[1]], axis=1) if N > 1 else np.full(len(corr), np.nan)
+
+
+def config_return_panel(config, base_path, frequency='ME', panel_cache_dir=None, log=print):
+    """
+    取配置中非现金资产的对齐收益率面板
+
+    返回:
+        dates: (T-1,) 收益率对应的期末日期
+        returns: (T-1, N)
+        names: 资产简称列表
+    """
+    from price_panel import get_aligned_panel, panel_columns
+    from 永久投资组合分析_配置版 import load_asset_data
+
+    panel = get_aligned_panel(config['assets'], base_path, load_asset_data, frequency=frequency,
+                              cache_dir=panel_cache_dir, log=log, alignment=config.get('alignment'))
+    if panel is None:
+        raise ValueError("配置中没有非现金资产")
+
+    columns = []
+    names = []
+    for asset, j in zip(config['assets'], panel_columns(panel, config['assets'], frequency)):
+        if j is not None and j not in columns:
+            columns.append(j)
+            names.append(asset['name'])
+
+    return panel.dates[1:], panel_returns(panel.values[:, columns]), names
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from 永久投资组合分析_配置版 import load_config
+
+    parser = argparse.ArgumentParser(description='计算配置资产的滚动协方差/相关系数')
+    parser.add_argument('config', help='配置文件路径')
+    parser.add_argument('--window', type=int, default=36, help='滚动窗口期数，0表示扩展窗口')
+    parser.add_argument('--frequency', default='ME', help="重采样频率，如 'ME'（月）、'W'（周）")
+    parser.add_argument('--output', help='保存为 .npz（dates, cov, corr, names）')
+    args = parser.parse_args()
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(args.config)))
+    config = load_config(args.config)
+    dates, returns, names = config_return_panel(config, base_path, frequency=args.frequency)
+
+    window = args.window or None
+    cov = rolling_covariance(returns, window=window, min_periods=window or 2)
+    corr = covariance_to_correlation(cov)
+
+    print("="*80)
+    print(f"{config['portfolio_name']} - {'扩展' if window is None else f'{window}期滚动'}相关系数")
+    print("="*80)
+    print(f"\n最新窗口 ({pd.Timestamp(dates[-1]).strftime('%Y-%m')}):")
+    print(pd.DataFrame(corr[-1], index=names, columns=names).round(2).to_string())
+
+    # 每年末的平均两两相关系数
+    avg_corr = pd.Series(average_pairwise_correlation(corr), index=pd.DatetimeIndex(dates))
+    yearly = avg_corr.groupby(avg_corr.index.year).last().dropna()
+    print("\n平均两两相关系数（年末）:")
+    print(yearly.round(3).to_string())
+
+    if args.output:
+        np.savez_compressed(args.output, dates=dates.astype('int64'), cov=cov, corr=corr,
+                            names=np.array(names))
+        print(f"\n✓ 已保存: {args.output}")
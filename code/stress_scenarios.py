@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史压力情景回放
+把每个配置的组合按主程序规则完整模拟一次（同时记录各资产的累计贡献），
+各危机区间只是这些路径在共同月末日期轴上的下标范围，情景 × 组合 的峰谷跌幅、恢复时间和
+各资产贡献一次性在 (组合, 情景, 月份) 数组上向量化算出
+
+峰谷跌幅：区间内组合价值相对区间内此前最高点的最大跌幅；
+恢复月数：从谷底到组合价值重新回到该峰值的月数（可超出区间，直到数据结束，未恢复为空）；
+资产贡献：峰值到谷底之间各资产带来的价值变化 / 峰值，各资产之和等于峰谷跌幅。
+组合或其资产在区间开始前没有数据时，该情景记为无数据
+
+用法:
+    python3 code/stress_scenarios.py                          # config/下全部配置
+    python3 code/stress_scenarios.py config/保守型_config.json --scenario 2008全球金融危机
+"""
+
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+
+# 情景名称 -> (起始月份, 结束月份)；起始月末为危机前的基准点
+SCENARIOS = {
+    '2008全球金融危机': ('2007-10', '2009-03'),
+    '2015A股股灾': ('2015-05', '2016-01'),
+    '2018年四季度': ('2018-09', '2018-12'),
+    '2020新冠疫情': ('2020-01', '2020-03'),
+    '2022加息冲击': ('2021-12', '2022-10'),
+}
+
+SUMMARY_COLUMNS = ['情景', '组合', '峰值日期', '谷底日期', '峰谷跌幅(%)', '区间收益(%)', '恢复日期', '恢复月数', '备注']
+
+
+def _month_number(dates):
+    dates = pd.DatetimeIndex(dates)
+    return np.asarray(dates.year) * 12 + np.asarray(dates.month)
+
+
+def scenario_rows(dates, scenarios=None):
+    """
+    情景区间在日期轴上的下标范围
+
+    参数:
+        dates: 升序的月末日期
+        scenarios: {名称: (起始月份, 结束月份)}，默认 SCENARIOS
+
+    返回:
+        names, starts, ends：starts/ends 为 (S,) 下标，日期轴不覆盖的情景为 -1
+    """
+    scenarios = scenarios or SCENARIOS
+    months = _month_number(dates)
+    names = list(scenarios)
+    bounds = np.array([[_month_number([pd.Timestamp(s)])[0], _month_number([pd.Timestamp(e)])[0]]
+                       for s, e in scenarios.values()])
+    starts = np.searchsorted(months, bounds[:, 0])
+    ends = np.searchsorted(months, bounds[:, 1], side='right') - 1
+    covered = (starts < len(months)) & (ends >= 0)
+    covered &= months[np.minimum(starts, len(months) - 1)] == bounds[:, 0]
+    covered &= months[np.maximum(ends, 0)] == bounds[:, 1]
+    return names, np.where(covered, starts, -1), np.where(covered, ends, -1)
+
+
+def replay_scenarios(values, contributions, starts, ends):
+    """
+    情景 × 组合 回放（一次向量化计算）
+
+    参数:
+        values: (C, T) 各组合在共同日期轴上的价值，没有数据的日期为NaN
+        contributions: (C, T, N) 各资产的累计价值贡献（资产数不足N的组合补0）
+        starts, ends: (S,) 情景区间的起止下标（scenario_rows 的结果，-1 表示不覆盖）
+
+    返回:
+        dict，各项为 (C, S) 数组（contribution 为 (C, S, N)）：
+        loss 峰谷跌幅(%)、window_return 区间收益(%)、peak/trough/recovery 日期下标（未恢复为-1）、
+        contribution 峰值到谷底各资产贡献(%)；无数据的组合/情景为NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    C, T = values.shape
+    covered = starts >= 0
+    length = int((ends - starts)[covered].max()) + 1 if covered.any() else 1
+    offsets = np.arange(length)
+    rows = np.clip(starts[:, None] + offsets, 0, T - 1)                      # (S, L)
+    in_window = covered[:, None] & (starts[:, None] + offsets <= ends[:, None])
+
+    window = np.where(in_window, values[:, rows], np.nan)                     # (C, S, L)
+    valid = np.isfinite(window).sum(axis=2) == (in_window.sum(axis=1))[None, :]
+    valid &= covered[None, :]
+
+    running_peak = np.fmax.accumulate(window, axis=2)
+    drawdown = window / running_peak - 1
+    trough = np.where(np.isfinite(drawdown), drawdown, np.inf).argmin(axis=2)  # (C, S)
+    before_trough = offsets[None, None, :] <= trough[..., None]
+    peak = np.where(before_trough & np.isfinite(window), window, -np.inf).argmax(axis=2)
+
+    starts_cs = np.broadcast_to(starts, (C, len(starts)))
+    peak_row = starts_cs + peak
+    trough_row = starts_cs + trough
+    c_index = np.arange(C)[:, None]
+    peak_value = values[c_index, peak_row]
+    trough_value = values[c_index, trough_row]
+
+    # 谷底之后第一个回到峰值的日期（在整条路径上查找）
+    later = np.arange(T)[None, None, :] > trough_row[..., None]
+    recovered = later & (values[:, None, :] >= peak_value[..., None])
+    recovery = np.where(recovered.any(axis=2), recovered.argmax(axis=2), -1)
+    recovery = np.where(trough_value < peak_value, recovery, trough_row)
+
+    contribution = (contributions[c_index, trough_row] - contributions[c_index, peak_row]) \
+        / peak_value[..., None] * 100
+    end_value = values[c_index, np.broadcast_to(ends, (C, len(ends)))]
+    start_value = values[c_index, starts_cs]
+
+    nan = np.where(valid, 1.0, np.nan)
+    return {
+        'valid': valid,
+        'loss': (trough_value / peak_value - 1) * 100 * nan,
+        'window_return': (end_value / start_value - 1) * 100 * nan,
+        'peak': np.where(valid, peak_row, -1),
+        'trough': np.where(valid, trough_row, -1),
+        'recovery': np.where(valid, recovery, -1),
+        'contribution': contribution * nan[..., None],
+    }
+
+
+def simulate_configs(configs, base_path):
+    """
+    按主程序规则模拟各配置，对齐到共同的月末日期轴
+
+    返回:
+        dates, values (C, T), contributions (C, T, N), asset_names（每个组合的资产名称列表）
+    """
+    from dynamic_weights import rebalance_weights
+    from 永久投资组合分析_配置版 import annual_rebalance_mask, build_portfolio_df, rebalance_contributions
+
+    paths = []
+    for config in configs:
+        portfolio_df = build_portfolio_df(config, base_path, log=lambda *args, **kwargs: None)
+        prices = portfolio_df.to_numpy()
+        mask = annual_rebalance_mask(portfolio_df.index)
+        weights = rebalance_weights(config, prices, mask)
+        values, contributions = rebalance_contributions(prices, weights, mask)
+        paths.append((portfolio_df.index, values, contributions))
+
+    dates = pd.DatetimeIndex(np.unique(np.concatenate([index.values for index, _, _ in paths])))
+    n_assets = max(len(config['assets']) for config in configs)
+    all_values = np.full((len(configs), len(dates)), np.nan)
+    all_contributions = np.zeros((len(configs), len(dates), n_assets))
+    for c, (index, values, contributions) in enumerate(paths):
+        rows = dates.get_indexer(index)
+        all_values[c, rows] = values
+        all_contributions[c, rows, :contributions.shape[1]] = contributions
+    asset_names = [[a['name'] for a in config['assets']] for config in configs]
+    return dates, all_values, all_contributions, asset_names
+
+
+def scenario_tables(configs, base_path, scenarios=None):
+    """
+    全部配置 × 全部情景的回放结果
+
+    返回:
+        summary: 每个 (情景, 组合) 一行
+        contributions: 长表，每个 (情景, 组合, 资产) 一行
+    """
+    dates, values, contributions, asset_names = simulate_configs(configs, base_path)
+    names, starts, ends = scenario_rows(dates, scenarios)
+    result = replay_scenarios(values, contributions, starts, ends)
+    months = _month_number(dates)
+
+    def date_at(row):
+        return dates[row].strftime('%Y-%m') if row >= 0 else None
+
+    summary_rows = []
+    contribution_rows = []
+    for s, scenario in enumerate(names):
+        for c, config in enumerate(configs):
+            row = {'情景': scenario, '组合': config['portfolio_name']}
+            if not result['valid'][c, s]:
+                summary_rows.append({**row, '备注': '无数据'})
+                continue
+            peak, trough, recovery = result['peak'][c, s], result['trough'][c, s], result['recovery'][c, s]
+            summary_rows.append({
+                **row,
+                '峰值日期': date_at(peak),
+                '谷底日期': date_at(trough),
+                '峰谷跌幅(%)': result['loss'][c, s],
+                '区间收益(%)': result['window_return'][c, s],
+                '恢复日期': date_at(recovery),
+                '恢复月数': int(months[recovery] - months[trough]) if recovery >= 0 else None,
+                '备注': '' if recovery >= 0 else '未恢复',
+            })
+            for i, asset in enumerate(asset_names[c]):
+                contribution_rows.append({**row, '资产': asset, '峰谷贡献(%)': result['contribution'][c, s, i]})
+
+    summary = pd.DataFrame(summary_rows).reindex(columns=SUMMARY_COLUMNS)
+    summary['恢复月数'] = summary['恢复月数'].astype('Int64')
+    return summary, pd.DataFrame(contribution_rows, columns=['情景', '组合', '资产', '峰谷贡献(%)'])
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from 永久投资组合分析_配置版 import load_config
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='历史压力情景回放：峰谷跌幅、恢复时间与各资产贡献')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='只回放指定情景（可重复）')
+    parser.add_argument('--table-dir', default=os.path.join(base_path, 'table'), help='表格输出目录')
+    args = parser.parse_args()
+
+    config_paths = args.configs or sorted(glob.glob(os.path.join(base_path, 'config', '*.json')))
+    configs = []
+    for config_path in config_paths:
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        configs.append(config)
+    scenarios = {name: SCENARIOS[name] for name in args.scenario} if args.scenario else SCENARIOS
+
+    print("="*80)
+    print(f"历史压力情景回放: {len(configs)} 个组合 × {len(scenarios)} 个情景")
+    print("="*80)
+    start = time.perf_counter()
+
+    summary, contributions = scenario_tables(configs, base_path, scenarios)
+
+    print("\n峰谷跌幅(%):")
+    print(summary.pivot(index='组合', columns='情景', values='峰谷跌幅(%)')
+          .reindex(columns=list(scenarios)).round(2).to_string(na_rep='-'))
+    print("\n恢复月数（谷底到回到峰值）:")
+    print(summary.pivot(index='组合', columns='情景', values='恢复月数')
+          .reindex(columns=list(scenarios)).map(lambda v: '-' if pd.isna(v) else int(v)).to_string())
+    if len(contributions):
+        print("\n峰谷区间各资产贡献(%):")
+        print(contributions.pivot_table(index=['情景', '组合'], columns='资产', values='峰谷贡献(%)',
+                                        sort=False).round(2).to_string(na_rep='-'))
+
+    os.makedirs(args.table_dir, exist_ok=True)
+    summary.round(2).to_csv(os.path.join(args.table_dir, '压力情景回放.csv'), index=False, encoding='utf-8-sig')
+    contributions.round(2).to_csv(os.path.join(args.table_dir, '压力情景资产贡献.csv'), index=False,
+                                  encoding='utf-8-sig')
+    print(f"\n✓ 表格已保存至: {args.table_dir}")
+    print(f"✓ 用时 {time.perf_counter() - start:.2f}s")
+    print("="*80)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成资产：每日重置的杠杆/反向序列
+由 data/ 中已有资产的价格序列派生，无需额外数据文件。配置示例（2倍纳指）:
+    {
+      "name": "Nas2x", "full_name": "Nasdaq 100 TR 2倍", "type": "leveraged", "weight": 0.2,
+      "data_file": "data/Nasdaq 100 TR Historical Data.csv",
+      "date_format": "%m/%d/%Y", "date_column": "Date", "price_column": "Price",
+      "leverage": 2, "expense_ratio": 0.0095, "borrow_spread": 0.005
+    }
+
+每期收益 = L × 标的收益 + (1 - L) × 现金利率 - max(L - 1, 0) × 借款利差 - 费率
+（L > 1 时借入 L-1 倍资金支付现金利率；反向 L < 0 时卖空所得和本金按现金利率计息）
+年化利率/费率按每期的实际天数折算；cash_rate 未设置时取组合中现金资产的 annual_return，
+没有现金资产时为0。净值跌到0后保持为0
+
+杠杆在源数据的每个观测期重置：日度数据即每日重置，月度数据则为每月重置（波动损耗会被低估）
+"""
+
+import numpy as np
+import pandas as pd
+
+SYNTHETIC_TYPES = ('leveraged',)
+
+# 合成资产参数及默认值
+LEVERAGED_DEFAULTS = {'cash_rate': None, 'borrow_spread': 0.0, 'expense_ratio': 0.0}
+
+
+def with_cash_rate(assets):
+    """为未设置cash_rate的杠杆资产填入组合现金资产的年化收益率（返回新列表）"""
+    cash = next((a['annual_return'] for a in assets if a.get('type') == 'cash'), 0.0)
+    return [dict(asset, cash_rate=cash) if asset.get('type') == 'leveraged' and asset.get('cash_rate') is None
+            else asset for asset in assets]
+
+
+def synthetic_key(asset):
+    """合成参数（进入面板缓存键），普通资产为None"""
+    if asset.get('type') != 'leveraged':
+        return None
+    params = {**LEVERAGED_DEFAULTS, **{k: asset[k] for k in LEVERAGED_DEFAULTS if k in asset}}
+    return ('leveraged', float(asset['leverage']), float(params['cash_rate'] or 0.0),
+            float(params['borrow_spread']), float(params['expense_ratio']))
+
+
+def leveraged_prices(dates, prices, leverage, cash_rate=0.0, borrow_spread=0.0, expense_ratio=0.0):
+    """
+    每期重置的杠杆/反向净值（向量化累乘）
+
+    参数:
+        dates: (T,) 升序日期
+        prices: (T,) 标的价格
+        leverage: 杠杆倍数（2、3，反向为 -1、-2）
+        cash_rate: 年化现金（融资）利率
+        borrow_spread: 借款在现金利率之上的年化利差
+        expense_ratio: 年化费率
+
+    返回:
+        (T,) 合成净值，首值与标的首值相同
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    days = np.diff(pd.DatetimeIndex(dates).values.astype('datetime64[D]').astype(np.int64))
+    years = days / 365.25
+    returns = prices[1:] / prices[:-1] - 1
+
+    def per_period(annual_rate):
+        return (1 + annual_rate) ** years - 1
+
+    period_returns = (leverage * returns
+                      + (1 - leverage) * per_period(cash_rate)
+                      - max(leverage - 1, 0) * per_period(borrow_spread)
+                      - per_period(expense_ratio))
+    growth = np.cumprod(np.maximum(1 + period_returns, 0))
+    return prices[0] * np.concatenate(([1.0], growth))
+
+
+def apply_synthetic(asset, df):
+    """
+    按资产类型把加载的标的数据转换为合成序列，普通资产原样返回
+
+    参数:
+        asset: 资产配置（杠杆资产需已填入cash_rate，见 with_cash_rate）
+        df: DataFrame(Date, Price)，按日期升序
+    """
+    key = synthetic_key(asset)
+    if key is None or df is None:
+        return df
+    _, leverage, cash_rate, borrow_spread, expense_ratio = key
+    df = df.drop_duplicates('Date', keep='last')
+    return pd.DataFrame({
+        'Date': df['Date'].to_numpy(),
+        'Price': leveraged_prices(df['Date'], df['Price'].to_numpy(), leverage, cash_rate,
+                                  borrow_spread, expense_ratio),
+    })
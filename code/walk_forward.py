@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动前推（walk-forward）优化与样本外评估
+在训练窗口内按目标（CAGR / Calmar / Sharpe）从权重网格中选出最优权重，持有到下一个测试窗口，
+逐窗口前推，最后把各测试窗口拼接成样本外净值曲线；与全样本最优权重（样本内拟合）和配置权重对比
+
+各训练窗口相互独立，按 配置 × 窗口 分发到进程池并行计算；价格面板来自对齐面板缓存
+
+用法:
+    python3 code/walk_forward.py config/*.json --train-years 5 --test-years 1 --objective calmar
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_engine import MIN_DRAWDOWN, path_metrics, simulate_rebalance_batch, weight_grid
+
+OBJECTIVES = ('cagr', 'calmar', 'sharpe')
+
+
+def walk_forward_windows(years, train_years, test_years):
+    """
+    按自然年划分训练/测试窗口
+
+    返回:
+        [(训练年份列表, 测试年份列表), ...]
+    """
+    windows = []
+    first = train_years
+    while first < len(years):
+        train = years[first - train_years:first]
+        test = years[first:first + test_years]
+        windows.append((train, test))
+        first += test_years
+    return windows
+
+
+def optimize_window(prices, rebalance_mask, candidates, objective, min_drawdown=MIN_DRAWDOWN):
+    """
+    在一个训练窗口内评估全部候选权重，返回 (最优权重, 目标值)
+
+    参数:
+        prices: (T, N) 训练窗口价格
+        rebalance_mask: (T,) 训练窗口内的再平衡点（首行为True）
+        candidates: (M, N) 候选权重
+        objective: 'cagr' / 'calmar' / 'sharpe'
+        min_drawdown: 计算Calmar时回撤绝对值的下限（%），见 path_metrics
+    """
+    values = simulate_rebalance_batch(prices, candidates, rebalance_mask)
+    score = path_metrics(values, min_drawdown=min_drawdown)[objective]
+    best = int(np.nanargmax(np.where(np.isnan(score), -np.inf, score)))
+    return candidates[best], float(score[best])
+
+
+def _optimize_task(args):
+    key, prices, rebalance_mask, candidates, objective, min_drawdown = args
+    weights, score = optimize_window(prices, rebalance_mask, candidates, objective, min_drawdown)
+    return key, weights, score
+
+
+def walk_forward(tasks, workers=None):
+    """
+    并行优化所有 (配置, 窗口) 训练任务
+
+    参数:
+        tasks: [(key, prices, rebalance_mask, candidates, objective, min_drawdown), ...]
+        workers: 进程数，1表示串行
+
+    返回:
+        {key: (最优权重, 目标值)}
+    """
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_optimize_task, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_optimize_task, tasks, chunksize=max(1, len(tasks) // 32)))
+    return {key: (weights, score) for key, weights, score in results}
+
+
+def prepare_config(config, base_path, train_years, test_years, step, max_weight, objective,
+                   min_drawdown=MIN_DRAWDOWN):
+    """构建配置的价格面板和全部训练任务"""
+    from 永久投资组合分析_配置版 import annual_rebalance_mask, build_portfolio_df
+
+    portfolio_df = build_portfolio_df(config, base_path, log=lambda *args, **kwargs: None)
+    prices = portfolio_df.to_numpy()
+    dates = portfolio_df.index
+    year_of_row = np.asarray(dates.year)
+    rebalance_mask = annual_rebalance_mask(dates)
+    candidates = weight_grid(prices.shape[1], step, max_weight)
+
+    windows = walk_forward_windows(sorted(set(year_of_row)), train_years, test_years)
+    tasks = []
+    for w, (train, _) in enumerate(windows):
+        rows = np.isin(year_of_row, train)
+        tasks.append(((config['portfolio_name'], w), prices[rows], rebalance_mask[rows], candidates,
+                      objective, min_drawdown))
+
+    return {
+        'prices': prices,
+        'dates': dates,
+        'year_of_row': year_of_row,
+        'rebalance_mask': rebalance_mask,
+        'candidates': candidates,
+        'windows': windows,
+        'tasks': tasks,
+    }
+
+
+def stitch_out_of_sample(prepared, chosen):
+    """
+    用各窗口选出的权重模拟样本外区间（每个测试年份的再平衡点采用对应窗口的权重）
+
+    返回:
+        oos_rows: 样本外区间的行掩码
+        values: 样本外净值曲线
+    """
+    from 永久投资组合分析_配置版 import simulate_rebalance
+
+    year_of_row = prepared['year_of_row']
+    first_test_year = prepared['windows'][0][1][0]
+    oos_rows = year_of_row >= first_test_year
+    mask = prepared['rebalance_mask'][oos_rows]
+
+    year_weights = {}
+    for w, (_, test) in enumerate(prepared['windows']):
+        for year in test:
+            year_weights[year] = chosen[w]
+    segment_years = year_of_row[oos_rows][mask]
+    weights = np.array([year_weights[year] for year in segment_years])
+
+    return oos_rows, simulate_rebalance(prepared['prices'][oos_rows], weights, mask)
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from 永久投资组合分析_配置版 import load_config
+
+    parser = argparse.ArgumentParser(description='滚动前推优化与样本外评估')
+    parser.add_argument('configs', nargs='+', help='配置文件路径')
+    parser.add_argument('--train-years', type=int, default=5, help='训练窗口年数')
+    parser.add_argument('--test-years', type=int, default=1, help='测试窗口年数（前推步长）')
+    parser.add_argument('--objective', default='calmar', choices=OBJECTIVES, help='优化目标')
+    parser.add_argument('--step', type=float, default=0.05, help='权重网格步长')
+    parser.add_argument('--max-weight', type=float, default=1.0, help='单一资产权重上限')
+    parser.add_argument('--min-drawdown', type=float, default=MIN_DRAWDOWN, help='Calmar中回撤绝对值的下限（%%）')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数，默认CPU核数')
+    parser.add_argument('--output-dir', help='保存样本外净值曲线CSV的目录')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    prepared = {}
+    configs = {}
+    all_tasks = []
+    for config_path in args.configs:
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+        config = load_config(config_path)
+        p = prepare_config(config, base_path, args.train_years, args.test_years,
+                           args.step, args.max_weight, args.objective, args.min_drawdown)
+        if not p['windows']:
+            print(f"{config['portfolio_name']}: 数据不足 {args.train_years + 1} 年，跳过")
+            continue
+        prepared[config['portfolio_name']] = p
+        configs[config['portfolio_name']] = config
+        all_tasks.extend(p['tasks'])
+
+    print("="*80)
+    print(f"滚动前推优化: 训练{args.train_years}年 / 测试{args.test_years}年 / 目标 {args.objective}")
+    print(f"{len(prepared)} 个配置，{len(all_tasks)} 个训练窗口")
+    print("="*80)
+
+    optimized = walk_forward(all_tasks, workers=args.workers)
+
+    summary_rows = []
+    for name, p in prepared.items():
+        config = configs[name]
+        asset_names = [a['name'] for a in config['assets']]
+        chosen = [optimized[(name, w)][0] for w in range(len(p['windows']))]
+
+        print(f"\n{name}")
+        window_rows = []
+        for w, (train, test) in enumerate(p['windows']):
+            row = {'训练区间': f"{train[0]}-{train[-1]}", '测试区间': f"{test[0]}-{test[-1]}",
+                   f'训练{args.objective}': round(optimized[(name, w)][1], 2)}
+            row.update({n: f"{x * 100:.0f}%" for n, x in zip(asset_names, chosen[w])})
+            window_rows.append(row)
+        print(pd.DataFrame(window_rows).to_string(index=False))
+
+        oos_rows, oos_values = stitch_out_of_sample(p, chosen)
+        oos_prices = p['prices'][oos_rows]
+        oos_mask = p['rebalance_mask'][oos_rows]
+
+        # 对比：配置权重、全样本最优权重（样本内拟合，仅作参照）在同一区间的表现
+        static = np.array([a['weight'] for a in config['assets']])
+        in_sample_best, _ = optimize_window(p['prices'], p['rebalance_mask'], p['candidates'],
+                                            args.objective, args.min_drawdown)
+        reference = simulate_rebalance_batch(oos_prices, np.vstack([static, in_sample_best]), oos_mask)
+        metrics = path_metrics(np.column_stack([oos_values, reference]), min_drawdown=args.min_drawdown)
+
+        for j, label in enumerate(['样本外(滚动前推)', '配置权重', '全样本最优(样本内)']):
+            summary_rows.append({
+                '组合': name, '方案': label,
+                'CAGR(%)': metrics['cagr'][j], '最大回撤(%)': metrics['max_drawdown'][j],
+                'Sharpe': metrics['sharpe'][j], 'Calmar': metrics['calmar'][j],
+            })
+
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            output_file = os.path.join(args.output_dir, f"{name}_walk_forward.csv")
+            pd.DataFrame({'日期': p['dates'][oos_rows].strftime('%Y-%m-%d'), '样本外净值': oos_values.round(2)}) \
+                .to_csv(output_file, index=False, encoding='utf-8-sig')
+            print(f"✓ 样本外净值已保存: {output_file}")
+
+    print("\n" + "="*80)
+    print("样本外区间表现对比")
+    print("="*80)
+    print(pd.DataFrame(summary_rows).round(2).to_string(index=False))
+    print(f"\n✓ 用时 {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监视模式
+根据各配置的 data_file（含替代序列）建立 数据文件 → 组合/图表 的依赖关系，
+定期检查 data/ 和配置文件的变化，只在后台重新计算受影响的组合和图表：
+    组合: 永久投资组合/下的综合分析表、结果库，以及 graph/<组合名>_组合净值.png
+    指数图表: 三大指数数据变化时重新运行 cli.py charts 对应的脚本
+变化在 --debounce 秒内没有新的变化后才触发计算（多个文件陆续更新只算一次）；
+组合结果经过结果缓存，文件被改写但内容未变时不会重新计算
+
+用法:
+    python3 code/watch.py                      # config/下全部配置
+    python3 code/watch.py config/保守型_config.json --interval 2 --debounce 5
+"""
+
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # 使用非交互式后端
+import matplotlib.pyplot as plt
+
+from data_loader import INDEX_ASSETS
+from downsample import downsample
+from path_store import PathStore
+from result_cache import cached_analysis
+from results_store import default_store_path, format_metric, open_store, save_results
+from 永久投资组合分析_配置版 import build_portfolio_df, load_config, portfolio_value_series
+
+# 设置中文字体
+plt.rcParams['font.sans-serif'] = ['Arial Unicode MS']  # Mac系统中文字体
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+# 指数图表（cli.py charts 的名称）依赖的数据文件：三个脚本都读取 data_loader.INDEX_ASSETS
+INDEX_CHART_INPUTS = {name: tuple(asset['data_file'] for asset in INDEX_ASSETS.values())
+                      for name in ('prices', 'bars', 'monthly')}
+
+
+def config_data_files(config):
+    """配置引用的数据文件（含替代序列）"""
+    files = set()
+    for asset in config.get('assets') or []:
+        if asset.get('type') == 'cash':
+            continue
+        files.add(asset['data_file'])
+        if asset.get('proxy'):
+            files.add(asset['proxy']['data_file'])
+    return files
+
+
+def build_dependency_graph(config_paths, base_path):
+    """
+    建立依赖关系
+
+    参数:
+        config_paths: 配置文件路径
+        base_path: 项目根目录
+
+    返回:
+        {文件绝对路径: {任务, ...}}，任务为 ('config', 配置路径) 或 ('chart', 图表名称)；
+        配置文件本身也是其组合任务的输入
+    """
+    graph = {}
+    for config_path in config_paths:
+        config_path = os.path.abspath(config_path)
+        job = ('config', config_path)
+        graph.setdefault(config_path, set()).add(job)
+        try:
+            config = load_config(config_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠ 无法读取配置 {config_path}: {e}")
+            continue
+        if not isinstance(config.get('assets'), list):
+            continue
+        for data_file in config_data_files(config):
+            graph.setdefault(os.path.join(base_path, data_file), set()).add(job)
+
+    for name, inputs in INDEX_CHART_INPUTS.items():
+        for data_file in inputs:
+            graph.setdefault(os.path.join(base_path, data_file), set()).add(('chart', name))
+    return graph
+
+
+def snapshot(paths):
+    """各文件的 (修改时间, 大小)，不存在的文件为None"""
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamps[path] = None
+    return stamps
+
+
+def portfolio_chart_path(base_path, config):
+    return os.path.join(base_path, 'graph', f"{config['portfolio_name']}_组合净值.png")
+
+
+def render_portfolio_chart(config, values, output):
+    """组合净值曲线图，values 为组合价值序列（pd.Series，以日期为索引）"""
+    plot_df = downsample(values.rename('value').reset_index(), 'Date', 'value')
+
+    fig, ax = plt.subplots(figsize=(14, 7))
+    ax.plot(plot_df['Date'], plot_df['value'], linewidth=2, color='#2E86AB')
+    ax.set_title(f"{config['portfolio_name']} 组合净值", fontsize=18, fontweight='bold', pad=20)
+    ax.set_xlabel('日期', fontsize=14, fontweight='bold')
+    ax.set_ylabel('组合价值', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_axisbelow(True)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+
+
+def run_config_job(config_path, base_path, conn):
+    """重新计算一个组合（内容未变时命中结果缓存），需要时更新净值图"""
+    config = load_config(config_path)
+    if not isinstance(config.get('assets'), list):
+        print(f"跳过旧版格式配置: {os.path.basename(config_path)}")
+        return
+    # 对齐面板命中进程内缓存；未命中结果缓存时价值路径随分析一起记录，绘图不再重新模拟
+    portfolio_df = build_portfolio_df(config, base_path, log=lambda *args, **kwargs: None)
+    if portfolio_df is None:
+        print(f"✗ {config['portfolio_name']}: 没有可用的资产数据")
+        return
+    paths = PathStore(portfolio_df.index, encoding='float64', metrics=())
+    result, hit = cached_analysis(config, base_path, conn, verbose=False, path_store=paths)
+    if result is None:
+        print(f"✗ {config['portfolio_name']}: 没有可用的资产数据")
+        return
+    chart = portfolio_chart_path(base_path, config)
+    if hit and os.path.exists(chart):
+        print(f"✓ {config['portfolio_name']}: 输入内容未变化，跳过")
+        return
+    if not hit:
+        save_results(conn, [result])
+    values = paths.path(0) if len(paths) else portfolio_value_series(config, base_path)
+    render_portfolio_chart(config, values, chart)
+    s = result['summary']
+    print(f"✓ {config['portfolio_name']}: 已更新（CAGR {format_metric(s['cagr'])}%，"
+          f"最大回撤 {format_metric(s['max_drawdown'])}%）")
+
+
+def run_chart_job(name):
+    """重新生成指数图表"""
+    import importlib
+    from cli import CHARTS
+
+    importlib.import_module(CHARTS[name]).main()
+
+
+class Watcher:
+    """
+    轮询文件变化，防抖后把受影响的任务交给后台线程执行
+
+    参数:
+        config_paths: 配置文件路径（为空时监视 config/ 下全部配置，并发现新增配置）
+        base_path: 项目根目录
+        interval: 检查间隔（秒）
+        debounce: 最后一次变化后等待的秒数
+    """
+
+    def __init__(self, config_paths, base_path, interval=2.0, debounce=3.0):
+        self.explicit_configs = [os.path.abspath(p) for p in config_paths]
+        self.base_path = base_path
+        self.interval = interval
+        self.debounce = debounce
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = set()
+        self.last_change = None
+        self.running = None
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def config_paths(self):
+        return self.explicit_configs or sorted(glob.glob(os.path.join(self.base_path, 'config', '*.json')))
+
+    def rebuild(self):
+        self.configs = self.config_paths()
+        self.graph = build_dependency_graph(self.configs, self.base_path)
+        self.stamps = snapshot(self.graph)
+
+    def poll(self):
+        """检查一次变化，返回新加入的任务"""
+        jobs = set()
+        if self.config_paths() != self.configs:
+            added = set(self.config_paths()) - set(self.configs)
+            self.rebuild()
+            jobs |= {('config', p) for p in added}
+        stamps = snapshot(self.graph)
+        changed = [path for path, stamp in stamps.items() if stamp is not None and stamp != self.stamps.get(path)]
+        for path in changed:
+            print(f"检测到变化: {os.path.relpath(path, self.base_path)}")
+            jobs |= self.graph[path]
+        if set(changed) & set(self.configs):
+            # 配置引用的数据文件可能变了，重建依赖关系
+            self.graph = build_dependency_graph(self.configs, self.base_path)
+            stamps = snapshot(self.graph)
+        self.stamps = stamps
+        if jobs:
+            with self._lock:
+                self.pending |= jobs
+                self.last_change = time.monotonic()
+        return jobs
+
+    def dispatch(self):
+        """距最后一次变化超过防抖时间且后台空闲时，提交积累的任务"""
+        with self._lock:
+            if not self.pending or time.monotonic() - self.last_change < self.debounce:
+                return None
+            if self.running is not None and not self.running.done():
+                return None
+            jobs, self.pending = sorted(self.pending), set()
+        self.running = self.executor.submit(self.run_jobs, jobs)
+        return self.running
+
+    def run_jobs(self, jobs):
+        start = time.perf_counter()
+        conn = open_store(default_store_path(self.base_path))
+        try:
+            for kind, target in jobs:
+                try:
+                    if kind == 'config':
+                        run_config_job(target, self.base_path, conn)
+                    else:
+                        run_chart_job(target)
+                except Exception as e:
+                    print(f"✗ {kind} {os.path.basename(target)}: {e}")
+        finally:
+            conn.close()
+        print(f"✓ {len(jobs)} 个任务完成，用时 {time.perf_counter() - start:.2f}s")
+
+    def run(self):
+        print(f"监视 {len(self.graph)} 个文件（{len(self.configs)} 个配置），Ctrl+C 退出")
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+                self.dispatch()
+        except KeyboardInterrupt:
+            print("\n停止监视")
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='监视数据文件变化，只重新计算受影响的组合和图表')
+    parser.add_argument('configs', nargs='*', help='配置文件路径（默认config/下全部配置）')
+    parser.add_argument('--interval', type=float, default=2.0, help='检查间隔（秒）')
+    parser.add_argument('--debounce', type=float, default=3.0, help='最后一次变化后等待的秒数')
+    parser.add_argument('--show-graph', action='store_true', help='打印依赖关系后退出')
+    args = parser.parse_args()
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    watcher = Watcher(args.configs, base_path, args.interval, args.debounce)
+    if args.show_graph:
+        for path, jobs in sorted(watcher.graph.items()):
+            targets = ', '.join(f"{kind}:{os.path.basename(t)}" for kind, t in sorted(jobs))
+            print(f"{os.path.relpath(path, base_path)} -> {targets}")
+    else:
+        watcher.run()
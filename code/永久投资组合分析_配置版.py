@@ -13,175 +13,266 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_loader import parse_asset_csv
+from data_quality import check_asset_data
+from results_store import config_hash, default_store_path, open_store, save_results
+from price_panel import get_aligned_panel, panel_columns
+from dynamic_weights import WEIGHTING_NAMES, rebalance_weights
+from engine_meta import ENGINE_VERSION, generate_filename, normalize_weighting
+from batch_engine import simulate_holdings
+
 def load_config(config_path):
     """加载配置文件"""
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
     return config
 
+def read_asset_file(asset, base_path):
+    """读取并解析资产数据文件（保持文件中的行顺序）"""
+    return parse_asset_csv(asset, os.path.join(base_path, asset['data_file']))
+
 def load_asset_data(asset, base_path):
-    """根据配置加载资产数据"""
+    """根据配置加载资产数据（加载时做数据质量检查，文件未变化时使用缓存的检查结果）"""
     if asset.get('type') == 'cash':
         # 现金资产，返回None，后续特殊处理
         return None
     
     # 常规资产数据
-    file_path = os.path.join(base_path, asset['data_file'])
-    df = pd.read_csv(file_path)
-    
-    # 转换日期
-    df['Date'] = pd.to_datetime(df[asset['date_column']], 
-                                 format=asset['date_format'])
+    df = read_asset_file(asset, base_path)
+    check_asset_data(asset, base_path, df['Date'], df['Price'])
     
-    # 转换价格
-    df['Price'] = df[asset['price_column']].astype(str).str.replace(',', '').astype(float)
-    
-    return df[['Date', 'Price']].sort_values('Date')
+    return df.sort_values('Date')
+
+def summarize_result(config, portfolio_df, annual_returns, multi_period_returns, drawdown_info):
+    """整理结构化结果（类型化字段，供结果库写入和查询）"""
+    values = portfolio_df['Portfolio_value']
+    start_date = portfolio_df.index[0]
+    end_date = portfolio_df.index[-1]
+    months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+    years = months / 12
+
+    total_return = (values.iloc[-1] / values.iloc[0] - 1) * 100
+    cagr = ((values.iloc[-1] / values.iloc[0]) ** (1 / years) - 1) * 100 if years > 0 else None
+
+    monthly_returns = values.pct_change().dropna()
+    volatility = monthly_returns.std() * np.sqrt(12) * 100 if len(monthly_returns) > 1 else None
+    sharpe = (monthly_returns.mean() * 12 * 100 / volatility) if volatility else None
+
+    max_drawdown = drawdown_info['max_drawdown']
+    calmar = cagr / abs(max_drawdown) if cagr is not None and max_drawdown < 0 else None
+
+    summary = {
+        'config_hash': config_hash(config),
+        'portfolio_name': config['portfolio_name'],
+        'filename': generate_filename(config),
+        'rebalance_frequency': config['rebalance_frequency'],
+        'assets': json.dumps([{'name': a['name'], 'weight': a['weight']} for a in config['assets']],
+                             ensure_ascii=False),
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': end_date.strftime('%Y-%m-%d'),
+        'months': months,
+        'final_value': float(values.iloc[-1]),
+        'total_return': float(total_return),
+        'cagr': float(cagr) if cagr is not None else None,
+        'volatility': float(volatility) if volatility is not None else None,
+        'sharpe': float(sharpe) if sharpe is not None else None,
+        'max_drawdown': float(max_drawdown),
+        'peak_date': drawdown_info['peak_date'].strftime('%Y-%m-%d'),
+        'trough_date': drawdown_info['trough_date'].strftime('%Y-%m-%d'),
+        'recovery_date': (drawdown_info['recovery_date'].strftime('%Y-%m-%d')
+                          if drawdown_info['recovery_date'] is not None else None),
+        'recovery_months': drawdown_info['recovery_months'],
+        'calmar': float(calmar) if calmar is not None else None,
+    }
+    for item in multi_period_returns:
+        key = f"return_{item['期间'].replace('年', '')}y"
+        value = item['几何平均年化收益率(%)']
+        summary[key] = float(value) if value != '-' else None
+
+    annual = [{
+        'year': int(item['年份']),
+        'start_value': float(item['年初投资组合价值']),
+        'end_value': float(item['年末投资组合价值']),
+        'annual_return': float(item['年化收益率(%)'])
+    } for item in annual_returns]
 
-def generate_filename(config):
-    """根据配置生成文件名"""
-    parts = []
+    return {'summary': summary, 'annual_returns': annual}
+
+def build_portfolio_df(config, base_path, load_data=load_asset_data, log=print, panel_cache_dir=None, frequency='ME'):
+    """
+    加载各资产数据，转换为月度数据（或指定频率）并按日期对齐
+
+    参数:
+        config: 配置字典
+        base_path: 数据文件的基础路径
+        load_data: 资产数据加载函数 (asset, base_path) -> DataFrame
+        log: 输出函数
+        panel_cache_dir: 对齐面板的磁盘缓存目录（可选）
+        frequency: 重采样频率（默认 'ME' 月末，'B' 为工作日）
+
+    返回:
+        portfolio_df: 以月末日期为索引、每个资产一列(asset_0, asset_1, ...)的价格表；无可用数据时返回None
+    """
+    # 加载并对齐各资产数据（同一组资产的面板在进程内/磁盘上复用，对齐方式见配置的alignment字段）
+    panel = get_aligned_panel(config['assets'], base_path, load_data, frequency=frequency,
+                              cache_dir=panel_cache_dir, log=log, alignment=config.get('alignment'))
+    if panel is None:
+        log("错误：没有可用的资产数据")
+        return None
     
-    for asset in config['assets']:
-        name = asset['name']
-        weight = int(asset['weight'] * 100)
-        parts.append(f"{name}{weight}")
+    log("\n数据预处理...")
+    columns = {}
+    for i, (asset, j) in enumerate(zip(config['assets'], panel_columns(panel, config['assets'], frequency))):
+        if j is None:
+            # 现金资产（固定收益率；月度按期复利，其他频率按实际天数复利）
+            annual_return = asset['annual_return']
+            if frequency == 'ME':
+                columns[f"asset_{i}"] = 100 * ((1 + annual_return) ** (1/12)) ** np.arange(len(panel.dates))
+            else:
+                days = (panel.dates - panel.dates[0]) / np.timedelta64(1, 'D')
+                columns[f"asset_{i}"] = 100 * (1 + annual_return) ** (days / 365.25)
+        else:
+            columns[f"asset_{i}"] = panel.values[:, j]
     
-    filename = '_'.join(parts) + '.csv'
-    return filename
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(panel.dates, name='Date'))
 
-def analyze_portfolio(config_path):
-    """分析投资组合"""
-    # 获取基础路径
-    base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
-    
-    # 加载配置
-    print("="*80)
-    print("读取配置文件...")
-    config = load_config(config_path)
+def annual_rebalance_mask(index):
+    """每年第一个可用月份为再平衡点"""
+    years = np.asarray(index.year)
+    mask = np.ones(len(years), dtype=bool)
+    mask[1:] = years[1:] != years[:-1]
+    return mask
+
+def simulate_rebalance(prices, weights, rebalance_mask, initial_value=10000):
+    """
+    向量化的定期再平衡模拟（参数同 batch_engine.simulate_holdings）
+
+    返回:
+        values: (T,) 组合价值，即各资产持仓价值之和
+    """
+    return simulate_holdings(prices, weights, rebalance_mask, initial_value).sum(axis=1)
+
+def rebalance_contributions(prices, weights, rebalance_mask, initial_value=10000, holdings=None):
+    """
+    与 simulate_rebalance 相同的模拟，同时给出各资产对组合价值变化的累计贡献
+
+    每期各资产持仓价值的变化即该资产的贡献，再平衡当期只是重新分配（贡献为0），
+    按资产累加后，任意两期之间的组合价值变化都等于各资产贡献之差的和
+
+    参数:
+        holdings: 已由 simulate_holdings 算出的持仓价值（可选），传入时不再重复模拟
+
+    返回:
+        values: (T,) 组合价值
+        contributions: (T, N) 各资产自第一期起的累计价值贡献，values = initial_value + contributions.sum(axis=1)
+    """
+    if holdings is None:
+        holdings = simulate_holdings(prices, weights, rebalance_mask, initial_value)
+    steps = np.zeros_like(holdings)
+    steps[1:] = holdings[1:] - holdings[:-1]
+    steps[np.asarray(rebalance_mask, dtype=bool)] = 0.0
+    return holdings.sum(axis=1), np.cumsum(steps, axis=0)
+
+def portfolio_value_series(config, base_path, load_data=load_asset_data, panel_cache_dir=None, initial_value=10000):
+    """
+    按配置模拟组合，只返回组合价值序列（不打印、不计算报表）
+
+    返回:
+        pd.Series，以月末日期为索引；无可用数据时返回None
+    """
+    portfolio_df = build_portfolio_df(config, base_path, load_data=load_data,
+                                      log=lambda *args, **kwargs: None, panel_cache_dir=panel_cache_dir)
+    if portfolio_df is None:
+        return None
+    prices = portfolio_df.to_numpy()
+    rebalance_mask = annual_rebalance_mask(portfolio_df.index)
+    weights = rebalance_weights(config, prices, rebalance_mask)
+    values = simulate_rebalance(prices, weights, rebalance_mask, initial_value)
+    return pd.Series(values, index=portfolio_df.index, name=config['portfolio_name'])
+
+def run_analysis(config, base_path, load_data=load_asset_data, verbose=True, save_csv=True, store_conn=None,
+                 panel_cache_dir=None, path_store=None):
+    """
+    根据配置字典分析投资组合
+
+    参数:
+        config: 配置字典
+        base_path: 数据文件和输出目录的基础路径
+        load_data: 资产数据加载函数（分析服务传入内存缓存版本）
+        verbose: 是否打印过程信息
+        save_csv: 是否保存综合分析表CSV
+        store_conn: 结果库连接（可选），传入时写入结果库
+        panel_cache_dir: 对齐面板的磁盘缓存目录（可选）
+        path_store: 价值路径容器 PathStore（可选），传入时追加本组合的价值路径
+
+    返回:
+        result: 结构化结果 {'summary': {...}, 'annual_returns': [...]}；无可用数据时返回None
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
     
     # 显示配置信息
-    print(f"\n投资组合: {config['portfolio_name']}")
-    print(f"再平衡频率: {config['rebalance_frequency']}")
-    print("\n资产配置:")
+    log(f"\n投资组合: {config['portfolio_name']}")
+    log(f"再平衡频率: {config['rebalance_frequency']}")
+    log("\n资产配置:")
     for asset in config['assets']:
-        print(f"  {asset['name']}: {asset['weight']*100:.0f}%")
-    
-    print("\n" + "="*80)
-    print("加载数据...")
+        log(f"  {asset['name']}: {asset['weight']*100:.0f}%")
     
-    # 加载各资产数据
-    assets_data = {}
-    cash_assets = []
+    log("\n" + "="*80)
+    log("加载数据...")
     
-    for i, asset in enumerate(config['assets']):
-        asset_id = f"asset_{i}"
-        
-        if asset.get('type') == 'cash':
-            cash_assets.append((asset_id, asset))
-            continue
-        
-        df = load_asset_data(asset, base_path)
-        if df is not None:
-            assets_data[asset_id] = {
-                'data': df,
-                'config': asset
-            }
-            print(f"{asset['name']}数据: {len(df)}行, {df['Date'].min()} 至 {df['Date'].max()}")
-    
-    # 转换为月度数据并合并
-    print("\n数据预处理...")
-    monthly_data = {}
-    
-    for asset_id, asset_info in assets_data.items():
-        df = asset_info['data']
-        monthly = df.set_index('Date').resample('ME').last().dropna()
-        monthly.columns = [asset_id]
-        monthly_data[asset_id] = monthly
-    
-    # 合并所有资产数据
-    if len(monthly_data) > 0:
-        portfolio_df = monthly_data[list(monthly_data.keys())[0]]
-        for asset_id in list(monthly_data.keys())[1:]:
-            portfolio_df = pd.merge(portfolio_df, monthly_data[asset_id], 
-                                   left_index=True, right_index=True, how='inner')
-    else:
-        print("错误：没有可用的资产数据")
-        return
-    
-    # 添加现金资产（固定收益率）
-    for asset_id, asset in cash_assets:
-        annual_return = asset['annual_return']
-        portfolio_df[asset_id] = 100 * ((1 + annual_return) ** (1/12)) ** np.arange(len(portfolio_df))
+    portfolio_df = build_portfolio_df(config, base_path, load_data=load_data, log=log,
+                                      panel_cache_dir=panel_cache_dir)
+    if portfolio_df is None:
+        return None
+    portfolio_df = portfolio_df.copy()
     
-    print(f"合并后数据: {len(portfolio_df)}行")
-    print(f"数据范围: {portfolio_df.index.min()} 至 {portfolio_df.index.max()}")
+    log(f"合并后数据: {len(portfolio_df)}行")
+    log(f"数据范围: {portfolio_df.index.min()} 至 {portfolio_df.index.max()}")
     
     # 构建投资组合
-    print("\n" + "="*80)
-    print("构建投资组合（每年再平衡）...")
+    log("\n" + "="*80)
+    log("构建投资组合（每年再平衡）...")
     
     initial_value = 10000
     portfolio_df['Year'] = portfolio_df.index.year
-    portfolio_df['Portfolio_value'] = 0.0
-    
-    # 初始化每个资产的份额
-    current_shares = {}
-    for i in range(len(config['assets'])):
-        current_shares[f"asset_{i}"] = 0
     
     years = sorted(portfolio_df['Year'].unique())
     rebalance_count = len(years) - 1
-    print(f"再平衡次数: {rebalance_count}")
-    
-    for idx in portfolio_df.index:
-        year = portfolio_df.loc[idx, 'Year']
-        
-        # 年初再平衡
-        first_month = portfolio_df[portfolio_df['Year'] == year].index[0]
-        if idx == first_month:
-            if year == years[0]:
-                current_total = initial_value
-            else:
-                prev_idx = portfolio_df[portfolio_df.index < idx].index[-1]
-                current_total = portfolio_df.loc[prev_idx, 'Portfolio_value']
-            
-            # 再平衡：按权重分配
-            for i, asset in enumerate(config['assets']):
-                asset_id = f"asset_{i}"
-                amount = current_total * asset['weight']
-                current_shares[asset_id] = amount / portfolio_df.loc[idx, asset_id]
-        
-        # 计算当前总值
-        total_value = 0
-        for i in range(len(config['assets'])):
-            asset_id = f"asset_{i}"
-            total_value += current_shares[asset_id] * portfolio_df.loc[idx, asset_id]
-        portfolio_df.loc[idx, 'Portfolio_value'] = total_value
+    log(f"再平衡次数: {rebalance_count}")
+    
+    # 年初再平衡：按权重分配（动态权重策略在每个再平衡点重新计算目标权重）
+    asset_ids = [f"asset_{i}" for i in range(len(config['assets']))]
+    prices = portfolio_df[asset_ids].to_numpy()
+    rebalance_mask = annual_rebalance_mask(portfolio_df.index)
+    weights = rebalance_weights(config, prices, rebalance_mask)
+    portfolio_df['Portfolio_value'] = simulate_rebalance(prices, weights, rebalance_mask, initial_value)
+    if path_store is not None:
+        path_store.append(portfolio_df['Portfolio_value'].to_numpy(), names=[config['portfolio_name']])
+    
+    if weights.ndim == 2:
+        log(f"权重方法: {WEIGHTING_NAMES[normalize_weighting(config.get('weighting'))[0]]}")
+        weights_df = pd.DataFrame(weights * 100, columns=[a['name'] for a in config['assets']],
+                                  index=pd.Index(portfolio_df.index[rebalance_mask].year, name='年份')).round(1)
+        if verbose:
+            log(weights_df.to_string())
     
     # 计算年度收益率
-    print("\n计算年度收益率...")
-    annual_returns = []
-    for year in years:
-        year_data = portfolio_df[portfolio_df['Year'] == year]
-        if len(year_data) > 0:
-            start_value = year_data['Portfolio_value'].iloc[0]
-            end_value = year_data['Portfolio_value'].iloc[-1]
-            annual_return = (end_value / start_value - 1) * 100
-            
-            annual_returns.append({
-                '年份': year,
-                '年初投资组合价值': round(start_value, 2),
-                '年末投资组合价值': round(end_value, 2),
-                '年化收益率(%)': round(annual_return, 2)
-            })
+    log("\n计算年度收益率...")
+    yearly = portfolio_df.groupby('Year')['Portfolio_value'].agg(['first', 'last'])
+    annual_returns = [{
+        '年份': year,
+        '年初投资组合价值': round(start_value, 2),
+        '年末投资组合价值': round(end_value, 2),
+        '年化收益率(%)': round((end_value / start_value - 1) * 100, 2)
+    } for year, start_value, end_value in zip(yearly.index, yearly['first'], yearly['last'])]
     
     annual_returns_df = pd.DataFrame(annual_returns)
-    print("\n年度收益率:")
-    print(annual_returns_df.to_string(index=False))
+    log("\n年度收益率:")
+    if verbose:
+        log(annual_returns_df.to_string(index=False))
     
     # 计算最大回撤
-    print("\n\n计算最大回撤...")
+    log("\n\n计算最大回撤...")
     portfolio_df['Peak'] = portfolio_df['Portfolio_value'].cummax()
     portfolio_df['Drawdown'] = (portfolio_df['Portfolio_value'] / portfolio_df['Peak'] - 1) * 100
     
@@ -200,17 +291,17 @@ def analyze_portfolio(config_path):
         recovery_date = None
         recovery_months = None
     
-    print(f"最大回撤: {max_drawdown:.2f}%")
-    print(f"最大回撤日期: {max_drawdown_date.strftime('%Y-%m')}")
-    print(f"峰值日期: {peak_date.strftime('%Y-%m')}")
+    log(f"最大回撤: {max_drawdown:.2f}%")
+    log(f"最大回撤日期: {max_drawdown_date.strftime('%Y-%m')}")
+    log(f"峰值日期: {peak_date.strftime('%Y-%m')}")
     if recovery_date:
-        print(f"修复日期: {recovery_date.strftime('%Y-%m')}")
-        print(f"修复时间: {recovery_months} 个月")
+        log(f"修复日期: {recovery_date.strftime('%Y-%m')}")
+        log(f"修复时间: {recovery_months} 个月")
     else:
-        print(f"修复日期: 尚未修复")
+        log(f"修复日期: 尚未修复")
     
     # 计算多年期收益率
-    print("\n\n计算多年期几何平均收益率...")
+    log("\n\n计算多年期几何平均收益率...")
     
     def calc_geometric_return(start_value, end_value, years):
         return ((end_value / start_value) ** (1 / years) - 1) * 100
@@ -251,11 +342,12 @@ def analyze_portfolio(config_path):
             })
     
     multi_period_df = pd.DataFrame(multi_period_returns)
-    print("\n多年期几何平均年化收益率:")
-    print(multi_period_df.to_string(index=False))
+    log("\n多年期几何平均年化收益率:")
+    if verbose:
+        log(multi_period_df.to_string(index=False))
     
     # 整理综合表
-    print("\n\n整理综合分析表...")
+    log("\n\n整理综合分析表...")
     
     # 策略配置信息
     strategy_info = []
@@ -276,6 +368,16 @@ def analyze_portfolio(config_path):
         '年化收益率(%)': ''
     })
     
+    method, lookback, _ = normalize_weighting(config.get('weighting'))
+    if method != 'static':
+        strategy_info.append({
+            '类别': '策略说明',
+            '期间': '权重方法',
+            '起始价值': WEIGHTING_NAMES[method],
+            '结束价值': f"回看{lookback}期",
+            '年化收益率(%)': ''
+        })
+    
     strategy_df = pd.DataFrame(strategy_info)
     
     # 年度收益
@@ -319,35 +421,99 @@ def analyze_portfolio(config_path):
     combined_df = pd.concat([strategy_df, annual_summary, multi_period_summary, risk_summary], 
                             ignore_index=True)
     
-    # 保存结果
-    output_dir = os.path.join(base_path, '永久投资组合')
-    os.makedirs(output_dir, exist_ok=True)
+    log("\n" + "="*80)
+    log("永久投资组合综合分析表")
+    log("="*80)
+    if verbose:
+        log(combined_df.to_string(index=False))
+    log("\n" + "="*80)
     
-    filename = generate_filename(config)
-    output_file = os.path.join(output_dir, filename)
-    combined_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+    # 保存结果
+    if save_csv:
+        output_dir = os.path.join(base_path, '永久投资组合')
+        os.makedirs(output_dir, exist_ok=True)
+        
+        filename = generate_filename(config)
+        output_file = os.path.join(output_dir, filename)
+        combined_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        log(f"✓ 综合分析表已保存: {output_file}")
+    log(f"✓ 共 {len(combined_df)} 行数据")
+    log("="*80)
+
+    result = summarize_result(config, portfolio_df, annual_returns, multi_period_returns, {
+        'max_drawdown': max_drawdown,
+        'peak_date': peak_date,
+        'trough_date': max_drawdown_date,
+        'recovery_date': recovery_date,
+        'recovery_months': recovery_months,
+    })
+    if store_conn is not None:
+        save_results(store_conn, [result])
+        log(f"✓ 结果已写入结果库 (config_hash={result['summary']['config_hash']})")
+
+    log("\n分析完成！")
+    log("="*80)
+
+    return result
+
+def analyze_portfolio(config_path, store_conn=None, path_store=None):
+    """
+    分析投资组合
+
+    参数:
+        config_path: 配置文件路径
+        store_conn: 结果库连接（可选），传入时写入结果库
+        path_store: 价值路径容器 PathStore（可选），传入时追加本组合的价值路径
+
+    返回:
+        result: 结构化结果 {'summary': {...}, 'annual_returns': [...]}
+    """
+    # 获取基础路径
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
     
-    print("\n" + "="*80)
-    print("永久投资组合综合分析表")
-    print("="*80)
-    print(combined_df.to_string(index=False))
-    print("\n" + "="*80)
-    print(f"✓ 综合分析表已保存: {output_file}")
-    print(f"✓ 共 {len(combined_df)} 行数据")
-    print("="*80)
-    print("\n分析完成！")
+    # 加载配置
     print("="*80)
+    print("读取配置文件...")
+    config = load_config(config_path)
+    
+    return run_analysis(config, base_path, store_conn=store_conn, path_store=path_store)
 
 if __name__ == "__main__":
     import sys
     
-    # 可以通过命令行参数指定配置文件
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
-    else:
+    from result_cache import cached_analysis
+    
+    # 可以通过命令行参数指定配置文件（可传入多个，批量分析；--force 忽略结果缓存）
+    force = '--force' in sys.argv[1:]
+    config_paths = [arg for arg in sys.argv[1:] if arg != '--force']
+    if not config_paths:
         print("请指定配置文件路径")
-        print("用法: python3 永久投资组合分析_配置版.py config/配置文件.json")
+        print("用法: python3 永久投资组合分析_配置版.py config/配置文件.json [config/其他配置.json ...] [--force]")
         sys.exit(1)
     
-    analyze_portfolio(config_path)
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(config_paths[0])))
+    store_path = default_store_path(base_path)
+    conn = open_store(store_path)
+    
+    # 配置和数据都未变化的组合直接使用缓存结果，重新计算的结果最后一次性写入结果库
+    results = []
+    cached = 0
+    for config_path in config_paths:
+        print("="*80)
+        print("读取配置文件...")
+        config = load_config(config_path)
+        if not isinstance(config.get('assets'), list):
+            print(f"跳过旧版格式配置: {config_path}")
+            continue
+        config_base = os.path.dirname(os.path.dirname(os.path.abspath(config_path)))
+        result, hit = cached_analysis(config, config_base, conn, force=force)
+        if hit:
+            cached += 1
+            print(f"✓ {config['portfolio_name']}: 配置和数据均未变化，使用缓存结果")
+        elif result is not None:
+            results.append(result)
+    
+    save_results(conn, results)
+    conn.close()
+    print(f"✓ {len(results)} 个组合的结果已写入结果库: {store_path}（{cached} 个使用缓存结果）")
 